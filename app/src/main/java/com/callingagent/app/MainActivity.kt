@@ -21,6 +21,7 @@ import androidx.appcompat.app.AppCompatActivity
 import androidx.appcompat.widget.SwitchCompat
 import androidx.core.app.ActivityCompat
 import androidx.core.content.ContextCompat
+import com.callingagent.app.network.HttpClient
 import com.callingagent.app.service.CallingService
 import com.callingagent.app.service.CallStateService
 import com.callingagent.app.util.ExcelReader
@@ -54,6 +55,7 @@ class MainActivity : AppCompatActivity() {
     private var currentIndex = 0
     private var currentNumber = ""
     private var isCalling = false
+    private var pcDriven = false  // PC campaign scheduler sends DIAL - no own next-number / timeout
     private var lastCallTime = 0L
 
     // WhatsApp state
@@ -70,6 +72,10 @@ class MainActivity : AppCompatActivity() {
     private lateinit var audioManager: AudioManager
     private lateinit var telecomManager: TelecomManager
     private val handler = Handler(Looper.getMainLooper())
+    
+    // Call states -> PC over the USB tunnel (single thread keeps them in order)
+    private val pcClient = HttpClient().apply { useUsbTunnel() }
+    private val pcPushExecutor = java.util.concurrent.Executors.newSingleThreadExecutor()
 
     override fun onCreate(savedInstanceState: Bundle?) {
         super.onCreate(savedInstanceState)
@@ -106,6 +112,17 @@ class MainActivity : AppCompatActivity() {
                 // WhatsApp will be triggered in STATE_DISCONNECTED handler
             }
         }
+        PCCommandReceiver.onDialCommand = { number ->
+            runOnUiThread {
+                Log.i(TAG, "📡 PC DIAL command: $number")
+                pcDriven = true
+                currentNumber = number
+                updateCurrentNumber("📞 $number (PC)")
+                updateStatus("📞 Calling (PC)...")
+                saveCurrentNumber(number)
+                placeCall(number)
+            }
+        }
         Log.i(TAG, "📡 PCCommandReceiver callback registered")
     }
 
@@ -121,6 +138,7 @@ class MainActivity : AppCompatActivity() {
         }
 
         Log.i(TAG, "� handleCallState: $stateName | $number | $direction")
+        pushStateToPc(state, number, direction)
 
         when (state) {
             CallStateService.STATE_RINGING -> {
@@ -151,7 +169,14 @@ class MainActivity : AppCompatActivity() {
                 Log.i(TAG, "📴 CALL ENDED: $number ($direction)")
                 updateStatus("📴 Call ended")
 
-                if (isCalling && isOutgoing) {
+                if (pcDriven && isOutgoing && !isCalling) {
+                    // PC picks the next number (and retries) - only the WhatsApp follow-up here
+                    if (whatsappEnabled && currentNumber.isNotEmpty()) {
+                        Log.i(TAG, "📱 Sending WhatsApp to: $currentNumber")
+                        sendWhatsAppMessage(currentNumber)
+                    }
+                    currentNumber = ""
+                } else if (isCalling && isOutgoing) {
                     val numberToSend = currentNumber
 
                     // Trigger WhatsApp if enabled
@@ -174,6 +199,17 @@ class MainActivity : AppCompatActivity() {
         }
     }
 
+    private fun pushStateToPc(state: Int, number: String, direction: String) {
+        // Outgoing calls never report RINGING - DIALING is "samne wale ko ring"
+        val pcState = when (state) {
+            CallStateService.STATE_RINGING, CallStateService.STATE_DIALING -> "ringing"
+            CallStateService.STATE_ACTIVE -> "active"
+            CallStateService.STATE_DISCONNECTED -> "ended"
+            else -> return
+        }
+        pcPushExecutor.execute { pcClient.sendCallState(pcState, number, direction) }
+    }
+
     private fun initViews() {
         statusText = findViewById(R.id.statusText)
         currentNumberText = findViewById(R.id.currentNumberText)
@@ -475,13 +511,7 @@ class MainActivity : AppCompatActivity() {
     private fun makeCall(number: String) {
         Log.d(TAG, "makeCall: $number")
 
-        try {
-            val file = java.io.File(getExternalFilesDir(null), "current_number.txt")
-            file.writeText(number)
-            Log.i(TAG, "💾 Saved number to file: $number")
-        } catch (e: Exception) {
-            Log.e(TAG, "Failed to save number: ${e.message}")
-        }
+        saveCurrentNumber(number)
 
         lastCallTime = System.currentTimeMillis()
 
@@ -497,6 +527,24 @@ class MainActivity : AppCompatActivity() {
             }
         }, 20000)
 
+        if (!placeCall(number)) {
+            handler.postDelayed({ callNextNumber() }, CALL_GAP_MS)
+        }
+    }
+
+    // PC reads the number from here (adb shell cat .../current_number.txt)
+    private fun saveCurrentNumber(number: String) {
+        try {
+            val file = java.io.File(getExternalFilesDir(null), "current_number.txt")
+            file.writeText(number)
+            Log.i(TAG, "💾 Saved number to file: $number")
+        } catch (e: Exception) {
+            Log.e(TAG, "Failed to save number: ${e.message}")
+        }
+    }
+
+    // false = placeCall threw (without CALL_PHONE permission nothing happens, as before)
+    private fun placeCall(number: String): Boolean {
         if (ActivityCompat.checkSelfPermission(this, Manifest.permission.CALL_PHONE) == PackageManager.PERMISSION_GRANTED) {
             try {
                 val uri = Uri.parse("tel:$number")
@@ -507,9 +555,10 @@ class MainActivity : AppCompatActivity() {
             } catch (e: Exception) {
                 Log.e(TAG, "Call error: ${e.message}")
                 updateStatus("❌ Call failed")
-                handler.postDelayed({ callNextNumber() }, CALL_GAP_MS)
+                return false
             }
         }
+        return true
     }
 
     private fun endCurrentCall() {
@@ -668,5 +717,6 @@ class MainActivity : AppCompatActivity() {
         isCalling = false
         handler.removeCallbacksAndMessages(null)
         CallStateService.onCallStateChanged = null
+        pcPushExecutor.shutdown()
     }
 }
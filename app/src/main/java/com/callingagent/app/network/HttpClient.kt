@@ -13,6 +13,7 @@ class HttpClient {
     companion object {
         private const val TAG = "HttpClient"
         private const val TIMEOUT = 5000
+        const val PC_PORT = 8765
     }
     
     private var baseUrl = ""
@@ -22,6 +23,14 @@ class HttpClient {
         return ping()
     }
     
+    /**
+     * USB mode - PC agent runs `adb reverse tcp:8765 tcp:8765`, so the PC is
+     * reachable on the phone's own localhost. No WiFi / PC IP needed.
+     */
+    fun useUsbTunnel(port: Int = PC_PORT) {
+        baseUrl = "http://127.0.0.1:$port"
+    }
+    
     fun ping(): Boolean {
         return try {
             val url = URL("$baseUrl/ping")
@@ -66,7 +75,8 @@ class HttpClient {
             }
             
             val responseCode = conn.responseCode
-            conn.disconnect()
+            // Drain + close instead of disconnect() so the keep-alive connection is reused
+            (if (responseCode < 400) conn.inputStream else conn.errorStream)?.use { it.readBytes() }
             
             Log.d(TAG, "Sent $state ($direction) for $number - Response: $responseCode")
             responseCode == 200
@@ -8,15 +8,20 @@ import android.util.Log
 /**
  * PC se ADB broadcast receive karta hai
  * PC command: adb shell am broadcast -a com.callingagent.END_CALL -n com.callingagent.app/.receiver.PCCommandReceiver
+ * PC dial:    adb shell am broadcast -a com.callingagent.DIAL --es number 9820012345 -n com.callingagent.app/.receiver.PCCommandReceiver
+ *             (PC campaign scheduler decides order / retries - app sirf call lagata hai)
  */
 class PCCommandReceiver : BroadcastReceiver() {
     
     companion object {
         private const val TAG = "PCCommandReceiver"
         const val ACTION_END_CALL = "com.callingagent.END_CALL"
+        const val ACTION_DIAL = "com.callingagent.DIAL"
+        const val EXTRA_NUMBER = "number"
         
-        // Callback to MainActivity
+        // Callbacks to MainActivity
         var onEndCallCommand: (() -> Unit)? = null
+        var onDialCommand: ((String) -> Unit)? = null
     }
     
     override fun onReceive(context: Context, intent: Intent) {
@@ -27,6 +32,13 @@ class PCCommandReceiver : BroadcastReceiver() {
                 Log.i(TAG, "📴 END_CALL command from PC!")
                 onEndCallCommand?.invoke()
             }
+            ACTION_DIAL -> {
+                val number = intent.getStringExtra(EXTRA_NUMBER).orEmpty()
+                Log.i(TAG, "📞 DIAL command from PC: $number")
+                if (number.isNotEmpty()) {
+                    onDialCommand?.invoke(number)
+                }
+            }
         }
     }
 }
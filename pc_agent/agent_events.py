@@ -0,0 +1,60 @@
+"""
+Agent Events - blocking event queue that drives the CallingAgent call flow
+
+Detector, listener aur playback threads sirf events post karte hain
+(pickup, hangup, transcript, playback finished, keypress). Call flow ek hi thread pe
+queue se blocking wait karta hai - koi fixed sleep / polling nahi. Timeouts
+(silence, max duration) bhi wait ke timeout se aate hain.
+"""
+import queue
+import time
+from enum import Enum
+
+
+class EventType(Enum):
+    PICKUP = "pickup"
+    HANGUP = "hangup"
+    TRANSCRIPT = "transcript"
+    PLAYBACK_DONE = "playback_done"
+    KEYPRESS = "keypress"
+    TIMEOUT = "timeout"
+    STOP = "stop"
+
+
+class AgentEvent:
+    __slots__ = ("type", "data", "time")
+
+    def __init__(self, event_type, data=None):
+        self.type = event_type
+        self.data = data
+        self.time = time.monotonic()  # When it was posted (for latency)
+
+    def __repr__(self):
+        return f"AgentEvent({self.type.value}, {self.data!r})"
+
+
+class EventQueue:
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def post(self, event_type, data=None):
+        """Thread-safe, never blocks - called from detector/listener/player threads"""
+        self._queue.put(AgentEvent(event_type, data))
+
+    def wait(self, timeout=None):
+        """Next event, or a TIMEOUT event once `timeout` seconds pass"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return AgentEvent(EventType.TIMEOUT)
+
+    def has_pending(self, event_type):
+        with self._queue.mutex:
+            return any(event.type == event_type for event in self._queue.queue)
+
+    def discard(self, *event_types):
+        """Drop pending events of these types (e.g. stale transcripts); others keep their order"""
+        with self._queue.mutex:
+            kept = [event for event in self._queue.queue if event.type not in event_types]
+            self._queue.queue.clear()
+            self._queue.queue.extend(kept)
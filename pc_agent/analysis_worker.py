@@ -0,0 +1,267 @@
+"""
+Post-call Analysis Worker - background, batched INTEREST/RESULT/SUMMARY
+
+Khatam hui calls queue me jaati hain. Worker kai conversations ko ek hi
+structured-output (JSON schema) request me bhejta hai - batch size ya time
+limit pe flush. API na chale toh local rules-based classifier same transcript
+features se result deta hai. Results callback se call store (Excel) me
+asynchronously likhe jaate hain.
+"""
+import json
+import queue
+import re
+import threading
+import time
+from config import logger, ANALYSIS_BATCH_SIZE, ANALYSIS_MAX_WAIT
+from rate_limiter import BACKGROUND
+
+INTEREST_VALUES = ["INTERESTED", "NOT_INTERESTED", "NEUTRAL"]
+RESULT_VALUES = ["POSITIVE", "NEGATIVE", "CUT", "NO_RESPONSE"]
+
+# Static instructions - same bytes every batch (prompt cache friendly)
+ANALYSIS_PROMPT = """Tumhe telecalling calls ki conversations JSON list me milengi: [{"id": ..., "conversation": ...}].
+Har conversation analyze karo aur har id ke liye result do:
+- interest: INTERESTED / NOT_INTERESTED / NEUTRAL
+- result: POSITIVE / NEGATIVE / CUT / NO_RESPONSE
+- summary: 1 line summary (Hindi/Hinglish)
+Har input id ka exactly ek result hona chahiye."""
+
+ANALYSIS_MESSAGE = {"role": "system", "content": ANALYSIS_PROMPT}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "call_analysis",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["results"],
+            "properties": {
+                "results": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "additionalProperties": False,
+                        "required": ["id", "interest", "result", "summary"],
+                        "properties": {
+                            "id": {"type": "string"},
+                            "interest": {"type": "string", "enum": INTEREST_VALUES},
+                            "result": {"type": "string", "enum": RESULT_VALUES},
+                            "summary": {"type": "string"}
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+NO_CONVERSATION = {
+    "interest": "NO_CONVERSATION",
+    "result": "NO_RESPONSE",
+    "summary": "Koi baat nahi hui"
+}
+
+# Transcript features for the local classifier
+POSITIVE_WORDS = [
+    "haan", "ha", "ji", "interested", "visit", "aaunga", "aayenge", "aaoonga", "kal", "address",
+    "fees", "kitna", "kab", "timing", "admission", "theek", "accha", "okay", "ok",
+    "हां", "हाँ", "जी", "आऊंगा", "आएंगे", "विजिट", "फीस", "कितना", "कब", "एड्रेस", "पता", "टाइमिंग", "ठीक"
+]
+NEGATIVE_WORDS = [
+    "nahi", "no", "busy", "mat", "band", "bas", "interest nahi", "zarurat nahi", "cut", "rakhiye",
+    "नहीं", "बिजी", "मत", "बंद", "बस", "जरूरत नहीं", "रखिए"
+]
+END_WORDS = ["bye", "nahi", "no", "bas", "cut", "band", "rakhiye", "busy"]
+
+
+def conversation_text(history):
+    """Same text format as LLMEngine.get_conversation_text"""
+    lines = []
+    for msg in history:
+        role = "User" if msg["role"] == "user" else "AI"
+        lines.append(f"{role}: {msg['content']}")
+    return "\n".join(lines)
+
+
+def _words(text):
+    """Split into words, keeping Devanagari matras (not matched by \\w), dropping danda"""
+    return re.sub(r"[^\w\s\u0900-\u0963\u0966-\u097F]", " ", text).split()
+
+
+def _count(words, phrases):
+    """Count single words by token, multi-word phrases by substring"""
+    text = " ".join(words)
+    total = 0
+    for p in phrases:
+        total += text.count(p) if " " in p else words.count(p)
+    return total
+
+
+def extract_features(history):
+    """Simple counts over the user side of the transcript"""
+    user_msgs = [m["content"].lower() for m in history if m["role"] == "user"]
+    ai_msgs = [m["content"].lower() for m in history if m["role"] == "assistant"]
+    user_words = _words(" ".join(user_msgs))
+    last_words = _words(user_msgs[-1]) if user_msgs else []
+
+    return {
+        "user_turns": len(user_msgs),
+        "user_words": len(user_words),
+        "positive": _count(user_words, POSITIVE_WORDS),
+        "negative": _count(user_words, NEGATIVE_WORDS),
+        "ended_by_user": _count(last_words, END_WORDS) > 0,
+        "irrelevant": sum(1 for m in ai_msgs if "maaf" in m or "pata nahi" in m),
+    }
+
+
+def classify_local(history):
+    """Deterministic rules-based fallback classifier (no API)"""
+    if not history:
+        return dict(NO_CONVERSATION)
+
+    f = extract_features(history)
+
+    if f["user_turns"] == 0:
+        return {"interest": "NEUTRAL", "result": "NO_RESPONSE",
+                "summary": "User ne kuch nahi bola (local)"}
+
+    score = f["positive"] - 2 * f["negative"] - f["irrelevant"]
+
+    if score >= 2 and not f["ended_by_user"]:
+        interest, result = "INTERESTED", "POSITIVE"
+    elif f["negative"] > 0 and f["negative"] >= f["positive"]:
+        interest, result = "NOT_INTERESTED", "NEGATIVE"
+    elif f["ended_by_user"] and f["user_turns"] <= 1:
+        interest, result = "NOT_INTERESTED", "CUT"
+    else:
+        interest, result = "NEUTRAL", "NEGATIVE" if score < 0 else "POSITIVE"
+
+    summary = (f"{f['user_turns']} user turns, +{f['positive']}/-{f['negative']} signals"
+               f"{', user ended call' if f['ended_by_user'] else ''} (local)")
+    return {"interest": interest, "result": result, "summary": summary}
+
+
+def analyze_batch(llm, items):
+    """
+    Analyze several conversations in ONE structured-output request.
+    items: list of (id, history). Returns {id: analysis}. Any id missing from
+    the response (or all of them, if the API fails) gets the local classifier.
+    """
+    results = {}
+    pending = []
+    for item_id, history in items:
+        if history:
+            pending.append((str(item_id), history))
+        else:
+            results[str(item_id)] = dict(NO_CONVERSATION)
+
+    if not pending:
+        return results
+
+    payload = json.dumps(
+        [{"id": item_id, "conversation": conversation_text(history)} for item_id, history in pending],
+        ensure_ascii=False
+    )
+    messages = [ANALYSIS_MESSAGE, {"role": "user", "content": payload}]
+
+    try:
+        text = llm._complete(messages, max_tokens=80 * len(pending) + 50, temperature=0.3,
+                             priority=BACKGROUND, response_format=RESPONSE_FORMAT)
+        for row in json.loads(text).get("results", []):
+            if row.get("interest") in INTEREST_VALUES and row.get("result") in RESULT_VALUES:
+                results[str(row["id"])] = {
+                    "interest": row["interest"],
+                    "result": row["result"],
+                    "summary": row.get("summary", "")
+                }
+    except Exception as e:
+        logger.error(f"Analysis API error: {e} - using local classifier")
+
+    for item_id, history in pending:
+        if item_id not in results:
+            results[item_id] = classify_local(history)
+    return results
+
+
+class AnalysisWorker:
+    """Background thread that batches finished calls for analysis"""
+
+    def __init__(self, llm, on_result, batch_size=ANALYSIS_BATCH_SIZE, max_wait=ANALYSIS_MAX_WAIT):
+        self.llm = llm
+        self.on_result = on_result  # callback(job_id, analysis)
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._stop = threading.Event()
+
+        self.batches = 0
+        self.analyzed = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"🔍 Analysis worker started | Batch: {self.batch_size} | Max wait: {self.max_wait}s")
+
+    def submit(self, job_id, history):
+        """Queue a finished conversation (history is copied)"""
+        self._queue.put((job_id, list(history)))
+
+    def stop(self, timeout=30):
+        """Flush whatever is queued, then stop"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._process(batch)
+            elif self._stop.is_set():
+                break
+
+    def _collect(self):
+        """Block for the first job, then gather more until batch full or max_wait passes"""
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.5)))
+            except queue.Empty:
+                continue
+        # On shutdown take everything that is left
+        while self._stop.is_set() and len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _process(self, batch):
+        start = time.perf_counter()
+        results = analyze_batch(self.llm, batch)
+        self.busy_seconds += time.perf_counter() - start
+        self.batches += 1
+        self.analyzed += len(batch)
+        logger.info(f"🔍 Analyzed {len(batch)} call(s) in {time.perf_counter() - start:.1f}s")
+
+        for job_id, _ in batch:
+            try:
+                self.on_result(job_id, results[str(job_id)])
+            except Exception as e:
+                logger.error(f"Analysis result callback error: {e}")
@@ -1,12 +1,14 @@
 """
 Audio Tracking Excel Handler
-Tracks phone numbers, audio listen time, and color codes based on percentage
+Tracks phone numbers, audio listen time, keypress (DTMF) and color codes based on percentage
+(openpyxl is imported and the file created on the first log_call / prepare)
 """
 import os
+import threading
 from datetime import datetime
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment
 from config import logger
+from excel_handler import EXCEL_WRITE_SECONDS, EXCEL_ERRORS
+from campaign_stats import listen_band
 
 
 class AudioTracker:
@@ -22,23 +24,33 @@ class AudioTracker:
                 base_dir = os.path.dirname(os.path.abspath(__file__))
             
             results_dir = os.path.join(base_dir, "results")
-            os.makedirs(results_dir, exist_ok=True)
             excel_path = os.path.join(results_dir, "audio_tracking.xlsx")
         self.excel_path = os.path.abspath(excel_path)
         logger.info(f"📊 Audio tracker Excel path: {self.excel_path}")
-        self._init_excel()
+        self._lock = threading.Lock()
+        self._ready = False
+    
+    def prepare(self):
+        """Import openpyxl and create the file now instead of on the first call"""
+        with self._lock:
+            if not self._ready:
+                self._init_excel()
+                self._ready = True
     
     def _init_excel(self):
         """Initialize Excel with headers"""
+        os.makedirs(os.path.dirname(self.excel_path), exist_ok=True)
         if os.path.exists(self.excel_path):
             logger.info(f"📊 Audio tracking Excel exists: {self.excel_path}")
             return
         
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill, Alignment
         wb = Workbook()
         ws = wb.active
         ws.title = "Audio Tracking"
         
-        headers = ["Phone Number", "Date Time", "Audio Length (s)", "Listened (s)", "Percentage", "Status"]
+        headers = ["Phone Number", "Date Time", "Audio Length (s)", "Listened (s)", "Percentage", "Status", "Keypress"]
         
         for col, header in enumerate(headers, 1):
             cell = ws.cell(row=1, column=col, value=header)
@@ -52,61 +64,69 @@ class AudioTracker:
         ws.column_dimensions['D'].width = 15
         ws.column_dimensions['E'].width = 12
         ws.column_dimensions['F'].width = 15
+        ws.column_dimensions['G'].width = 10
         
         wb.save(self.excel_path)
         logger.info(f"📊 Created audio tracking Excel: {self.excel_path}")
     
-    def log_call(self, phone_number, audio_length, listened_time):
+    def log_call(self, phone_number, audio_length, listened_time, keypress=None):
         """
-        Log call with color coding
+        Log call with color coding (keypress: DTMF key pressed during the audio)
         RED: < 20% listened
         YELLOW: 20-60% listened
         GREEN: > 60% listened
         """
         try:
-            wb = load_workbook(self.excel_path)
-            ws = wb.active
-            
-            # Calculate percentage
-            percentage = (listened_time / audio_length * 100) if audio_length > 0 else 0
-            
-            # Determine status and color
-            if percentage < 20:
-                status = "NOT INTERESTED"
-                fill_color = "FF6B6B"  # RED
-            elif percentage < 60:
-                status = "PARTIAL"
-                fill_color = "FFD93D"  # YELLOW
-            else:
-                status = "INTERESTED"
-                fill_color = "6BCF7F"  # GREEN
-            
-            # Add row
-            row_data = [
-                phone_number,
-                datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                round(audio_length, 1),
-                round(listened_time, 1),
-                f"{percentage:.1f}%",
-                status
-            ]
-            
-            ws.append(row_data)
-            
-            # Apply color to entire row
-            last_row = ws.max_row
-            fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-            
-            for col in range(1, 7):
-                cell = ws.cell(row=last_row, column=col)
-                cell.fill = fill
-                cell.alignment = Alignment(horizontal="center")
-            
-            wb.save(self.excel_path)
-            logger.info(f"📊 Logged: {phone_number} | {percentage:.1f}% | {status}")
-            
+            self.prepare()
+            with EXCEL_WRITE_SECONDS.labels("audio_tracker").time():
+                self._log_call(phone_number, audio_length, listened_time, keypress)
         except Exception as e:
+            EXCEL_ERRORS.labels("audio_tracker").inc()
             logger.error(f"Audio tracking error: {e}")
+    
+    def _log_call(self, phone_number, audio_length, listened_time, keypress):
+        from openpyxl import load_workbook
+        from openpyxl.styles import Font, PatternFill, Alignment
+        wb = load_workbook(self.excel_path)
+        ws = wb.active
+        if ws.cell(row=1, column=7).value is None:
+            # File from before the Keypress column
+            header = ws.cell(row=1, column=7, value="Keypress")
+            header.font = Font(bold=True, color="FFFFFF")
+            header.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+            header.alignment = Alignment(horizontal="center")
+        
+        # Calculate percentage
+        percentage = (listened_time / audio_length * 100) if audio_length > 0 else 0
+        
+        # Determine status and color (RED / YELLOW / GREEN)
+        status, fill_color = listen_band(percentage)
+        
+        # Add row
+        row_data = [
+            phone_number,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            round(audio_length, 1),
+            round(listened_time, 1),
+            f"{percentage:.1f}%",
+            status,
+            keypress or ""
+        ]
+        
+        ws.append(row_data)
+        
+        # Apply color to entire row
+        last_row = ws.max_row
+        fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
+        
+        for col in range(1, 8):
+            cell = ws.cell(row=last_row, column=col)
+            cell.fill = fill
+            cell.alignment = Alignment(horizontal="center")
+        
+        wb.save(self.excel_path)
+        pressed = f" | Key {keypress}" if keypress else ""
+        logger.info(f"📊 Logged: {phone_number} | {percentage:.1f}% | {status}{pressed}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+"""
+Benchmark - post-call analysis throughput and cost per call
+
+Runs synthetic finished conversations through AnalysisWorker against the
+local stand-in chat server (structured JSON replies), for several batch
+sizes, plus the local rules fallback. Cost uses the configured token prices.
+
+Run: python benchmarks/bench_analysis.py [--calls 50] [--latency 0.6]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.openai_server import StandInOpenAIServer
+
+USER_LINES = [
+    "कौन कौन से कोर्स हैं", "फीस कितनी है", "हां ठीक है कल आऊंगा", "नहीं मुझे जरूरत नहीं",
+    "टाइमिंग क्या है", "busy hoon baad me", "address bata do", "haan interested hoon",
+]
+AI_LINES = [
+    "Humare paas MS Office, Excel, Tally courses hain. Sirf 3000 me!",
+    "Aap Monday se Saturday, 9 se 6 baje tak aa sakte hain.",
+]
+
+
+def make_history(rng):
+    history = []
+    for _ in range(rng.randint(1, 4)):
+        history.append({"role": "user", "content": rng.choice(USER_LINES)})
+        history.append({"role": "assistant", "content": rng.choice(AI_LINES)})
+    return history
+
+
+def structured_reply(messages):
+    """Stand-in model: answer every id in the batch with schema-valid JSON"""
+    items = json.loads(messages[-1]["content"])
+    return json.dumps({"results": [
+        {"id": item["id"], "interest": "NEUTRAL", "result": "POSITIVE", "summary": "Course ke baare me poocha"}
+        for item in items
+    ]})
+
+
+def run(llm, histories, batch_size):
+    from analysis_worker import AnalysisWorker
+
+    done = threading.Event()
+    results = {}
+
+    def on_result(job_id, analysis):
+        results[job_id] = analysis
+        if len(results) == len(histories):
+            done.set()
+
+    llm.campaign_usage.reset()
+    worker = AnalysisWorker(llm, on_result, batch_size=batch_size, max_wait=0.2)
+    start = time.perf_counter()
+    worker.start()
+    for i, history in enumerate(histories):
+        worker.submit(i, history)
+    done.wait(timeout=300)
+    elapsed = time.perf_counter() - start
+    worker.stop()
+
+    usage = llm.campaign_usage.as_dict()
+    return {
+        "batch_size": batch_size,
+        "calls": len(results),
+        "requests": usage["requests"],
+        "calls_per_sec": round(len(results) / elapsed, 2),
+        "tokens_per_call": round((usage["prompt_tokens"] + usage["completion_tokens"]) / len(histories), 1),
+        "cost_per_call_usd": round(usage["cost_usd"] / len(histories), 8),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.6)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    histories = [make_history(rng) for _ in range(args.calls)]
+
+    server = StandInOpenAIServer(latency=args.latency, replies=structured_reply).start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    from llm_engine import LLMEngine
+    from analysis_worker import classify_local
+
+    report = {"calls": args.calls, "server_latency_ms": args.latency * 1000, "runs": []}
+    try:
+        llm = LLMEngine()
+        for batch_size in (1, 5, 10):
+            report["runs"].append(run(llm, histories, batch_size))
+    finally:
+        server.stop()
+
+    start = time.perf_counter()
+    for history in histories:
+        classify_local(history)
+    report["local_calls_per_sec"] = round(args.calls / (time.perf_counter() - start), 1)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
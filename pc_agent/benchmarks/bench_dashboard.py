@@ -0,0 +1,96 @@
+"""
+Benchmark - dashboard refresh cost vs campaign size
+
+Fills a CampaignAggregate with N calls (dial, pickup, listen, result,
+3 response latencies each) and times snapshot() - what the GUI runs every
+second. For comparison it also times the re-read approach: loading
+audio_tracking.xlsx with --excel-rows rows and recomputing the same
+listen-through numbers.
+
+Run: python benchmarks/bench_dashboard.py [--sizes 100 10000 1000000] [--excel-rows 2000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from campaign_stats import CampaignAggregate
+
+RESULTS = ["POSITIVE", "NEGATIVE", "CALLBACK", "NO_RESPONSE"]
+
+
+def fill(stats, calls, rng):
+    for _ in range(calls):
+        stats.record_dial()
+        if rng.random() < 0.6:
+            stats.record_pickup()
+            stats.record_listen(rng.uniform(0, 100))
+            stats.record_result("INTERESTED" if rng.random() < 0.3 else "NOT_INTERESTED", rng.choice(RESULTS))
+            for _ in range(3):
+                stats.record_response(rng.lognormvariate(0.0, 0.4))
+        else:
+            stats.record_unanswered()
+
+
+def time_snapshot(stats, repeats=200):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        snap = stats.snapshot()
+    return (time.perf_counter() - start) / repeats * 1e6, snap
+
+
+def time_excel_reread(rows, rng):
+    """Old way: open the tracking workbook and recompute from every row"""
+    from audio_tracker import AudioTracker
+    from openpyxl import load_workbook
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "audio_tracking.xlsx")
+        AudioTracker(path).prepare()  # Same headers as the real sheet
+        wb = load_workbook(path)
+        ws = wb.active
+        for i in range(rows):
+            pct = rng.uniform(0, 100)
+            ws.append([f"98200{i:05d}", "2026-01-01 10:00:00", 30.0, round(pct * 0.3, 1), f"{pct:.1f}%", "-"])
+        wb.save(path)
+
+        start = time.perf_counter()
+        wb = load_workbook(path, read_only=True)
+        values = [float(str(r[4]).rstrip("%")) for r in wb.active.iter_rows(min_row=2, values_only=True)]
+        _ = sum(values) / len(values)
+        return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 1000000])
+    parser.add_argument("--excel-rows", type=int, default=2000, help="0 skips the Excel comparison")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    import logging
+    from config import logger
+    logger.setLevel(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    results = {}
+    for size in args.sizes:
+        stats = CampaignAggregate()
+        fill(stats, size, rng)
+        us, snap = time_snapshot(stats)
+        results[size] = {"snapshot_us": round(us, 1), "response_p50_ms": snap["response_p50_ms"],
+                         "pickup_rate_pct": snap["pickup_rate_pct"]}
+
+    report = {"aggregate": results}
+    if args.excel_rows:
+        report["excel_reread_ms"] = {args.excel_rows: round(time_excel_reread(args.excel_rows, rng), 1)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
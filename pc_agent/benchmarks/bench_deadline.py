@@ -0,0 +1,82 @@
+"""
+Benchmark - turn latency with deadlines + hedging vs plain blocking call
+
+The local stand-in chat server injects heavy-tailed latency (most requests
+fast, some slow, a few stalled). Each turn is run once through
+LLMEngine.generate_response (no budget) and once through DeadlineResponder,
+and p50/p95/p99 turn latency is reported for both.
+
+Run: python benchmarks/bench_deadline.py [--turns 40] [--seed 1]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.openai_server import StandInOpenAIServer
+
+
+def heavy_tail(rng, lock):
+    """80% normal, 15% slow, 5% stalled"""
+    def sample():
+        with lock:
+            r = rng.random()
+            if r < 0.80:
+                return rng.uniform(0.3, 0.8)
+            if r < 0.95:
+                return rng.uniform(1.5, 3.0)
+            return 8.0
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = StandInOpenAIServer(latency=heavy_tail(rng, threading.Lock()), token_delay=0.01).start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    from llm_engine import LLMEngine
+    from deadline import DeadlineResponder
+    from latency_stats import LatencyStats
+
+    try:
+        llm = LLMEngine()
+
+        baseline = LatencyStats()
+        for _ in range(args.turns):
+            llm.reset_conversation()
+            start = time.monotonic()
+            llm.generate_response("Fees kitni hai?")
+            baseline.add(time.monotonic() - start)
+
+        responder = DeadlineResponder(llm)
+        for _ in range(args.turns):
+            llm.reset_conversation()
+            responder.respond("Fees kitni hai?", on_soft_deadline=lambda: None)
+    finally:
+        server.stop()
+
+    print(json.dumps({
+        "turns": args.turns,
+        "budget_s": {
+            "soft": responder.soft_deadline,
+            "hedge": responder.hedge_delay,
+            "hard": responder.hard_deadline,
+        },
+        "baseline": baseline.summary(),
+        "deadline_aware": responder.as_dict(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
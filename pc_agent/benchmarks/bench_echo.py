@@ -0,0 +1,172 @@
+"""
+Benchmark - echo cancellation (GCC-PHAT delay + block NLMS) on a synthetic room
+
+Per scenario (--delays x --gains): --seconds of the agent talking (synthetic
+voice + fricative noise, short pauses) through a speaker -> mic path =
+delay + direct sound + exponentially decaying reflections, times gain.
+Each utterance is its own player start, 0-15 ms later than the agent
+thinks. The caller talks over it twice (double-talk) and once alone. Fed in
+1024-sample chunks; read() timestamps ~1 ms late, 2% of them 50 ms late.
+
+  delay_error_ms    - estimated vs true delay
+  erle_db           - echo removed while only the agent talks: measured (vs the
+                      known echo, after --settle s, everything the canceller does) and
+                      live (canceller.stats() once converged - filter alone / total)
+  converge_ms       - playback time until the filter converges (half duplex till then)
+  double_talk_db    - echo removed while both talk, counting any of the caller lost
+  near_loss_db      - caller's voice lost when alone (should be ~0)
+CPU: cpu_ms_per_audio_s (and realtime_factor) over everything processed.
+
+Run: python benchmarks/bench_echo.py [--rate 16000] [--seconds 20] [--delays 0.04 0.15 0.3] [--gains 0.3 1.0]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.audio import speech_samples
+from echo_canceller import EchoCanceller
+
+CHUNK = 1024
+T0 = 1000.0  # Player start on the fake monotonic clock
+
+
+def far_end(rng, rate, seconds):
+    """Agent's side: [(start sample, utterance)] with pauses, voiced + a bit of noise-like consonants"""
+    utterances = []
+    at = 0
+    while at < seconds * rate:
+        talk = rng.uniform(1.5, 4.0)
+        voice = speech_samples(talk, rate, seed=int(rng.integers(1 << 30)), level=float(rng.uniform(4000, 8000)))
+        hiss = rng.normal(0, 1, voice.size)
+        hiss = np.convolve(hiss, [1, -0.9], "same") * 600 * (rng.random(voice.size // 800 + 1) < 0.3).repeat(800)[:voice.size]
+        utterances.append((at, (voice + hiss)[:int(seconds * rate) - at]))
+        at += voice.size + int(rng.uniform(0.3, 1.0) * rate)
+    return utterances
+
+
+def room(rng, rate, delay, gain, tail=0.06, decay=0.012):
+    """Impulse response: direct sound at `delay`, then decaying reflections"""
+    d = int(delay * rate)
+    t = np.arange(int(tail * rate)) / rate
+    reflections = rng.normal(0, 0.25, t.size) * np.exp(-t / decay)
+    reflections[0] = 1.0
+    response = np.zeros(d + t.size)
+    response[d:] = reflections
+    return gain * response
+
+
+def near_end(rng, rate, size, spans, pitch=1.8):
+    """Caller's side: another voice - synthesized slower and played faster = higher pitch"""
+    out = np.zeros(size)
+    for start, end in spans:
+        lo, hi = int(start * rate), min(size, int(end * rate))
+        voice = speech_samples((hi - lo) / rate * pitch, rate / pitch, seed=int(rng.integers(1 << 30)), level=3000)
+        out[lo:lo + voice.size] = voice[:hi - lo]
+    return out
+
+
+def run(args, rng, delay, gain):
+    rate = args.rate
+    size = int(args.seconds * rate)
+    utterances = far_end(rng, rate, args.seconds)
+    # What actually played: every player start a bit later than its timestamp
+    far = np.zeros(size + int(0.015 * rate))
+    latencies = rng.integers(0, int(0.015 * rate), len(utterances))
+    for (at, voice), late in zip(utterances, latencies):
+        far[at + late:at + late + voice.size] += voice
+    echo = np.convolve(far, room(rng, rate, delay, gain))[:size]
+    s = args.seconds
+    dt_spans = [(0.45 * s, 0.55 * s), (0.75 * s, 0.8 * s)]
+    near_spans = dt_spans + [(s + 0.5, s + 2.5)]  # Caller alone after the agent stops
+    total = size + 3 * rate
+    near = near_end(rng, rate, total, near_spans)
+    noise = rng.normal(0, 30, total)
+    capture = np.concatenate((echo, np.zeros(total - size))) + near + noise
+    capture = np.clip(capture, -32768, 32767).astype(np.int16)
+
+    canceller = EchoCanceller(rate)
+    out = np.zeros(total)
+    spent = 0.0
+    pending = list(utterances)
+    converge = None
+    for start in range(0, total, CHUNK):
+        while pending and pending[0][0] < start + CHUNK:
+            at, voice = pending.pop(0)
+            canceller.reference.play(voice.astype(np.float32), T0 + at / rate)
+        # read() returns late, never early: ~1 ms scheduling + now and then a 50 ms stall
+        at = T0 + start / rate + rng.exponential(0.001) + (0.05 if rng.random() < 0.02 else 0.0)
+        t0 = time.perf_counter()
+        out[start:start + CHUNK] = canceller.process(capture[start:start + CHUNK], at)
+        spent += time.perf_counter() - t0
+        if converge is None and canceller.converged:
+            converge = round((start + CHUNK) / rate * 1000)
+
+    # Score by region (ground truth)
+    t = np.arange(total) / rate
+    in_near = np.zeros(total, dtype=bool)
+    for lo, hi in near_spans:
+        in_near |= (t >= lo) & (t < hi)
+    echo_full = np.concatenate((echo, np.zeros(total - size)))
+    audible = np.abs(echo_full) > 0
+    residual = out - near - noise
+
+    far_only = audible & ~in_near & (t >= args.settle)
+    both = audible & in_near
+    alone = in_near & (t >= s + 0.5)
+    capture_f = capture.astype(np.float64)
+
+    def db(a, b):
+        return round(float(10 * np.log10(np.sum(a * a) / np.sum(b * b))), 1) if np.sum(b * b) else None
+
+    stats = canceller.stats()
+    return {
+        "delay_ms": round(delay * 1000),
+        "gain": gain,
+        # Estimate includes the last utterance's player latency
+        "delay_error_ms": round(stats["delay_ms"] - (delay + latencies[-1] / rate) * 1000, 2) if stats["delay_ms"] is not None else None,
+        "erle_db": {"measured": db(capture_f[far_only], out[far_only]),
+                    "live_filter": stats["erle_converged_db"], "live_total": stats["erle_total_db"]},
+        "converge_ms": converge,
+        "double_talk_db": db(echo_full[both], residual[both]),
+        "near_loss_db": db(near[alone], out[alone] - noise[alone]),
+    }, spent, total / rate
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rate", type=int, default=16000)
+    parser.add_argument("--seconds", type=float, default=20, help="Agent talk per scenario")
+    parser.add_argument("--delays", type=float, nargs="+", default=[0.04, 0.15, 0.3])
+    parser.add_argument("--gains", type=float, nargs="+", default=[0.3, 1.0])
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds before ERLE counts")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    scenarios = []
+    spent = audio = 0.0
+    for delay in args.delays:
+        for gain in args.gains:
+            result, cpu, seconds = run(args, rng, delay, gain)
+            scenarios.append(result)
+            spent += cpu
+            audio += seconds
+
+    print(json.dumps({
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "rate": args.rate,
+        "cpu_ms_per_audio_s": round(spent / audio * 1000, 2),
+        "realtime_factor": round(audio / spent),
+        "scenarios": scenarios,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
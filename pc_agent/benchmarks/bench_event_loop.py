@@ -0,0 +1,226 @@
+"""
+Benchmark - CallingAgent call-flow overhead with stubbed engines
+
+Runs scripted calls through the real CallingAgent with a stub detector
+(pickup/hangup), stub listener (scripted transcripts), stub TTS (records
+when speech starts) and the local stand-in chat server. Reports:
+  pickup -> first audio     (opening pitch starts)
+  transcript -> AI speech   (per turn, includes the LLM round trip)
+
+Run: python benchmarks/bench_event_loop.py [--calls 5] [--llm-latency 0.0]
+"""
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.openai_server import StandInOpenAIServer
+
+SCRIPT = ["fees kitni hai", "timing kya hai", "theek hai bye"]
+
+
+class StubDetector:
+    """Picks up N calls one after another; next call starts when the agent hangs up"""
+
+    def __init__(self, calls, dial_gap=0.5):
+        self.calls = calls
+        self.dial_gap = dial_gap  # Start / hangup -> next pickup
+        self.adb_path = "stub"
+        self.on_ringing = None
+        self.on_pickup = None
+        self.on_hangup = None
+        self.pickups = []
+        self.done = threading.Event()
+        self._ended = threading.Event()
+
+    def start_monitoring(self):
+        threading.Thread(target=self._drive, daemon=True).start()
+        return True
+
+    def stop_monitoring(self):
+        pass
+
+    def hang_up_call(self):
+        self._ended.set()
+        return True
+
+    def _drive(self):
+        for i in range(self.calls):
+            time.sleep(self.dial_gap)
+            self._ended.clear()
+            self.pickups.append(time.monotonic())
+            self.on_pickup(f"98200{i:05d}")
+            self._ended.wait(timeout=60)
+            self.on_hangup()
+        self.done.set()
+
+
+class StubTTS:
+    def __init__(self, speak_time):
+        self.speak_time = speak_time
+        self.spoken = []  # monotonic time each utterance started
+        self._playing = False
+        self.last_first_byte_at = None
+        self.last_playback_at = None
+
+    def speak(self, text):
+        now = time.monotonic()
+        self.spoken.append(now)
+        self.last_first_byte_at = self.last_playback_at = now
+        time.sleep(self.speak_time)
+
+    def play_cached(self, text):
+        self.speak(text)
+
+    def play_file(self, path):
+        self.speak(path)
+        return True
+
+    def get_audio_duration(self, path):
+        return self.speak_time
+
+    def prepare(self, phrases):
+        pass
+
+    def preload(self, file_path):
+        pass
+
+    def stop(self):
+        pass
+
+
+class StubListener:
+    """Says the next scripted line `speech_delay` seconds after listening starts"""
+
+    def __init__(self, speech_delay):
+        self.speech_delay = speech_delay
+        self.on_text = None
+        self.on_partial = None
+        self.text_queue = queue.Queue()
+        self.said = []  # monotonic time each transcript was delivered
+        self.is_listening = False
+        self._line = 0
+        self._generation = 0
+
+    def calibrate(self):
+        pass
+
+    def start_continuous(self):
+        if self.is_listening:
+            return
+        self.is_listening = True
+        self._generation += 1
+        threading.Timer(self.speech_delay, self._say, args=(self._generation,)).start()
+
+    def stop_continuous(self, wait=True):
+        self.is_listening = False
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def _say(self, generation):
+        if generation != self._generation or not self.is_listening:
+            return
+        text = SCRIPT[self._line % len(SCRIPT)]
+        self._line += 1
+        self.said.append(time.monotonic())
+        if self.on_text:
+            self.on_text(text)
+        else:
+            self.text_queue.put(text)
+
+    def get_text(self):
+        try:
+            return self.text_queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def clear_queue(self):
+        while not self.text_queue.empty():
+            self.text_queue.get_nowait()
+
+
+class NullExcel:
+    def prepare(self):
+        pass
+
+    def save_result(self, *args, **kwargs):
+        return None
+
+    def save_campaign_usage(self, usage):
+        pass
+
+    def update_analysis(self, row, analysis):
+        pass
+
+
+class NullTracker:
+    def prepare(self):
+        pass
+
+    def log_call(self, *args, **kwargs):
+        pass
+
+
+def first_after(times, start):
+    return next((t for t in times if t >= start), None)
+
+
+def summarize(samples):
+    from latency_stats import LatencyStats
+    stats = LatencyStats()
+    for s in samples:
+        stats.add(s)
+    return dict(stats.summary(), avg_ms=round(sum(samples) / len(samples) * 1000, 1) if samples else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--speech-delay", type=float, default=0.3)
+    parser.add_argument("--speak-time", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = StandInOpenAIServer(latency=args.llm_latency).start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    from main import CallingAgent
+
+    detector = StubDetector(args.calls)
+    tts = StubTTS(args.speak_time)
+    listener = StubListener(args.speech_delay)
+    agent = CallingAgent(
+        "missing_opening.mp3", ai_mode=True, show_banner=False,
+        detector=detector, tts=tts, listener=listener,
+        excel=NullExcel(), audio_tracker=NullTracker()
+    )
+
+    runner = threading.Thread(target=agent.start, daemon=True)
+    runner.start()
+    detector.done.wait(timeout=60 * args.calls)
+    agent.stop()
+    runner.join(timeout=10)
+    server.stop()
+
+    pickup = [first_after(tts.spoken, t) - t for t in detector.pickups]
+    turns = [first_after(tts.spoken, t) - t for t in listener.said if first_after(tts.spoken, t)]
+    print(json.dumps({
+        "calls": args.calls,
+        "llm_latency_ms": args.llm_latency * 1000,
+        "pickup_to_audio": summarize(pickup),
+        "transcript_to_speech": summarize(turns),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Benchmark - phone call-state HTTP server under load (localhost)
+
+--phones client threads each push call states (ringing -> active -> ended,
+plus GET /status) back to back for --duration seconds, while --slow
+extra connections send half a request and then stall (phone on bad WiFi).
+Reports requests/sec, p50/p99 latency and errors for:
+  current  - HTTPCallServer (thread per connection, keep-alive)
+  legacy   - old setup: single-threaded HTTPServer, connection closed after
+             every response (slow clients hold it for --slow-hold seconds)
+
+Run: python benchmarks/bench_http_server.py [--phones 32] [--duration 5] [--slow 4]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import HTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import logger
+from latency_stats import LatencyStats
+
+REQUESTS = [
+    ("POST", "/call/ringing"),
+    ("POST", "/call/active"),
+    ("GET", "/status"),
+    ("POST", "/call/ended"),
+]
+
+
+def start_server(mode):
+    """Returns (port, stop)"""
+    from http_server import HTTPCallServer, CallHandler
+
+    if mode == "current":
+        server = HTTPCallServer(host="127.0.0.1", port=0)
+        server.start()
+        return server.port, server.stop
+
+    class LegacyHandler(CallHandler):
+        protocol_version = "HTTP/1.0"
+        timeout = None
+
+    httpd = HTTPServer(("127.0.0.1", 0), LegacyHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    def stop():
+        httpd.shutdown()
+        httpd.server_close()
+    return httpd.server_address[1], stop
+
+
+def phone(port, index, stop_at, keep_alive, latencies, errors):
+    body = json.dumps({"number": f"98200{index:05d}", "direction": "outgoing"})
+    conn = None
+    i = 0
+    while time.monotonic() < stop_at:
+        method, path = REQUESTS[i % len(REQUESTS)]
+        i += 1
+        start = time.monotonic()
+        try:
+            if conn is None:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            if method == "POST":
+                conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            else:
+                conn.request(method, path)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+            latencies.append(time.monotonic() - start)
+            if not keep_alive or response.will_close:
+                conn.close()
+                conn = None
+        except Exception as e:
+            errors.append(type(e).__name__)
+            if conn:
+                conn.close()
+            conn = None
+    if conn:
+        conn.close()
+
+
+def slow_client(port, hold, stop_at):
+    """Half a request, then silence - until the server drops it or `hold` passes"""
+    while time.monotonic() < stop_at:
+        try:
+            sock = socket.create_connection(("127.0.0.1", port), timeout=hold)
+            sock.sendall(b"POST /call/active HTTP/1.1\r\nHost: phone\r\n")
+            try:
+                sock.recv(1)  # Returns when the server gives up on us
+            except socket.timeout:
+                pass
+            sock.close()
+        except OSError:
+            time.sleep(0.1)
+
+
+def run(mode, args):
+    port, stop = start_server(mode)
+    stop_at = time.monotonic() + args.duration
+    latencies, errors = [], []
+
+    slow = [threading.Thread(target=slow_client, args=(port, args.slow_hold, stop_at), daemon=True)
+            for _ in range(args.slow)]
+    for t in slow:
+        t.start()
+    time.sleep(0.2)  # Let the slow clients get in first
+
+    keep_alive = mode == "current"
+    phones = [threading.Thread(target=phone, args=(port, i, stop_at, keep_alive, latencies, errors))
+              for i in range(args.phones)]
+    wall_start = time.monotonic()
+    for t in phones:
+        t.start()
+    for t in phones:
+        t.join(timeout=args.duration + 60)
+    wall = time.monotonic() - wall_start
+    stop()
+
+    stats = LatencyStats(maxlen=None)
+    for latency in latencies:
+        stats.add(latency)
+    return dict(
+        stats.summary(),
+        requests_per_sec=round(len(latencies) / wall, 1),
+        errors=len(errors),
+        error_kinds=sorted(set(map(str, errors)))[:5],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phones", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--slow", type=int, default=4, help="Stalled half-open connections")
+    parser.add_argument("--slow-hold", type=float, default=2.0, help="Legacy: how long a stalled client holds on")
+    parser.add_argument("--mode", choices=["current", "legacy", "both"], default="both")
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)  # Every state change logs at INFO
+    modes = ["legacy", "current"] if args.mode == "both" else [args.mode]
+    results = {mode: run(mode, args) for mode in modes}
+    print(json.dumps({"phones": args.phones, "slow_clients": args.slow, "duration_s": args.duration,
+                      **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
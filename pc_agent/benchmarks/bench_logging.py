@@ -0,0 +1,123 @@
+"""
+Benchmark - logging cost on the calling thread, per call
+
+One simulated call logs --lines records (mostly DEBUG polls / timings,
+some INFO transcripts and replies, like a real AI call). The console is a
+stream that takes --console-us microseconds per write (Windows console is
+slow; 0 = /dev/null). Reports caller-thread time per record and per call:
+  legacy - basicConfig: StreamHandler + FileHandler written inline
+  queue  - log_setup.setup_logging: QueueHandler -> background listener
+           (size rotation at --max-bytes, gzip, --json for JSON lines)
+plus how many rotated .gz files the queue run left behind.
+
+Run: python benchmarks/bench_logging.py [--calls 20] [--lines 300] [--console-us 50]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: F401 - sets up logging once, replaced below
+from log_setup import setup_logging, stop_logging, rotated_files
+
+
+class SlowStream:
+    """Console stand-in: every write costs `delay` seconds"""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.sink = open(os.devnull, "w", encoding="utf-8")
+
+    def write(self, text):
+        if self.delay:
+            time.sleep(self.delay)  # Like a real console write, releases the GIL
+        self.sink.write(text)
+
+    def flush(self):
+        pass
+
+
+def one_call(logger, lines, call):
+    for i in range(lines):
+        if i % 10 == 0:
+            logger.info(f"🎤 [WHISPER] User: \"haan ji bataiye course ka fees kitna hai\" ({call}/{i})")
+        else:
+            logger.debug(f"📞 State: OFFHOOK | poll {i} | number 98200{call:05d} | 12.3ms")
+
+
+def run(mode, args, directory):
+    log_file = os.path.join(directory, f"{mode}.log")
+    fmt, datefmt = config.LOG_FORMAT, config.LOG_DATE_FORMAT
+    stream = SlowStream(args.console_us / 1e6)
+
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    if mode == "legacy":
+        console = logging.StreamHandler(stream)
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        for handler in (console, file_handler):
+            handler.setFormatter(logging.Formatter(fmt, datefmt))
+            root.addHandler(handler)
+        root.setLevel(logging.DEBUG)
+    else:
+        real_stderr, sys.stderr = sys.stderr, stream
+        try:
+            setup_logging(logging.DEBUG, log_file, fmt, datefmt, max_bytes=args.max_bytes,
+                          backup_count=1000, json_lines=args.json)
+        finally:
+            sys.stderr = real_stderr
+
+    logger = logging.getLogger("CallingAgent")
+    per_call = []
+    for call in range(args.calls):
+        start = time.perf_counter()
+        one_call(logger, args.lines, call)
+        per_call.append(time.perf_counter() - start)
+
+    drain_start = time.perf_counter()
+    if mode == "legacy":
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+    else:
+        stop_logging()
+    drain_ms = (time.perf_counter() - drain_start) * 1000
+
+    per_call.sort()
+    return {
+        "per_record_us": round(sum(per_call) / (args.calls * args.lines) * 1e6, 2),
+        "per_call_ms_p50": round(per_call[len(per_call) // 2] * 1000, 2),
+        "per_call_ms_max": round(per_call[-1] * 1000, 2),
+        "drain_after_ms": round(drain_ms, 1),
+        "rotated_gz_files": len([p for p in rotated_files(log_file) if p.endswith(".gz")]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=300, help="Log records per call")
+    parser.add_argument("--console-us", type=float, default=50.0, help="Cost of one console write")
+    parser.add_argument("--max-bytes", type=int, default=256 * 1024, help="Queue run: rotate size")
+    parser.add_argument("--json", action="store_true", help="Queue run: JSON lines file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {mode: run(mode, args, directory) for mode in ("legacy", "queue")}
+    legacy, new = results["legacy"]["per_call_ms_p50"], results["queue"]["per_call_ms_p50"]
+    print(json.dumps({
+        "calls": args.calls, "lines_per_call": args.lines, "console_us": args.console_us,
+        **results,
+        "speedup": round(legacy / new, 1) if new else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark - cost of the metrics hot path
+
+Times (ns per op, single thread and --threads contending) for:
+  baseline         - empty function call (what a no-op stub would cost)
+  counter.inc      - unlabeled counter
+  labels().inc     - label lookup + inc (how most call sites use it)
+  histogram        - labeled histogram observe (bisect + lock)
+  tracer.interval  - a span with the trace file off (now also a histogram sample)
+and the /metrics render time for the registry after all of the above.
+The "per call" line multiplies by a rough count of metric updates in one
+AI call (~200: adb polls, transcripts, tokens, queue waits, spans).
+
+Run: python benchmarks/bench_metrics.py [--ops 200000] [--threads 4]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import metrics
+from tracing import Tracer
+
+UPDATES_PER_CALL = 200
+
+
+def time_ops(fn, ops, threads):
+    """ns per op, every thread running `ops` iterations"""
+    def worker():
+        for _ in range(ops):
+            fn()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return round((time.perf_counter() - start) * 1e9 / (ops * threads), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    plain = metrics.counter("bench_plain_total", "Unlabeled")
+    labeled = metrics.counter("bench_labeled_total", "Labeled", ["source", "result"])
+    hist = metrics.histogram("bench_seconds", "Histogram", ["stage"])
+    tracer = Tracer(enabled=False)
+
+    def baseline():
+        pass
+
+    cases = {
+        "baseline": baseline,
+        "counter.inc": plain.inc,
+        "labels().inc": lambda: labeled.labels("adb", "first").inc(),
+        "histogram": lambda: hist.labels("llm").observe(0.042),
+        "tracer.interval": lambda: tracer.interval("bench.span", 1.0, 1.05),
+    }
+
+    results = {}
+    for name, fn in cases.items():
+        results[name] = {
+            "ns_single": time_ops(fn, args.ops, 1),
+            f"ns_{args.threads}_threads": time_ops(fn, args.ops // args.threads, args.threads),
+        }
+
+    start = time.perf_counter()
+    text = metrics.render()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    worst = max(r["ns_single"] for r in results.values()) - results["baseline"]["ns_single"]
+    print(json.dumps({
+        "ops": args.ops,
+        "results": results,
+        "render_ms": round(render_ms, 2),
+        "render_bytes": len(text),
+        "per_call_overhead_us": round(worst * UPDATES_PER_CALL / 1000, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
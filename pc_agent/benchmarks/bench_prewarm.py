@@ -0,0 +1,69 @@
+"""
+Benchmark - first-turn latency with and without connection pre-warm
+
+Starts a local HTTPS stand-in server that charges a fixed delay for every new
+connection (standing in for RTT + TLS setup), then times the first chat
+request of a "call" on a fresh client:
+  cold   - request goes out on a brand-new client
+  warm   - prewarm (GET /models) ran during RINGING, request reuses the socket
+
+Run: python benchmarks/bench_prewarm.py [--calls 10] [--connect-delay 0.15]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openai_client import build_client, warm_connection
+from simulator.openai_server import StandInOpenAIServer
+
+
+def first_turn(client):
+    start = time.perf_counter()
+    client.chat.completions.create(
+        model="standin",
+        messages=[{"role": "user", "content": "Fees kitni hai?"}],
+        max_tokens=50
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--connect-delay", type=float, default=0.15)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    server = StandInOpenAIServer(
+        latency=args.latency, connect_delay=args.connect_delay, tls=True
+    ).start()
+
+    cold, warm = [], []
+    try:
+        for _ in range(args.calls):
+            client = build_client(api_key="bench", base_url=server.base_url, verify=False)
+            cold.append(first_turn(client))
+            client.close()
+
+            client = build_client(api_key="bench", base_url=server.base_url, verify=False)
+            warm_connection(client)  # RINGING
+            warm.append(first_turn(client))  # Caller answered
+            client.close()
+    finally:
+        server.stop()
+
+    print(f"First-turn latency over {args.calls} calls "
+          f"(connect delay {args.connect_delay * 1000:.0f}ms, server {args.latency * 1000:.0f}ms)")
+    for name, values in (("cold", cold), ("warm", warm)):
+        print(f"  {name:5s} median {statistics.median(values) * 1000:7.1f}ms | "
+              f"max {max(values) * 1000:7.1f}ms")
+    print(f"  saved {(statistics.median(cold) - statistics.median(warm)) * 1000:.1f}ms per call")
+    print(f"  server connections: {server.stats.get('connections', 0)}")
+
+
+if __name__ == "__main__":
+    main()
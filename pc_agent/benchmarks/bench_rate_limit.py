@@ -0,0 +1,87 @@
+"""
+Benchmark - request scheduler against a rate-limited server
+
+The local stand-in server allows only --server-rps requests per second per
+endpoint and answers 429 (Retry-After + x-ratelimit headers) above that.
+A burst of background analysis requests is queued, then live turns arrive
+while the burst is still waiting. Reports 429s seen, failures, and wait
+time per priority lane (live turns should jump the queue).
+
+Run: python benchmarks/bench_rate_limit.py [--server-rps 5] [--background 30] [--live 10]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.openai_server import StandInOpenAIServer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server-rps", type=int, default=5)
+    parser.add_argument("--background", type=int, default=30)
+    parser.add_argument("--live", type=int, default=10)
+    args = parser.parse_args()
+
+    server = StandInOpenAIServer(latency=0.05, rate_limit_rps=args.server_rps).start()
+    os.environ["OPENAI_API_KEY"] = "bench"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    from llm_engine import LLMEngine, SYSTEM_MESSAGE
+    from rate_limiter import RequestScheduler, LIVE, BACKGROUND
+
+    llm = LLMEngine()
+    # Client-side limit deliberately above the server's so 429s actually happen
+    llm.scheduler = RequestScheduler({"chat": (args.server_rps * 60 * 2, None)})
+
+    failures = []
+    turn_latency = {"live": [], "background": []}
+    lock = threading.Lock()
+
+    def request(priority):
+        lane = "live" if priority == LIVE else "background"
+        messages = [SYSTEM_MESSAGE, {"role": "user", "content": "Fees kitni hai?"}]
+        start = time.monotonic()
+        try:
+            llm._complete(messages, max_tokens=50, temperature=0.7, priority=priority)
+        except Exception as e:
+            with lock:
+                failures.append(f"{lane}: {e}")
+            return
+        with lock:
+            turn_latency[lane].append(time.monotonic() - start)
+
+    try:
+        threads = [threading.Thread(target=request, args=(BACKGROUND,)) for _ in range(args.background)]
+        for t in threads:
+            t.start()
+        time.sleep(0.5)  # Burst is now queued / throttled
+        live = [threading.Thread(target=request, args=(LIVE,)) for _ in range(args.live)]
+        for t in live:
+            t.start()
+            time.sleep(0.2)
+        for t in threads + live:
+            t.join()
+    finally:
+        server.stop()
+
+    def avg_ms(values):
+        return round(sum(values) / len(values) * 1000, 1) if values else None
+
+    print(json.dumps({
+        "server_rps": args.server_rps,
+        "requests": args.background + args.live,
+        "server_429s": server.stats.get("status_429", 0),
+        "failures": failures,
+        "avg_latency_ms": {lane: avg_ms(v) for lane, v in turn_latency.items()},
+        "scheduler": llm.scheduler.stats()["chat"],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark - per-call recording (ring buffer + background encoder), concurrent calls
+
+Per --calls N: N recorders at once for --seconds of wall time, each with its
+own "mic" thread pushing --chunk samples at --mic-rate in real time (synthetic
+speech, like the capture path does) and the agent's voice played into its
+playback track every few seconds. --mode both = stereo mic + agent.
+
+  audio_thread_us   - write_mic() per chunk, p50 / p99 / max (the only cost the mic reader sees)
+  worker_cpu_pct    - per call: resample + mix + hand to the encoder, % of one core
+  encoder_cpu_pct   - per call: ffmpeg processes (0 with the WAV fallback - that's in the worker)
+  memory_kb         - per call: Python/numpy allocations while recording (ring buffer included)
+  file_kb_per_min   - per call
+  dropped_s         - mic audio lost to a full ring (should be 0)
+
+Run: python benchmarks/bench_recording.py [--calls 1 4 16] [--seconds 10] [--mode both] [--mic-rate 48000]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.audio import speech_samples
+import call_recorder
+from call_recorder import CallRecorder
+
+
+def _children_cpu():
+    try:
+        import resource
+    except ImportError:
+        return 0.0  # Windows
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run(args, calls, directory):
+    voice = np.rint(speech_samples(4.0, args.mic_rate, seed=1, level=3000)).astype(np.int16)
+    agent = np.rint(speech_samples(2.0, args.rate, seed=2, level=5000)).astype(np.int16)
+    writer = call_recorder._WavWriter if args.format == "wav" else None
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    recorders = [CallRecorder(f"98200{i:05d}", args.mode, mic_rate=args.mic_rate, directory=directory,
+                              rate=args.rate, writer=writer).start() for i in range(calls)]
+    children_before = _children_cpu()
+    timings = [[] for _ in recorders]
+    stop = threading.Event()
+
+    def mic(recorder, spent):
+        """Real-time pace: one chunk per chunk duration, on a fixed schedule"""
+        period = args.chunk / args.mic_rate
+        next_at = time.monotonic()
+        position = 0
+        while not stop.is_set():
+            next_at += period
+            delay = next_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            chunk = np.take(voice, np.arange(position, position + args.chunk), mode="wrap")
+            position += args.chunk
+            t0 = time.perf_counter()
+            recorder.write_mic(chunk, time.monotonic() - period)
+            spent.append(time.perf_counter() - t0)
+
+    def speaker(recorder):
+        while not stop.wait(3.0):
+            if recorder.playback is not None:
+                recorder.playback.play(agent, time.monotonic())
+
+    threads = [threading.Thread(target=mic, args=(r, t), daemon=True) for r, t in zip(recorders, timings)]
+    threads += [threading.Thread(target=speaker, args=(r,), daemon=True) for r in recorders]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    peak = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    for recorder in recorders:
+        recorder.finish()
+    for recorder in recorders:
+        recorder.wait()
+    encoder_cpu = _children_cpu() - children_before
+
+    spent = np.concatenate([np.array(t) for t in timings]) * 1e6
+    seconds = [r.seconds for r in recorders]
+    sizes = [os.path.getsize(r.path) for r in recorders if os.path.exists(r.path)]
+    return {
+        "calls": calls,
+        "format": recorders[0]._writer_class.format,
+        "audio_thread_us": {"p50": round(float(np.percentile(spent, 50)), 1),
+                            "p99": round(float(np.percentile(spent, 99)), 1),
+                            "max": round(float(spent.max()), 1)},
+        "worker_cpu_pct": round(sum(r.cpu_seconds for r in recorders) / sum(seconds) * 100, 3),
+        "encoder_cpu_pct": round(encoder_cpu / sum(seconds) * 100, 3),
+        "memory_kb": round(peak / calls / 1024, 1),
+        "file_kb_per_min": round(sum(sizes) / 1024 / (sum(seconds) / 60), 1) if sizes else None,
+        "recorded_s": round(float(np.mean(seconds)), 2),
+        "dropped_s": round(sum(r.dropped_seconds for r in recorders), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, nargs="+", default=[1, 4, 16], help="Concurrent recordings")
+    parser.add_argument("--seconds", type=float, default=10, help="Wall time per run")
+    parser.add_argument("--mode", choices=call_recorder.MODES, default="both")
+    parser.add_argument("--mic-rate", type=int, default=48000, help="Device rate (16000 with echo cancellation)")
+    parser.add_argument("--rate", type=int, default=16000, help="Recording rate (RECORDING_SAMPLE_RATE)")
+    parser.add_argument("--chunk", type=int, default=1024)
+    parser.add_argument("--format", choices=("auto", "wav"), default="auto", help="auto = Opus if ffmpeg is there")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="bench_recording_")
+    try:
+        runs = [run(args, calls, directory) for calls in args.calls]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(json.dumps({
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "ffmpeg": bool(shutil.which("ffmpeg")),
+        "mode": args.mode,
+        "mic_rate": args.mic_rate,
+        "rate": args.rate,
+        "runs": runs,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
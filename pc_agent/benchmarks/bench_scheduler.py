@@ -0,0 +1,124 @@
+"""
+Benchmark - campaign scheduler memory and throughput on big lists
+
+Per --sizes list length:
+  load_ms         - load_numbers() from a csv of that size
+  build_ms        - CampaignScheduler(...) (dedupe + heapify)
+  bytes_per_num   - tracemalloc'd scheduler size / numbers (number strings included)
+  campaign        - a whole campaign on a fake clock: every number dialed
+                    until answered or out of attempts, random outcomes
+                    (35% answered, 40% no answer, 15% busy, 10% timeout)
+    dials, us_per_dial (next_due + record), dials_per_s
+  hours_us_per_dial - same with calling hours on (localtime() per dial)
+
+Run: python benchmarks/bench_scheduler.py [--sizes 100000 1000000]
+"""
+import argparse
+import csv
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from campaign_scheduler import CampaignScheduler, load_numbers, ANSWERED, NO_ANSWER, BUSY, TIMEOUT
+
+OUTCOMES = [ANSWERED] * 35 + [NO_ANSWER] * 40 + [BUSY] * 15 + [TIMEOUT] * 10
+DELAYS = {NO_ANSWER: 1800, BUSY: 600, TIMEOUT: 3600}
+
+
+def make_csv(path, count, rng):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Phone", "Priority"])
+        for i in range(count):
+            writer.writerow([f"98{i:08d}", rng.randint(0, 3)])
+
+
+def measure_size(path):
+    """Bytes held by a scheduler built from path - number strings included, loader's list freed"""
+    gc.collect()
+    tracemalloc.start()
+    numbers = load_numbers(path)
+    scheduler = CampaignScheduler(numbers, retry_delays=DELAYS, calling_hours=None)
+    del numbers
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return scheduler, size
+
+
+def run_campaign(scheduler, rng, now=0.0):
+    """Dial until the heap is empty; returns (dials, seconds spent in the scheduler)"""
+    picks = [rng.choice(OUTCOMES) for _ in range(4096)]
+    dials = 0
+    spent = 0.0
+    perf = time.perf_counter
+    while True:
+        t0 = perf()
+        dial = scheduler.next_due(now)
+        if dial is None:
+            wait = scheduler.seconds_until_due(now)
+            spent += perf() - t0
+            if wait is None:
+                return dials, spent
+            now += wait
+            continue
+        scheduler.record(dial.index, picks[dials & 4095], now)
+        spent += perf() - t0
+        dials += 1
+        now += 60  # One call a minute
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    import logging
+    from config import logger
+    logger.setLevel(logging.WARNING)
+
+    rng = random.Random(args.seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"numbers_{size}.csv")
+            make_csv(path, size, rng)
+            start = time.perf_counter()
+            numbers = load_numbers(path)
+            load_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            CampaignScheduler(numbers, retry_delays=DELAYS, calling_hours=None)
+            build_ms = (time.perf_counter() - start) * 1000
+            del numbers
+
+            scheduler, size_bytes = measure_size(path)
+            dials, spent = run_campaign(scheduler, rng)
+
+            hours = CampaignScheduler([f"98{i:08d}" for i in range(min(size, 100000))],
+                                      retry_delays=DELAYS, calling_hours=(10, 19))
+            start_ts = time.mktime((2026, 1, 5, 10, 0, 0, 0, 0, -1))
+            hour_dials, hour_spent = run_campaign(hours, rng, now=start_ts)
+
+            results[size] = {
+                "load_ms": round(load_ms, 1),
+                "build_ms": round(build_ms, 1),
+                "bytes_per_num": round(size_bytes / size, 1),
+                "campaign": {"dials": dials, "answered": scheduler.answered, "gave_up": scheduler.exhausted,
+                             "us_per_dial": round(spent / dials * 1e6, 2),
+                             "dials_per_s": round(dials / spent)},
+                "hours_us_per_dial": round(hour_spent / hour_dials * 1e6, 2),
+            }
+    print(json.dumps({"python": sys.version.split()[0], "sizes": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
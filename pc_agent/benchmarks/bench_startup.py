@@ -0,0 +1,146 @@
+"""
+Benchmark - cold start to "ready" (headless.py), with -X importtime
+
+Spawns fresh interpreters (`python -X importtime` this file --child) that
+run headless.run() against a fake phone (simulator FakePhone, no calls)
+with --exit-when-ready, and reports per mode:
+  ready_ms       - child's first line -> agent main loop running
+  wall_ms        - spawn -> process exit (interpreter start-up and the
+                   agent's shutdown included)
+  import_ms      - sum of top-level imports from -X importtime
+  slowest        - top imports by cumulative time
+  heavy_loaded   - which heavy packages were imported before ready
+  warmup_ms      - the agent's warm-up stage (part of ready_ms) and, per
+                   task, how long each took - tasks run in parallel, so
+                   warmup_ms ~ the slowest task, not the sum
+Modes:
+  lazy   - the agent as it is (heavy modules load with their features)
+  eager  - openai / speech_recognition / edge_tts / openpyxl / tkinter
+           imported up front, like the old start-up
+
+Run: python benchmarks/bench_startup.py [--runs 3] [--ai]
+"""
+import time
+
+START = time.perf_counter()
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+HEAVY = ["openai", "httpx", "speech_recognition", "edge_tts", "gtts", "openpyxl", "tkinter", "numpy", "librosa"]
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def child(args):
+    if args.eager:
+        import importlib
+        for name in HEAVY:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    if args.ai:
+        # Before config is imported: connection pre-warm goes to a local stand-in, not api.openai.com
+        from simulator.openai_server import StandInOpenAIServer
+        server = StandInOpenAIServer(connect_delay=0.1).start()
+        os.environ["OPENAI_API_KEY"] = "bench"
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    import headless
+    from main import ADBCallDetector
+    from simulator.fake_adb import FakePhone
+
+    audio = os.path.join(tempfile.mkdtemp(prefix="startup_"), "opening.mp3")
+    with open(audio, "wb") as f:
+        f.write(b"\0" * 1024)
+
+    components = {"detector": ADBCallDetector(adb_runner=FakePhone([]).run)}
+    if args.ai:
+        from speech_listener import SpeechListener
+        from simulator.audio import WavMicrophone
+        components["listener"] = SpeechListener(microphone=WavMicrophone())
+
+    options = {"audio": audio, "ai_mode": args.ai, "exit_when_ready": True,
+               "settings": {"LOG_LEVEL": "WARNING", "HTTP_PUSH_ENABLED": False}}
+    agent = headless.run(options, **components)
+    # startup_seconds counts from headless' own first line - shift to ours
+    ready_ms = (headless.PROCESS_START - START + agent.startup_seconds) * 1000
+    loaded = [name for name in HEAVY if name in sys.modules]
+    warmup = {name: round(s * 1000, 1) if s is not None else None for name, s in agent.warmup_tasks.items()}
+    print(json.dumps({"ready_ms": ready_ms, "heavy_loaded": loaded,
+                      "warmup_ms": round((agent.warmup_seconds or 0) * 1000, 1), "warmup_tasks_ms": warmup}))
+    sys.stdout.flush()
+    os._exit(0)  # Daemon threads (detector, dispatcher) - don't wait
+
+
+def parse_importtime(stderr):
+    """Top-level imports (one level of indent): {module: cumulative ms}"""
+    top = {}
+    for self_us, cumulative_us, indent, name in _LINE.findall(stderr):
+        if len(indent) == 1:
+            top[name] = top.get(name, 0) + int(cumulative_us) / 1000
+    return top
+
+
+def run_once(mode, args):
+    cmd = [sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child"]
+    if mode == "eager":
+        cmd.append("--eager")
+    if args.ai:
+        cmd.append("--ai")
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=HERE, timeout=120)
+    wall_ms = (time.perf_counter() - start) * 1000
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"child failed ({proc.returncode}): {proc.stderr[-2000:]}")
+    result = json.loads(lines[-1])
+    result["wall_ms"] = wall_ms
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def summarize(runs):
+    imports = runs[-1]["imports"]
+    return {
+        "ready_ms": round(statistics.median(r["ready_ms"] for r in runs), 1),
+        "wall_ms": round(statistics.median(r["wall_ms"] for r in runs), 1),
+        "import_ms": round(statistics.median(sum(r["imports"].values()) for r in runs), 1),
+        "slowest": {name: round(ms, 1) for name, ms in sorted(imports.items(), key=lambda i: -i[1])[:8]},
+        "heavy_loaded": runs[-1]["heavy_loaded"],
+        "warmup_ms": round(statistics.median(r["warmup_ms"] for r in runs), 1),
+        "warmup_tasks_ms": runs[-1]["warmup_tasks_ms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--ai", action="store_true", help="AI mode (listener on a fake mic, LLM client)")
+    parser.add_argument("--mode", choices=["lazy", "eager", "both"], default="both")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    modes = ["eager", "lazy"] if args.mode == "both" else [args.mode]
+    report = {"python": sys.version.split()[0], "ai_mode": args.ai, "runs": args.runs}
+    for mode in modes:
+        report[mode] = summarize([run_once(mode, args) for _ in range(args.runs)])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Simulation - speculative generation on recorded transcripts
+
+Replays interim/final transcript timelines (JSONL, see fixtures/) against a
+local stand-in chat server, once with speculation and once without, and
+reports hit rate, wasted tokens and reply-ready latency after the final
+transcript.
+
+Fixture line: {"partials": [[t, "text"], ...], "final": [t, "text"]}
+
+Run: python benchmarks/sim_speculation.py [--latency 0.5] [--threshold 0.8]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from simulator.openai_server import StandInOpenAIServer
+
+DEFAULT_FIXTURE = os.path.join(BASE_DIR, "benchmarks", "fixtures", "speculation_transcripts.jsonl")
+
+
+def load_timelines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def replay(llm, timeline, responder=None):
+    """Play one utterance timeline. Returns seconds from final transcript to reply ready."""
+    llm.reset_conversation()
+    start = time.perf_counter()
+
+    def wait_until(t):
+        delay = start + t - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    if responder:
+        for t, text in timeline["partials"]:
+            wait_until(t)
+            responder.on_partial(text)
+
+    final_t, final_text = timeline["final"]
+    wait_until(final_t)
+    final_at = time.perf_counter()
+
+    reply = responder.resolve(final_text, timeout=30) if responder else None
+    if not reply:
+        llm.generate_response(final_text)
+    return time.perf_counter() - final_at
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--latency", type=float, default=0.5, help="Server time to first token")
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--threshold", type=float, default=None)
+    args = parser.parse_args()
+
+    server = StandInOpenAIServer(latency=args.latency, token_delay=args.token_delay).start()
+    os.environ["OPENAI_API_KEY"] = "sim"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    from llm_engine import LLMEngine
+    from speculation import SpeculativeResponder
+
+    timelines = load_timelines(args.fixture)
+    try:
+        llm = LLMEngine()
+        baseline = [replay(llm, tl) for tl in timelines]
+
+        responder = SpeculativeResponder(llm) if args.threshold is None else \
+            SpeculativeResponder(llm, match_threshold=args.threshold)
+        speculative = [replay(llm, tl, responder) for tl in timelines]
+        time.sleep(args.latency + 1)  # Let cancelled drafts finish so waste is counted
+        responder.cancel_all()
+    finally:
+        server.stop()
+
+    stats = responder.stats.as_dict()
+    report = {
+        "utterances": len(timelines),
+        "server_latency_ms": args.latency * 1000,
+        "baseline_median_ms": round(statistics.median(baseline) * 1000, 1),
+        "speculative_median_ms": round(statistics.median(speculative) * 1000, 1),
+        "speculation": stats,
+        "wasted_tokens_per_utterance": round(stats["wasted_tokens"] / len(timelines), 1),
+    }
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Call Bus - ek canonical call-state stream, kitne bhi sources se
+
+ADB polling, phone ka HTTP push (aur aage logcat) sab apni taraf se
+transitions report karte hain. Bus har device ke liye:
+  - duplicate hata deta hai (doosra source wahi transition baad me bataye
+    to sirf "confirm" count hota hai, publish nahi)
+  - order sambhalta hai (call ke andar peeche jaana, jaise RINGING ke baad
+    late DIALING, drop)
+  - har transition ka pehla source aur baaki sources ka lag record karta hai
+    -> per phone sabse tez source chun sakte hain (source_stats()).
+Subscribers CallbackDispatcher pe chalte hain (per-subscriber order).
+"""
+import threading
+import time
+from enum import Enum
+from callback_dispatcher import CallbackDispatcher
+from latency_stats import LatencyStats
+import metrics
+from config import logger, BUS_DEDUP_WINDOW
+
+TRANSITIONS = metrics.counter("agent_call_transitions_total", "Call-state reports by result", ["source", "result"])
+SOURCE_LAG = metrics.histogram("agent_call_source_lag_seconds", "How far a source trails the first one", ["source"])
+
+DEFAULT_DEVICE = "phone"  # Single-phone setup: sources that can't tell devices apart
+
+
+class CallPhase(Enum):
+    IDLE = "idle"
+    DIALING = "dialing"
+    RINGING = "ringing"
+    ACTIVE = "active"
+
+
+# Order inside one call - a lower phase after a higher one is stale
+_RANK = {CallPhase.IDLE: 0, CallPhase.DIALING: 1, CallPhase.RINGING: 2, CallPhase.ACTIVE: 3}
+
+# http_server.CallState ints -> phase
+HTTP_PHASES = {0: CallPhase.IDLE, 1: CallPhase.RINGING, 2: CallPhase.ACTIVE}
+
+
+def _same_number(a, b):
+    """Unknown matches anything; else compare the last 10 digits (+91 / 0 prefixes differ per source)"""
+    if not a or not b:
+        return True
+    a, b = "".join(filter(str.isdigit, a)), "".join(filter(str.isdigit, b))
+    return a[-10:] == b[-10:]
+
+
+class CallBusEvent:
+    __slots__ = ("device", "seq", "phase", "previous", "number", "source", "time")
+
+    def __init__(self, device, seq, phase, previous, number, source, at):
+        self.device = device
+        self.seq = seq            # Per device, increasing
+        self.phase = phase
+        self.previous = previous
+        self.number = number
+        self.source = source      # Who reported it first
+        self.time = at            # Monotonic, when the first source saw it
+
+    def __repr__(self):
+        return f"CallBusEvent({self.device} #{self.seq} {self.previous.value}->{self.phase.value} via {self.source})"
+
+
+class _Transition:
+    __slots__ = ("phase", "number", "at", "first_source", "seen")
+
+    def __init__(self, phase, number, at, source):
+        self.phase = phase
+        self.number = number
+        self.at = at
+        self.first_source = source
+        self.seen = {source}
+
+
+class _SourceStats:
+    def __init__(self):
+        self.first = 0        # Transitions this source reported first
+        self.confirmed = 0    # Reported after another source
+        self.stale = 0        # Out-of-order reports dropped
+        self.lag = LatencyStats()  # Behind the first source
+
+    def as_dict(self):
+        lag = self.lag.summary()
+        return {
+            "first": self.first,
+            "confirmed": self.confirmed,
+            "stale": self.stale,
+            "lag_p50_ms": lag["p50_ms"],
+            "lag_p95_ms": lag["p95_ms"],
+        }
+
+
+class _Device:
+    def __init__(self):
+        self.phase = CallPhase.IDLE
+        self.number = ""
+        self.seq = 0
+        self.recent = []  # Transitions still inside the dedup window
+        self.sources = {}  # source -> _SourceStats
+
+
+class CallEventBus:
+    def __init__(self, dedup_window=BUS_DEDUP_WINDOW):
+        self.dedup_window = dedup_window
+        self._devices = {}
+        self._aliases = {}
+        self._lock = threading.Lock()
+        self._dispatcher = CallbackDispatcher(workers=2, name="call-bus")
+
+    def subscribe(self, callback):
+        """callback(CallBusEvent) - runs on the bus workers, in per-device seq order"""
+        self._dispatcher.register(callback)
+
+    def alias(self, source_device_id, device):
+        """Map a source's own id (adb serial, phone IP) to a shared device name"""
+        with self._lock:
+            self._aliases[source_device_id] = device
+
+    def report(self, device, phase, source, number="", at=None):
+        """A source saw `phase`. Returns the published event, or None if it was a duplicate / stale"""
+        if phase is None:
+            return None
+        at = time.monotonic() if at is None else at
+        with self._lock:
+            device = self._aliases.get(device, device) or DEFAULT_DEVICE
+            dev = self._devices.setdefault(device, _Device())
+            stats = dev.sources.setdefault(source, _SourceStats())
+            dev.recent = [t for t in dev.recent if at - t.at <= self.dedup_window]
+
+            # Same transition from a slower source? (sources report edges - one
+            # source repeating a phase means a new transition, e.g. a short call)
+            for transition in reversed(dev.recent):
+                if transition.phase == phase and _same_number(number, transition.number):
+                    if source in transition.seen:
+                        break
+                    transition.seen.add(source)
+                    stats.confirmed += 1
+                    stats.lag.add(max(0.0, at - transition.at))
+                    TRANSITIONS.labels(source, "confirmed").inc()
+                    SOURCE_LAG.labels(source).observe(max(0.0, at - transition.at))
+                    if number and not transition.number and transition is dev.recent[-1]:
+                        dev.number = transition.number = number
+                    return None
+
+            if phase == dev.phase:
+                return None  # Steady state repeated after the window
+            if phase != CallPhase.IDLE and dev.phase != CallPhase.IDLE and _RANK[phase] < _RANK[dev.phase]:
+                stats.stale += 1
+                TRANSITIONS.labels(source, "stale").inc()
+                logger.debug(f"🚌 Stale {phase.value} from {source} on {device} (already {dev.phase.value})")
+                return None
+
+            previous = dev.phase
+            dev.phase = phase
+            dev.number = "" if phase == CallPhase.IDLE else (number or dev.number)
+            dev.seq += 1
+            dev.recent.append(_Transition(phase, number, at, source))
+            stats.first += 1
+            TRANSITIONS.labels(source, "first").inc()
+            event = CallBusEvent(device, dev.seq, phase, previous, dev.number, source, at)
+            # Queued under the lock so subscribers see seq order
+            self._dispatcher.publish(event)
+            return event
+
+    def state(self, device=None):
+        with self._lock:
+            dev = self._devices.get(self._aliases.get(device, device) or DEFAULT_DEVICE)
+            return (dev.phase, dev.number) if dev else (CallPhase.IDLE, "")
+
+    def source_stats(self):
+        """{device: {source: first / confirmed / stale / lag}} - pick the fastest source per phone"""
+        with self._lock:
+            return {
+                device: {source: stats.as_dict() for source, stats in dev.sources.items()}
+                for device, dev in self._devices.items()
+            }
+
+    def fastest_source(self, device=None):
+        stats = self.source_stats().get(device or DEFAULT_DEVICE, {})
+        return max(stats, key=lambda source: (stats[source]["first"], -stats[source]["lag_p50_ms"])) if stats else None
+
+    def flush(self, timeout=None):
+        return self._dispatcher.flush(timeout)
+
+
+def attach_detector(bus, detector, device=None, source="adb"):
+    """Route an ADBCallDetector's callbacks into the bus"""
+    detector.on_dialing = lambda: bus.report(device, CallPhase.DIALING, source)
+    detector.on_ringing = lambda number, ring_count: bus.report(device, CallPhase.RINGING, source, number)
+    detector.on_pickup = lambda number: bus.report(device, CallPhase.ACTIVE, source, number)
+    detector.on_hangup = lambda: bus.report(device, CallPhase.IDLE, source)
+
+
+def attach_http(bus, server, device=None, source="http"):
+    """Route HTTPCallServer pushes into the bus"""
+    server.on_state_change(
+        lambda state, number, direction: bus.report(device, HTTP_PHASES.get(state), source, number)
+    )
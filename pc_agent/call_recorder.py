@@ -0,0 +1,388 @@
+"""
+Call Recorder - har call ki recording (mic, agent ki playback ya dono)
+
+Bure transcripts debug karne aur VAD / ASR tune karne ke liye. Audio thread
+kabhi rukta nahi:
+  - Mic: RecordingMicrophone har stream.read() ka chunk us call ke
+    RingBuffer me copy karta hai - pehle se allocate kiya hua, ek writer
+    (mic padhne wala thread) + ek reader (worker), bina lock
+  - Playback: TTSEngine jo PCM bajata hai (echo reference jaisa) player start
+    time ke saath EchoReference me
+  - Worker thread har FLUSH_SECONDS ring khaali karke dono track call ki
+    timeline pe rakhta hai (mic band tha = silence) aur encoder ko deta hai:
+    ffmpeg -> Opus (.ogg), ffmpeg na ho to WAV
+"both" = stereo (left mic, right agent). File ka naam Excel ke "Recording"
+column me. Har recording ke baad retention: RECORDING_MAX_AGE_DAYS se purani,
+phir RECORDING_MAX_TOTAL_MB se upar sabse purani files delete.
+
+CPU / memory per call: python benchmarks/bench_recording.py
+"""
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+import speech_recognition as sr
+
+import metrics
+from config import (
+    logger, RECORDING_DIR, RECORDING_SAMPLE_RATE, RECORDING_BITRATE, RECORDING_BUFFER_SECONDS,
+    RECORDING_MAX_AGE_DAYS, RECORDING_MAX_TOTAL_MB
+)
+from echo_canceller import EchoReference
+
+RECORDINGS = metrics.counter("agent_recordings_total", "Call recordings written", ["format"])
+RECORDING_DROPPED = metrics.counter("agent_recording_dropped_seconds_total",
+                                    "Mic audio not recorded - ring buffer full (encoder behind)")
+RECORDING_DISK = metrics.gauge("agent_recording_disk_bytes", "Recordings kept on disk after retention")
+
+MODES = ("mic", "playback", "both")
+EXTENSIONS = (".ogg", ".wav")
+FLUSH_SECONDS = 0.5     # Worker drains the ring / feeds the encoder this often
+LAG_SECONDS = 1.0       # Timeline is written this far behind now (mic chunks / playback PCM still arriving)
+RESYNC_SECONDS = 0.05   # Mic chunk this far from where the last one ended = mic was closed (gap) / clock jump
+CHUNK_SAMPLES = 256     # Smallest mic chunk expected - sizes the ring's timestamp slots
+
+
+class RingBuffer:
+    """
+    Preallocated int16 ring with a capture timestamp per chunk. One writer
+    (whoever reads the mic - one at a time, sr sources don't nest) and one
+    reader (the worker), no lock: each side only moves its own counters and
+    the writer publishes a chunk after copying it (int assignment is atomic),
+    so the reader never sees half of one. Full = the chunk is dropped, the
+    writer never waits.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.int16)
+        slots = capacity // CHUNK_SAMPLES + 1
+        self._chunk_start = np.zeros(slots, dtype=np.int64)     # Sample index of each chunk...
+        self._chunk_time = np.zeros(slots, dtype=np.float64)    # ... and when it was captured
+        self._written = 0           # Samples / chunks ever written (writer only)
+        self._chunks_written = 0
+        self._read = 0              # ... ever read (reader only)
+        self._chunks_read = 0
+        self.dropped = 0            # Samples the writer couldn't fit
+
+    def write(self, samples, captured_at):
+        """int16 samples whose first one was captured at captured_at. False = full, dropped"""
+        n = samples.size
+        slots = self._chunk_start.size
+        if n > self.capacity - (self._written - self._read) or self._chunks_written - self._chunks_read >= slots:
+            self.dropped += n
+            return False
+        start = self._written % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = samples[:first]
+        self._data[:n - first] = samples[first:]
+        slot = self._chunks_written % slots
+        self._chunk_start[slot] = self._written
+        self._chunk_time[slot] = captured_at
+        # Timestamp first, samples last: the reader only takes chunks whose samples are in
+        self._chunks_written += 1
+        self._written += n
+        return True
+
+    def read(self):
+        """(int16 copy of everything written since the last read, [(offset into it, captured_at)])"""
+        written = self._written
+        chunks_written = self._chunks_written
+        n = written - self._read
+        start = self._read % self.capacity
+        first = min(n, self.capacity - start)
+        samples = np.concatenate((self._data[start:start + first], self._data[:n - first]))
+        slots = self._chunk_start.size
+        chunks = []
+        while self._chunks_read < chunks_written:
+            slot = self._chunks_read % slots
+            if self._chunk_start[slot] >= written:
+                break  # Its samples aren't published yet
+            chunks.append((int(self._chunk_start[slot] - self._read), float(self._chunk_time[slot])))
+            self._chunks_read += 1
+        self._read = written
+        return samples, chunks
+
+
+class _OpusWriter:
+    """ffmpeg encodes while the call goes on - raw PCM into its stdin"""
+    extension = ".ogg"
+    format = "opus"
+
+    def __init__(self, path, rate, channels):
+        self._process = subprocess.Popen(
+            ["ffmpeg", "-v", "quiet", "-y", "-f", "s16le", "-ar", str(rate), "-ac", str(channels), "-i", "-",
+             "-c:a", "libopus", "-b:a", RECORDING_BITRATE, "-application", "voip", path],
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+
+    def write(self, data):
+        self._process.stdin.write(data)
+
+    def close(self):
+        self._process.stdin.close()
+        code = self._process.wait(timeout=30)
+        if code:
+            raise RuntimeError(f"ffmpeg exited with {code}")
+
+
+class _WavWriter:
+    extension = ".wav"
+    format = "wav"
+
+    def __init__(self, path, rate, channels):
+        self._wave = wave.open(path, "wb")
+        self._wave.setnchannels(channels)
+        self._wave.setsampwidth(2)
+        self._wave.setframerate(rate)
+
+    def write(self, data):
+        self._wave.writeframes(data)
+
+    def close(self):
+        self._wave.close()
+
+
+def _writer_class():
+    return _OpusWriter if shutil.which("ffmpeg") else _WavWriter
+
+
+class CallRecorder:
+    def __init__(self, phone, mode, mic_rate=None, directory=None, rate=RECORDING_SAMPLE_RATE,
+                 buffer_seconds=RECORDING_BUFFER_SECONDS, writer=None):
+        """
+        mode: "mic" / "playback" / "both". mic_rate: of the int16 chunks passed
+        to write_mic() (None = no mic, that track stays silent)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown recording mode: {mode}")
+        self.mode = mode
+        self.rate = rate
+        self.mic_rate = mic_rate
+        self.directory = directory or RECORDING_DIR
+        self._writer_class = writer or _writer_class()
+        safe_phone = re.sub(r"[^0-9A-Za-z+]", "", phone or "") or "unknown"
+        name = f"{datetime.now():%Y%m%d-%H%M%S}_{safe_phone}{self._writer_class.extension}"
+        self.path = os.path.join(self.directory, name)
+
+        # Mic chunks: audio thread -> ring -> worker. Playback: TTSEngine feeds it
+        self.ring = RingBuffer(int(buffer_seconds * mic_rate)) if mic_rate and mode != "playback" else None
+        self.playback = EchoReference(rate, keep_seconds=LAG_SECONDS) if mode != "mic" else None
+
+        self.started_at = None
+        self.cpu_seconds = 0.0      # Worker thread (resampling, mixing, handing to the encoder)
+        self._finished_at = None
+        self._done = threading.Event()
+        self._thread = None
+        self._flushed = 0           # Timeline samples handed to the encoder
+        self._mic_blocks = []       # (timeline position, float32 samples at rate) not flushed yet
+        self._mic_next = None       # Where the next contiguous mic chunk goes
+        self._phase = 0.0           # Resampler position / last input sample (contiguous chunks)
+        self._tail = None
+
+    @property
+    def seconds(self):
+        return self._flushed / self.rate
+
+    @property
+    def dropped_seconds(self):
+        return self.ring.dropped / self.mic_rate if self.ring else 0.0
+
+    def start(self):
+        """Call picked up - the recording's time 0"""
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="call-recorder")
+        self._thread.start()
+        return self
+
+    def write_mic(self, samples, captured_at):
+        """Audio thread: int16 chunk at mic_rate, first sample captured at captured_at (monotonic)"""
+        if self.ring is not None and not self.ring.write(samples, captured_at):
+            RECORDING_DROPPED.inc(samples.size / self.mic_rate)
+
+    def finish(self):
+        """Call ended - the worker writes the rest and closes the file. Returns its path"""
+        self._finished_at = time.monotonic()
+        self._done.set()
+        return self.path
+
+    def wait(self, timeout=None):
+        """Until the file is closed (and retention has run)"""
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self):
+        writer = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            writer = self._writer_class(self.path, self.rate, 2 if self.mode == "both" else 1)
+            while not self._done.wait(FLUSH_SECONDS):
+                self._step(writer, int((time.monotonic() - self.started_at - LAG_SECONDS) * self.rate))
+            if self.ring is not None:
+                self._drain()  # Before the end is decided - mic chunks can run past finish()
+            end = int((self._finished_at - self.started_at) * self.rate)
+            self._step(writer, max(end, self._mic_next or 0))
+            writer.close()
+            writer = None
+            RECORDINGS.labels(self._writer_class.format).inc()
+            logger.info(f"🎙️ Recording saved: {os.path.basename(self.path)} ({self.seconds:.0f}s"
+                        + (f", {self.dropped_seconds:.1f}s dropped)" if self.dropped_seconds else ")"))
+        except Exception as e:
+            logger.error(f"Recording failed: {e}")
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+        enforce_retention(self.directory)
+
+    def _step(self, writer, target):
+        t0 = time.thread_time()
+        if self.ring is not None:
+            self._drain()
+        audio = self._render(target)
+        if audio is not None:
+            writer.write(np.clip(np.rint(audio), -32768, 32767).astype("<i2").tobytes())
+        self.cpu_seconds += time.thread_time() - t0
+
+    def _drain(self):
+        """Mic chunks from the ring -> resampled blocks at their place on the timeline"""
+        samples, chunks = self.ring.read()
+        if not samples.size:
+            return
+        bounds = [offset for offset, _ in chunks] + [samples.size]
+        if bounds[0] > 0:
+            bounds.insert(0, 0)
+            chunks.insert(0, (0, None))  # Rest of a chunk that started before this read (not expected)
+        for (offset, captured_at), end in zip(chunks, bounds[1:]):
+            if captured_at is not None:
+                at = (captured_at - self.started_at) * self.rate
+                if self._mic_next is None or abs(at - self._mic_next) > RESYNC_SECONDS * self.rate:
+                    # First chunk / mic reopened after a gap: start from its own timestamp
+                    self._mic_next = max(0, int(round(at)))
+                    self._phase, self._tail = 0.0, None
+            if self._mic_next is None:
+                continue
+            block = self._resample(samples[offset:end].astype(np.float32))
+            self._mic_blocks.append((self._mic_next, block))
+            self._mic_next += block.size
+
+    def _resample(self, x):
+        """Linear, carried across contiguous chunks (no drift from rounding each one)"""
+        if self.mic_rate == self.rate or not x.size:
+            return x
+        if self._tail is not None:
+            x = np.concatenate(([self._tail], x))
+        step = self.mic_rate / self.rate
+        positions = np.arange(self._phase, x.size - 1, step)
+        self._phase = (positions[-1] + step if positions.size else self._phase) - (x.size - 1)
+        self._tail = x[-1]
+        return np.interp(positions, np.arange(x.size), x).astype(np.float32)
+
+    def _render(self, target):
+        """Timeline [flushed, target) as float samples (interleaved for "both"), None if nothing new"""
+        count = target - self._flushed
+        if count <= 0:
+            return None
+        tracks = []
+        if self.mode != "playback":
+            mic = np.zeros(count, dtype=np.float32)
+            keep = []
+            for position, block in self._mic_blocks:
+                lo, hi = max(position, self._flushed), min(position + block.size, target)
+                if hi > lo:
+                    mic[lo - self._flushed:hi - self._flushed] = block[lo - position:hi - position]
+                if position + block.size > target:
+                    keep.append((position, block))
+            self._mic_blocks = keep
+            tracks.append(mic)
+        if self.playback is not None:
+            tracks.append(self.playback.render(self.started_at + self._flushed / self.rate, count))
+        self._flushed = target
+        return tracks[0] if len(tracks) == 1 else np.column_stack(tracks).ravel()
+
+
+def enforce_retention(directory=None, max_age_days=RECORDING_MAX_AGE_DAYS, max_total_mb=RECORDING_MAX_TOTAL_MB,
+                      now=None):
+    """
+    Deletes recordings older than max_age_days, then the oldest ones until
+    the rest fit in max_total_mb. Returns how many were deleted
+    """
+    directory = directory or RECORDING_DIR
+    now = now or time.time()
+    try:
+        entries = [e for e in os.scandir(directory) if e.is_file() and e.name.endswith(EXTENSIONS)]
+    except FileNotFoundError:
+        return 0
+    files = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue  # Deleted meanwhile (another call's retention)
+        files.append((stat.st_mtime, stat.st_size, entry.path))
+    files.sort()
+    total = sum(size for _, size, _ in files)
+    limit = max_total_mb * 1024 * 1024
+    removed = 0
+    for mtime, size, path in files:
+        if now - mtime <= max_age_days * 86400 and total <= limit:
+            break  # Oldest left is young enough and everything fits
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"⚠️ Couldn't delete old recording {os.path.basename(path)}: {e}")
+            continue
+        total -= size
+        removed += 1
+    RECORDING_DISK.set(total)
+    if removed:
+        logger.info(f"🗑️ Recording retention: deleted {removed} file(s), {total / 1024 / 1024:.0f} MB kept")
+    return removed
+
+
+class _RecordingStream:
+    def __init__(self, stream, microphone):
+        self.stream = stream
+        self.microphone = microphone
+
+    def read(self, frames, *args, **kwargs):
+        data = self.stream.read(frames, *args, **kwargs)
+        recorder = self.microphone.recorder
+        if data and recorder is not None:
+            samples = np.frombuffer(data, dtype="<i2")
+            recorder.write_mic(samples, time.monotonic() - samples.size / self.microphone.SAMPLE_RATE)
+        return data
+
+    def close(self):
+        self.stream.close()
+
+
+class RecordingMicrophone(sr.AudioSource):
+    """Drop-in for the agent's mic: while a call's recorder is set, every chunk read goes to it too"""
+
+    def __init__(self, source):
+        if source.SAMPLE_WIDTH != 2:
+            raise ValueError(f"16-bit audio expected, source gives {source.SAMPLE_WIDTH * 8}-bit")
+        self.source = source
+        self.recorder = None
+        self.SAMPLE_RATE = source.SAMPLE_RATE
+        self.SAMPLE_WIDTH = source.SAMPLE_WIDTH
+        self.CHUNK = source.CHUNK
+        self.stream = None
+
+    def __enter__(self):
+        self.source.__enter__()
+        self.stream = _RecordingStream(self.source.stream, self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+        return self.source.__exit__(exc_type, exc_value, traceback)
@@ -0,0 +1,106 @@
+"""
+Callback Dispatcher - state-change callbacks off the publisher's thread
+
+publish() sirf queue me daalta hai (kabhi block nahi karta), callbacks ek
+chhote worker pool pe chalte hain. Har callback ki apni lane hai: ek
+callback ke events hamesha order me aur ek-ek karke chalte hain, alag
+callbacks parallel chal sakte hain. Har callback ka time measure hota hai;
+budget se zyada laga to warning.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from latency_stats import LatencyStats
+from config import logger, CALLBACK_WORKERS, CALLBACK_BUDGET
+
+
+class _Lane:
+    """One callback's pending calls + its timing stats"""
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.name = getattr(callback, "__qualname__", None) or repr(callback)
+        self.pending = deque()  # (args, published_at)
+        self.running = False
+        self.latency = LatencyStats()   # Callback run time
+        self.queue_wait = LatencyStats()  # Published -> started
+        self.errors = 0
+        self.slow = 0
+        self.max_time = 0.0
+
+
+class CallbackDispatcher:
+    def __init__(self, workers=CALLBACK_WORKERS, budget=CALLBACK_BUDGET, name="callbacks"):
+        self.budget = budget
+        self._lanes = []
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+    def register(self, callback):
+        with self._lock:
+            lane = _Lane(callback)
+            if any(other.name == lane.name for other in self._lanes):
+                lane.name = f"{lane.name}#{len(self._lanes)}"  # Keep stats keys unique
+            self._lanes.append(lane)
+
+    def publish(self, *args):
+        """Queue args for every callback - safe to call while holding other locks"""
+        now = time.monotonic()
+        with self._lock:
+            for lane in self._lanes:
+                lane.pending.append((args, now))
+                if not lane.running:
+                    lane.running = True
+                    self._pool.submit(self._drain, lane)
+
+    def _drain(self, lane):
+        """Run one lane's queued calls in order - only one drain per lane at a time"""
+        while True:
+            with self._lock:
+                if not lane.pending:
+                    lane.running = False
+                    self._idle.notify_all()
+                    return
+                args, published_at = lane.pending.popleft()
+
+            start = time.monotonic()
+            lane.queue_wait.add(start - published_at)
+            try:
+                lane.callback(*args)
+            except Exception as e:
+                lane.errors += 1
+                logger.error(f"Callback error ({lane.name}): {e}")
+            elapsed = time.monotonic() - start
+            lane.latency.add(elapsed)
+            lane.max_time = max(lane.max_time, elapsed)
+            if elapsed > self.budget:
+                lane.slow += 1
+                logger.warning(f"🐢 Callback {lane.name} took {elapsed * 1000:.0f}ms (budget {self.budget * 1000:.0f}ms)")
+
+    def flush(self, timeout=None):
+        """Wait until every queued call has run; False on timeout"""
+        with self._idle:
+            return self._idle.wait_for(
+                lambda: not any(lane.running for lane in self._lanes), timeout=timeout
+            )
+
+    def stats(self):
+        """Per callback: run time p50/p95/p99, queue wait, slow / error counts"""
+        with self._lock:
+            lanes = list(self._lanes)
+        return {
+            lane.name: dict(
+                lane.latency.summary(),
+                max_ms=round(lane.max_time * 1000, 1),
+                queue_p95_ms=lane.queue_wait.summary()["p95_ms"],
+                pending=len(lane.pending),
+                slow=lane.slow,
+                errors=lane.errors,
+            )
+            for lane in lanes
+        }
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,347 @@
+"""
+Campaign Scheduler - PC decide karta hai kaunsa number kab dial hoga
+
+Numbers ek heap me rehte hain, key (next attempt time, priority). Na uthaya,
+busy aur ring timeout wale numbers CAMPAIGN_RETRY_DELAYS ke baad wapas heap
+me aate hain (CAMPAIGN_MAX_ATTEMPTS tak); har attempt CAMPAIGN_CALLING_HOURS
+ke andar shift hota hai. CampaignDialer call bus ke phases se outcome
+samajhta hai aur agla number DIAL broadcast se phone ko bhejta hai:
+
+    adb shell am broadcast -a com.callingagent.DIAL --es number 9820012345 ...
+
+Per number sirf ek heap tuple + number string; attempts / status / priority
+compact arrays me. 100k+ numbers: python benchmarks/bench_scheduler.py
+"""
+import csv
+import heapq
+import os
+import re
+import threading
+import time
+from array import array
+from collections import namedtuple
+from config import (
+    logger, RING_TIMEOUT, CAMPAIGN_MAX_ATTEMPTS, CAMPAIGN_RETRY_DELAYS, CAMPAIGN_CALLING_HOURS,
+    CAMPAIGN_DIAL_GAP, CAMPAIGN_BUSY_SECONDS, CAMPAIGN_DIAL_TIMEOUT
+)
+from call_bus import CallPhase
+import metrics
+
+CAMPAIGN_DIALS = metrics.counter("agent_campaign_dials_total", "Scheduler dials by outcome", ["outcome"])
+CAMPAIGN_PENDING = metrics.gauge("agent_campaign_pending", "Numbers waiting for a (re)try")
+
+# Dial outcomes
+ANSWERED = "ANSWERED"
+NO_ANSWER = "NO_ANSWER"
+BUSY = "BUSY"
+TIMEOUT = "TIMEOUT"
+FAILED = "FAILED"
+MACHINE = "MACHINE"          # Picked up by voicemail / an announcement
+UNREACHABLE = "UNREACHABLE"  # Network SIT tones ("number not reachable")
+
+# Pickup screening verdict (pickup_classifier) -> dial outcome
+SCREENED_OUTCOMES = {"MACHINE": MACHINE, "SIT": UNREACHABLE, "RINGBACK": NO_ANSWER}
+
+# Per-number status (bytearray)
+PENDING, DIALING, DONE, EXHAUSTED = range(4)
+
+Dial = namedtuple("Dial", "index number attempt")
+
+_NUMBER = re.compile(r"\+?\d{5,15}")
+_SEPARATORS = re.compile(r"[\s\-().]")
+
+
+def normalize_number(value):
+    """Excel cell / csv field -> '+919820012345' style string, or None if it isn't a number"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel stores plain numbers as floats
+    text = _SEPARATORS.sub("", str(value))
+    # Only digits and one leading + reach the adb shell command line
+    return text if _NUMBER.fullmatch(text) else None
+
+
+def _rows(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            yield from wb.active.iter_rows(max_col=2, values_only=True)
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.reader(f)
+
+
+def load_numbers(path):
+    """[(number, priority)] from xlsx / csv / txt - first column number, optional second column priority"""
+    numbers = []
+    skipped = 0
+    for row in _rows(path):
+        number = normalize_number(row[0]) if row else None
+        if not number:
+            skipped += 1  # Header, blank or junk row
+            continue
+        try:
+            priority = int(row[1]) if len(row) > 1 and row[1] not in (None, "") else 0
+        except (TypeError, ValueError):
+            priority = 0
+        numbers.append((number, priority))
+    logger.info(f"📋 Loaded {len(numbers)} numbers from {os.path.basename(path)} ({skipped} rows skipped)")
+    return numbers
+
+
+class CampaignScheduler:
+    def __init__(self, numbers, max_attempts=CAMPAIGN_MAX_ATTEMPTS, retry_delays=None,
+                 calling_hours=CAMPAIGN_CALLING_HOURS, clock=time.time):
+        """
+        numbers: number strings or (number, priority) pairs - lower priority dials first,
+                 list order breaks ties; duplicates are dropped
+        retry_delays: {outcome: seconds}; outcomes not listed are never retried
+        calling_hours: (start, end) local hours, or None for any time
+        """
+        if not 1 <= max_attempts <= 255:
+            raise ValueError("max_attempts must be 1-255")
+        self.max_attempts = max_attempts
+        self.retry_delays = dict(CAMPAIGN_RETRY_DELAYS if retry_delays is None else retry_delays)
+        self.calling_hours = calling_hours
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        self.numbers = []
+        self.priorities = array("i")
+        seen = set()
+        for item in numbers:
+            number, priority = (item, 0) if isinstance(item, str) else item
+            if number in seen:
+                continue
+            seen.add(number)
+            self.numbers.append(number)
+            self.priorities.append(priority)
+        del seen
+
+        count = len(self.numbers)
+        self.attempts = bytearray(count)
+        self.status = bytearray(count)  # PENDING / DIALING / DONE / EXHAUSTED
+        # (next attempt time, priority, index) - first attempts are due right away
+        self._heap = [(0.0, priority, index) for index, priority in enumerate(self.priorities)]
+        heapq.heapify(self._heap)
+
+        self.in_flight = 0
+        self.dials = 0
+        self.answered = 0
+        self.exhausted = 0
+        self.outcomes = {}
+        CAMPAIGN_PENDING.set_function(lambda: len(self._heap))
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        return cls(load_numbers(path), **kwargs)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    # ---- calling hours ----
+
+    def in_calling_hours(self, ts):
+        if not self.calling_hours:
+            return True
+        start, end = self.calling_hours
+        return start <= time.localtime(ts).tm_hour < end
+
+    def next_calling_time(self, ts):
+        """ts if it's inside calling hours, else when the next window opens"""
+        if self.in_calling_hours(ts):
+            return ts
+        start, end = self.calling_hours
+        lt = time.localtime(ts)
+        day = lt.tm_mday + (1 if lt.tm_hour >= end else 0)  # mktime rolls the month over
+        return time.mktime((lt.tm_year, lt.tm_mon, day, start, 0, 0, 0, 0, -1))
+
+    # ---- scheduling ----
+
+    def next_due(self, now=None):
+        """Pop the next number to dial, or None if nothing is due (or outside calling hours)"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            if not self._heap or self._heap[0][0] > now or not self.in_calling_hours(now):
+                return None
+            _, _, index = heapq.heappop(self._heap)
+            self.attempts[index] += 1
+            self.status[index] = DIALING
+            self.in_flight += 1
+            self.dials += 1
+            return Dial(index, self.numbers[index], self.attempts[index])
+
+    def seconds_until_due(self, now=None):
+        """Seconds until next_due() has something, None once every number is finished"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            if not self._heap:
+                return None
+            return max(0.0, self.next_calling_time(max(self._heap[0][0], now)) - now)
+
+    def record(self, index, outcome, now=None):
+        """Outcome of a dial. Returns the retry time, or None if the number is finished"""
+        now = self.clock() if now is None else now
+        CAMPAIGN_DIALS.labels(outcome).inc()
+        with self._lock:
+            self.in_flight -= 1
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            if outcome == ANSWERED:
+                self.status[index] = DONE
+                self.answered += 1
+                return None
+            delay = self.retry_delays.get(outcome)
+            if delay is None or self.attempts[index] >= self.max_attempts:
+                self.status[index] = EXHAUSTED
+                self.exhausted += 1
+                return None
+            retry_at = self.next_calling_time(now + delay)
+            self.status[index] = PENDING
+            heapq.heappush(self._heap, (retry_at, self.priorities[index], index))
+            return retry_at
+
+    @property
+    def finished(self):
+        return not self._heap and not self.in_flight
+
+    def stats(self):
+        with self._lock:
+            return {
+                "numbers": len(self.numbers),
+                "pending": len(self._heap),
+                "in_flight": self.in_flight,
+                "answered": self.answered,
+                "exhausted": self.exhausted,
+                "dials": self.dials,
+                "outcomes": dict(self.outcomes),
+            }
+
+
+class CampaignDialer:
+    def __init__(self, scheduler, detector, dial_gap=CAMPAIGN_DIAL_GAP, busy_seconds=CAMPAIGN_BUSY_SECONDS,
+                 dial_timeout=CAMPAIGN_DIAL_TIMEOUT, ring_timeout=RING_TIMEOUT, clock=time.monotonic):
+        """
+        Drives one phone from a CampaignScheduler. The agent feeds it call bus
+        phases (on_phase) and calls tick() from its main loop between calls.
+        detector: needs dial(number) and hang_up_call()
+        """
+        self.scheduler = scheduler
+        self.detector = detector
+        self.dial_gap = dial_gap
+        self.busy_seconds = busy_seconds
+        self.dial_timeout = dial_timeout
+        self.ring_timeout = ring_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.current = None  # Dial in flight
+        self._dialed_at = 0.0
+        self._placed = False   # Phone reported DIALING / RINGING
+        self._ringing = False
+        self._picked = False
+        self._screened = None  # Outcome from pickup screening, overrides ANSWERED
+        self._next_dial_at = 0.0
+        self._wait_logged = False
+        self.finished = threading.Event()
+
+    def on_phase(self, phase, previous):
+        """Canonical call bus transition (bus thread)"""
+        with self._lock:
+            if self.current is None:
+                return
+            if phase == CallPhase.DIALING:
+                self._placed = True
+            elif phase == CallPhase.RINGING:
+                self._placed = self._ringing = True
+            elif phase == CallPhase.ACTIVE:
+                self._picked = True
+            elif phase == CallPhase.IDLE and previous != CallPhase.IDLE:
+                self._finish(self._outcome())
+
+    def tag(self, verdict):
+        """Agent's pickup screening said this "answer" wasn't a person (MACHINE / SIT / RINGBACK)"""
+        with self._lock:
+            if self.current is not None:
+                self._screened = SCREENED_OUTCOMES.get(verdict)
+
+    def tick(self):
+        """Dial when due. Returns seconds until the dialer wants another look (max 1s)"""
+        hang_up = False
+        with self._lock:
+            now = self.clock()
+            if self.current is not None:
+                if self._picked:
+                    return 1.0  # Agent is handling the call
+                limit = self.ring_timeout + self.dial_timeout if self._placed else self.dial_timeout
+                left = self._dialed_at + limit - now
+                if left > 0:
+                    return min(1.0, left)
+                # Phone never placed the call / never reported the end
+                outcome = TIMEOUT if self._placed else FAILED
+                logger.warning(f"⏰ {self.current.number}: no {'hangup' if self._placed else 'dialing'} "
+                               f"after {limit:.0f}s - {outcome}")
+                self._finish(outcome)
+                hang_up = True
+        if hang_up:
+            self.detector.hang_up_call()
+            return min(1.0, self.dial_gap)
+
+        with self._lock:
+            if now < self._next_dial_at:
+                return min(1.0, self._next_dial_at - now)
+            dial = self.scheduler.next_due()
+            if dial is None:
+                return self._idle_wait()
+            self._wait_logged = False
+            self.current = dial
+            self._dialed_at = now
+            self._placed = self._ringing = self._picked = False
+            self._screened = None
+
+        left = len(self.scheduler.numbers) - self.scheduler.answered - self.scheduler.exhausted
+        logger.info(f"📲 Dialing {dial.number} (attempt {dial.attempt}/{self.scheduler.max_attempts}, {left} numbers left)")
+        if not self.detector.dial(dial.number):
+            with self._lock:
+                if self.current is dial:
+                    self._finish(FAILED)
+        return 1.0
+
+    # ---- internals (lock held) ----
+
+    def _outcome(self):
+        if self._picked:
+            return self._screened or ANSWERED
+        rang = self.clock() - self._dialed_at
+        if rang < self.busy_seconds:
+            return BUSY
+        if rang >= self.ring_timeout:
+            return TIMEOUT
+        return NO_ANSWER
+
+    def _finish(self, outcome):
+        dial = self.current
+        self.current = None
+        self._next_dial_at = self.clock() + self.dial_gap
+        retry_at = self.scheduler.record(dial.index, outcome)
+        if outcome != ANSWERED:
+            when = time.strftime("%H:%M", time.localtime(retry_at)) if retry_at else "no more tries"
+            logger.info(f"🔁 {dial.number}: {outcome} (attempt {dial.attempt}) - retry {when}")
+
+    def _idle_wait(self):
+        wait = self.scheduler.seconds_until_due()
+        if wait is None:
+            if not self.scheduler.in_flight and not self.finished.is_set():
+                stats = self.scheduler.stats()
+                logger.info(f"🏁 Campaign complete | {stats['answered']} answered | "
+                            f"{stats['exhausted']} gave up | {stats['dials']} dials")
+                self.finished.set()
+            return 1.0
+        if wait > 60 and not self._wait_logged:
+            at = time.strftime("%H:%M", time.localtime(self.scheduler.clock() + wait))
+            logger.info(f"⏸️ Nothing due - next dial at {at} (retries / calling hours)")
+            self._wait_logged = True
+        return min(1.0, wait)
@@ -0,0 +1,145 @@
+"""
+Campaign Stats - live dashboard numbers, in memory
+
+Agent har call event pe CampaignAggregate update karta hai (dial, pickup,
+listen-through, result, response latency). Sirf counters + fixed buckets
+rakhe jate hain, isliye snapshot() ka cost calls ki ginti pe depend nahi
+karta - GUI har second refresh kar sakta hai, Excel dobara padhne ki
+zarurat nahi.
+
+No config / openpyxl import here - the GUI imports this before logging is set up.
+"""
+import threading
+import time
+from collections import deque
+
+# Listen-through colour bands (shared with AudioTracker's Excel rows)
+# (upper bound %, status, colour)
+LISTEN_BANDS = (
+    (20, "NOT INTERESTED", "FF6B6B"),  # RED
+    (60, "PARTIAL", "FFD93D"),         # YELLOW
+    (None, "INTERESTED", "6BCF7F"),    # GREEN
+)
+
+RESPONSE_BUCKET = 0.05   # Seconds per latency bucket
+RESPONSE_BUCKETS = 200   # 0 - 10 s; slower replies land in the last bucket
+RATE_WINDOW = 3600.0     # Seconds - calls/hour is over the last hour
+
+
+def listen_band(percentage):
+    """(status, colour) for a listen-through percentage"""
+    for limit, status, colour in LISTEN_BANDS:
+        if limit is None or percentage < limit:
+            return status, colour
+
+
+class CampaignAggregate:
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.started_at = clock()
+        self.dialed = 0
+        self.picked = 0
+        self.unanswered = 0
+        self.handled = 0
+        self._recent_dials = deque()  # Dial times inside RATE_WINDOW
+        self.listen_total_pct = 0.0
+        self.listen_count = 0
+        self.bands = {status: 0 for _, status, _ in LISTEN_BANDS}
+        self.results = {}
+        self.interest = {}
+        self._latency = [0] * RESPONSE_BUCKETS
+        self.responses = 0
+
+    # ---- updates (any thread) ----
+
+    def record_dial(self):
+        now = self.clock()
+        with self._lock:
+            self.dialed += 1
+            self._recent_dials.append(now)
+            self._expire(now)
+
+    def record_pickup(self):
+        with self._lock:
+            self.picked += 1
+
+    def record_unanswered(self):
+        with self._lock:
+            self.unanswered += 1
+
+    def record_listen(self, percentage):
+        status, _ = listen_band(percentage)
+        with self._lock:
+            self.listen_total_pct += percentage
+            self.listen_count += 1
+            self.bands[status] += 1
+
+    def record_result(self, interest, result, replaces=None):
+        """A call's outcome. replaces=(interest, result) moves a call out of an earlier (PENDING) outcome"""
+        with self._lock:
+            if replaces:
+                old_interest, old_result = replaces
+                self._bump(self.interest, old_interest, -1)
+                self._bump(self.results, old_result, -1)
+            else:
+                self.handled += 1
+            self._bump(self.interest, interest, 1)
+            self._bump(self.results, result, 1)
+
+    def record_response(self, seconds):
+        """Caller stopped talking -> AI audio started"""
+        index = min(RESPONSE_BUCKETS - 1, max(0, int(seconds / RESPONSE_BUCKET)))
+        with self._lock:
+            self._latency[index] += 1
+            self.responses += 1
+
+    # ---- read (GUI timer) ----
+
+    def snapshot(self):
+        """Dashboard numbers - constant cost however many calls were made"""
+        now = self.clock()
+        with self._lock:
+            self._expire(now)
+            window = min(RATE_WINDOW, max(now - self.started_at, 1.0))
+            answered_or_not = self.picked + self.unanswered
+            return {
+                "dialed": self.dialed,
+                "picked": self.picked,
+                "calls_per_hour": round(len(self._recent_dials) * 3600.0 / window, 1),
+                "pickup_rate_pct": round(self.picked * 100.0 / answered_or_not, 1) if answered_or_not else 0.0,
+                "listened": self.listen_count,
+                "avg_listen_pct": round(self.listen_total_pct / self.listen_count, 1) if self.listen_count else 0.0,
+                "listen_bands": dict(self.bands),
+                "interest": dict(self.interest),
+                "results": dict(self.results),
+                "response_p50_ms": self._percentile_ms(50),
+                "response_p95_ms": self._percentile_ms(95),
+                "responses": self.responses,
+            }
+
+    # ---- internals (lock held) ----
+
+    def _expire(self, now):
+        while self._recent_dials and now - self._recent_dials[0] > RATE_WINDOW:
+            self._recent_dials.popleft()
+
+    def _percentile_ms(self, p):
+        """Upper edge of the bucket holding the p-th percentile"""
+        if not self.responses:
+            return 0.0
+        target = p / 100.0 * self.responses
+        seen = 0
+        for index, count in enumerate(self._latency):
+            seen += count
+            if seen >= target:
+                return round((index + 1) * RESPONSE_BUCKET * 1000, 1)
+        return round(RESPONSE_BUCKETS * RESPONSE_BUCKET * 1000, 1)
+
+    @staticmethod
+    def _bump(counts, key, delta):
+        if not key:
+            return
+        counts[key] = counts.get(key, 0) + delta
+        if counts[key] <= 0:
+            del counts[key]
@@ -1,8 +1,14 @@
 """
 AI Calling Agent - Configuration
 Clean HTTP-based system with GPT-5 Nano
+
+Import karne pe koi kaam nahi hota: logging setup aur API key file tab hi
+padhe jate hain jab pehli baar `logger` / `OPENAI_API_KEY` maange jate hain
+(module __getattr__). Entry points (headless.py) usse pehle
+apply_overrides() se settings badal sakte hain.
 """
 import os
+import sys
 import random
 import logging
 
@@ -12,24 +18,51 @@ import logging
 LOG_LEVEL = logging.DEBUG  # DEBUG for detailed logs
 LOG_FORMAT = "%(asctime)s | %(levelname)-5s | %(message)s"
 LOG_DATE_FORMAT = "%H:%M:%S"
+LOG_FILE = "calling_agent.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024   # Rotate after this size...
+LOG_ROTATE_SECONDS = 24 * 3600     # ...or this age, whichever first
+LOG_BACKUP_COUNT = 7               # Rotated files kept (gzipped)
+LOG_JSON = False                   # True -> log file has one JSON object per line
 
-# Setup logging
-logging.basicConfig(
-    level=LOG_LEVEL, 
-    format=LOG_FORMAT, 
-    datefmt=LOG_DATE_FORMAT,
-    handlers=[
-        logging.StreamHandler(),  # Console output
-        logging.FileHandler("calling_agent.log", encoding="utf-8")  # File output
-    ]
-)
-logger = logging.getLogger("CallingAgent")
+
+def _setup_logger():
+    """Console + file written by a background thread (log_setup.py) - on first `logger` use"""
+    from log_setup import setup_logging
+    setup_logging(
+        level=LOG_LEVEL,
+        log_file=LOG_FILE,
+        fmt=LOG_FORMAT,
+        datefmt=LOG_DATE_FORMAT,
+        max_bytes=LOG_MAX_BYTES,
+        rotate_seconds=LOG_ROTATE_SECONDS,
+        backup_count=LOG_BACKUP_COUNT,
+        json_lines=LOG_JSON,
+    )
+    return logging.getLogger("CallingAgent")
 
 # ===========================================
 # HTTP Server Settings (Phone connects to PC)
 # ===========================================
 HTTP_HOST = "0.0.0.0"  # Listen on all interfaces
 HTTP_PORT = 8765
+HTTP_REQUEST_TIMEOUT = 10.0     # Seconds - idle keep-alive / stalled (half-open) connection is dropped
+HTTP_MAX_BODY_BYTES = 16 * 1024 # Bigger POST body -> 413
+HTTP_MAX_CONNECTIONS = 64       # Open phone connections; more -> 503
+HTTP_MAX_STREAMS = 8            # /events + /events/poll clients (dashboards) - own cap, never take a phone's slot
+HTTP_EVENT_HISTORY = 256        # Recent call-state events kept for /events resume
+HTTP_SSE_KEEPALIVE = 15.0       # Seconds - comment line on idle SSE streams (detects dead clients)
+HTTP_LONG_POLL_MAX = 25.0       # Seconds - longest /events/poll wait
+CALLBACK_WORKERS = 4            # Threads running CallState callbacks (off the HTTP thread)
+CALLBACK_BUDGET = 0.25          # Seconds - slower callbacks get a warning
+HTTP_PUSH_ENABLED = True        # Agent also listens for the phone's HTTP pushes (next to ADB polling)
+BUS_DEDUP_WINDOW = 2.0          # Seconds - same transition from another source within this = duplicate
+
+# ===========================================
+# ADB Settings (USB)
+# ===========================================
+ADB_POLL_INTERVAL = 0.3          # Seconds - call-state polling when it's the only source
+ADB_WATCHDOG_INTERVAL = 2.0      # Seconds - polling once the phone pushes over the USB tunnel
+ADB_REVERSE_CHECK_INTERVAL = 3.0 # Seconds - re-plug / lost `adb reverse` check
 
 # ===========================================
 # OpenAI Settings - GPT-5 Nano (Cheapest)
@@ -47,8 +80,19 @@ def get_api_key():
     
     return ""
 
-OPENAI_API_KEY = get_api_key()
+# OPENAI_API_KEY - read on first use (see __getattr__ at the bottom)
 OPENAI_MODEL = "gpt-4.1-nano"  # CHEAPEST: $0.10/M input, $0.40/M output
+OPENAI_PRICE_INPUT_PER_M = 0.10    # USD per 1M prompt tokens (for cost reports)
+OPENAI_PRICE_CACHED_INPUT_PER_M = 0.025  # USD per 1M prompt tokens served from the prompt cache
+OPENAI_PRICE_OUTPUT_PER_M = 0.40   # USD per 1M completion tokens
+
+# Shared HTTP connection pool (see openai_client.py)
+OPENAI_BASE_URL = os.environ.get("OPENAI_BASE_URL") or None  # Override for local stand-in server
+OPENAI_CONNECT_TIMEOUT = 3.0    # Seconds - TCP + TLS setup
+OPENAI_READ_TIMEOUT = 20.0      # Seconds - waiting for response bytes
+OPENAI_POOL_SIZE = 10           # Max keep-alive connections
+OPENAI_KEEPALIVE_EXPIRY = 120   # Seconds an idle connection is kept open
+OPENAI_MAX_RETRIES = 0           # SDK retries off - 429s/errors retried by rate_limiter.py
 
 # System prompt for natural Hindi conversation - 2-3 sentences max
 SYSTEM_PROMPT = """Tu Universal Skill Development Centre ka telecaller hai. Natural Hindi me baat kar jaise ek normal insaan baat karta hai.
@@ -124,8 +168,117 @@ OPENING_MP3 = os.path.join(os.path.dirname(__file__), "opening.mp3")
 # ===========================================
 SILENCE_TIMEOUT = 20  # Seconds - after opening.mp3 finishes
 MAX_CALL_DURATION = 180  # 3 minutes max
+RING_TIMEOUT = 30  # Seconds - nobody picks up -> END_CALL, next number
 
 SILENCE_MESSAGE = "Aapki awaaz nahi aa rahi. Kripya centre visit karein discount ke liye. Dhanyavaad!"
+MAX_DURATION_MESSAGE = "Bahut accha laga. Bye!"
+GOODBYE_MESSAGE = "Theek hai, dhanyavaad! Bye!"
+IRRELEVANT_GOODBYE_MESSAGE = "Theek hai, aapka dhanyavaad. Agar course me interest ho to call kijiye. Bye!"
+
+# ===========================================
+# Campaign Scheduler (PC picks the next number)
+# ===========================================
+# xlsx / csv / txt, numbers in the first column (optional 2nd column: priority,
+# lower dials first). None = phone app dials its own Excel list, no retries.
+CAMPAIGN_NUMBERS_FILE = None
+CAMPAIGN_MAX_ATTEMPTS = 3           # Dials per number, retries included
+CAMPAIGN_RETRY_DELAYS = {           # Seconds until the next attempt, per outcome
+    "NO_ANSWER": 30 * 60,
+    "BUSY": 10 * 60,
+    "TIMEOUT": 60 * 60,             # Rang for RING_TIMEOUT
+    "FAILED": 5 * 60,               # Phone never started ringing
+    "MACHINE": 2 * 60 * 60,         # Voicemail picked up (AMD_ENABLED)
+    "UNREACHABLE": 60 * 60,         # Operator SIT tones
+}
+CAMPAIGN_CALLING_HOURS = (10, 19)   # Local time [start, end) hours; None = any time
+CAMPAIGN_DIAL_GAP = 5               # Seconds between a call ending and the next dial
+CAMPAIGN_BUSY_SECONDS = 5           # Ended this soon after DIAL without pickup = busy / rejected
+CAMPAIGN_DIAL_TIMEOUT = 15          # No ringing this long after DIAL = failed
+
+# ===========================================
+# Pickup Screening (answering machine / IVR / ringback)
+# ===========================================
+# "ACTIVE" sirf itna batata hai ki line connect hui - voicemail, operator
+# announcement ya abhi bhi bajti ringback bhi ACTIVE dikhti hai. Opening se
+# pehle mic sunte hain; machine / tone pe call wahin kat jaati hai.
+# Default OFF: har insaan wale pickup pe opening ~1.2-1.4 sec late shuru hoti hai
+# (benchmarks/bench_pickup.py), audio-only mode me bhi mic khulta hai, aur galti
+# se MACHINE samjha gaya insaan kat jaata hai - asli calls pe accuracy dekh ke ON karo.
+AMD_ENABLED = False
+AMD_MAX_SECONDS = 3.0       # Opening waits at most this long for a verdict
+AMD_HUMAN_SILENCE = 1.2     # Nothing at all heard this long = person waiting for us
+AMD_HUMAN_PAUSE = 0.5       # Greeting followed by this much silence = person ("Hello?")
+AMD_MACHINE_SPEECH = 2.5    # Greeting running this long without that pause = machine
+AMD_TONE_SECONDS = 0.3      # Ringback / SIT / beep tone this long = not a person
+AMD_ENERGY_THRESHOLD = 300  # Voice RMS when there's no calibrated listener (audio-only mode)
+
+# ===========================================
+# Keypress During the Opening (DTMF)
+# ===========================================
+# "Interested ho to 1 dabaiye" - audio-only mode me opening ke dauraan mic pe
+# DTMF sunte hain. Koi bhi key opening rok deti hai aur AudioTracker me likhi jaati hai.
+DTMF_ENABLED = False
+DTMF_INTERESTED_DIGITS = "1"    # These keys = interested (others are still logged)
+DTMF_AI_HANDOFF = False         # Audio-only mode: interested key -> AI conversation (loads Whisper + LLM)
+DTMF_MIN_SECONDS = 0.04         # Tone must last this long to count
+DTMF_GAP_SECONDS = 0.04         # Same key again only after this much quiet (debounce)
+DTMF_HANDOFF_MESSAGE = "Dhanyavaad! Boliye, aap kya jaanna chahenge?"
+
+# ===========================================
+# Echo Cancellation (agent ki apni awaaz mic me)
+# ===========================================
+# PC speaker ki awaaz PC mic me wapas aati hai. TTS jo PCM bajata hai wahi
+# reference - delay cross-correlation se, NLMS filter use mic se ghata deta hai.
+# ON: listener AI ke bolte waqt bhi khula rehta hai (beech me bola hua nahi khota).
+ECHO_CANCEL_ENABLED = False
+ECHO_SAMPLE_RATE = 16000        # System mic opened at this rate when cancelling (CPU grows ~rate^2)
+ECHO_TAIL_MS = 64               # Room echo modelled this long after the direct path (filter length)
+ECHO_STEP_SIZE = 0.5            # NLMS step (0-1): higher adapts faster, noisier
+ECHO_MAX_DELAY = 0.5            # Seconds - player start -> echo in the mic searched up to this
+ECHO_RESIDUAL_ATTENUATION = 0.1   # Leftover echo scale before the room noise level is known (then: down to it)
+
+# ===========================================
+# Start-up Warm-up (before READY)
+# ===========================================
+# Opening audio decode, fixed-phrase TTS, mic calibration, OpenAI connection
+# and the Excel files - all in parallel, so the first call isn't the cold one
+WARMUP_ENABLED = True
+WARMUP_TIMEOUT = 20         # Seconds - READY anyway; slow tasks finish in background
+
+# ===========================================
+# Speculative Generation (LLM starts on partial transcripts)
+# ===========================================
+SPECULATIVE_MODE = False            # Extra Whisper + LLM cost, lower reply latency
+SPECULATION_INTERVAL = 1.0          # Seconds of new audio between interim transcripts
+SPECULATION_MIN_AUDIO = 1.0         # Don't transcribe partials shorter than this
+SPECULATION_MATCH_THRESHOLD = 0.8   # Final vs speculated text similarity to reuse reply
+
+# ===========================================
+# Turn Latency Budget (deadline-aware LLM calls)
+# ===========================================
+LLM_SOFT_DEADLINE = 1.2     # Seconds - no first token yet? play a filler phrase
+LLM_HEDGE_DELAY = 1.5       # Seconds - still no first token? send a 2nd (hedged) request
+LLM_HARD_DEADLINE = 6.0     # Seconds - give up and use LLM_FALLBACK_REPLY
+LLM_FALLBACK_REPLY = "Ji, ek second. Dobara boliye?"
+
+FILLER_PHRASES = [
+    "Haan ji, ek second.",
+    "Ji, bataata hoon.",
+]
+
+# ===========================================
+# Post-call Analysis (background, batched)
+# ===========================================
+ANALYSIS_BATCH_SIZE = 5     # Calls per structured-output request
+ANALYSIS_MAX_WAIT = 30      # Seconds - flush a partial batch after this
+
+# ===========================================
+# Rate Limits (shared request scheduler)
+# ===========================================
+CHAT_RPM = 500              # Chat completions - requests per minute
+CHAT_TPM = 200000           # Chat completions - tokens per minute
+TRANSCRIPTION_RPM = 50      # Whisper uploads - requests per minute
+RATE_LIMIT_MAX_ATTEMPTS = 4 # Tries per request (429 / connection errors)
 
 # ===========================================
 # Opening Pitches (for TTS if no MP3)
@@ -141,9 +294,7 @@ def get_random_pitch():
 # ===========================================
 # Excel Settings
 # ===========================================
-# Save in pc_agent/reports folder
-import sys
-
+# Save in pc_agent/results folder (created by ExcelHandler on first write)
 def get_base_path():
     """Get base path - works for both script and exe"""
     if getattr(sys, 'frozen', False):
@@ -154,5 +305,58 @@ def get_base_path():
         return os.path.dirname(__file__)
 
 RESULTS_DIR = os.path.join(get_base_path(), "results")
-os.makedirs(RESULTS_DIR, exist_ok=True)
 OUTPUT_EXCEL = os.path.join(RESULTS_DIR, "results.xlsx")
+
+# ===========================================
+# Latency Tracing (Chrome trace event JSON)
+# ===========================================
+TRACE_ENABLED = True
+TRACE_DIR = os.path.join(get_base_path(), "traces")
+TRACE_MAX_BYTES = 5 * 1024 * 1024   # Rotate trace.json after this size
+TRACE_BACKUP_COUNT = 5              # Keep trace.1.json ... trace.5.json
+
+# ===========================================
+# Call Recording (bure transcripts debug / VAD-ASR tuning)
+# ===========================================
+# Har call ki file RECORDING_DIR me, naam Excel ke "Recording" column me.
+# "mic" = jo listener ne suna, "playback" = agent ki awaaz, "both" = stereo
+# (left mic, right agent). Opus (ffmpeg) - ffmpeg na ho to WAV.
+RECORDING_MODE = None               # None (off) / "mic" / "playback" / "both"
+RECORDING_DIR = os.path.join(get_base_path(), "recordings")
+RECORDING_SAMPLE_RATE = 16000       # Everything resampled to this before encoding
+RECORDING_BITRATE = "24k"           # Opus bitrate (~180 KB per minute)
+RECORDING_BUFFER_SECONDS = 10       # Mic ring buffer per call (worker drains it twice a second)
+RECORDING_MAX_AGE_DAYS = 30         # Older recordings are deleted...
+RECORDING_MAX_TOTAL_MB = 2000       # ... and the oldest ones past this total
+
+# ===========================================
+# Lazy values + overrides
+# ===========================================
+_LAZY = {
+    "logger": _setup_logger,
+    "OPENAI_API_KEY": get_api_key,
+}
+
+
+def __getattr__(name):
+    """Expensive settings are computed once, on first access"""
+    factory = _LAZY.get(name)
+    if factory is None:
+        raise AttributeError(f"module 'config' has no attribute '{name}'")
+    value = globals()[name] = factory()
+    return value
+
+
+def apply_overrides(values):
+    """
+    Replace settings (config file / CLI). Must run before the agent modules
+    are imported - they copy values with `from config import ...`.
+    Unknown names raise ValueError (typo in the config file).
+    """
+    for name, value in values.items():
+        if not name.isupper() or not (name in globals() or name in _LAZY):
+            raise ValueError(f"Unknown setting: {name}")
+        if name == "LOG_LEVEL" and isinstance(value, str):
+            value = logging.getLevelName(value.upper())
+        globals()[name] = value
+
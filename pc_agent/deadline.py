@@ -0,0 +1,177 @@
+"""
+Deadline-aware LLM turns - latency budget per turn
+
+Har turn ka budget:
+  soft deadline  - first token nahi aaya? filler phrase bajao (TTS cache se)
+  hedge delay    - ab bhi kuch nahi? doosri (hedged) request bhejo;
+                   jo pehle first token de wo jeetegi, doosri cancel
+  hard deadline  - sab cancel, canned LLM_FALLBACK_REPLY
+Turn latency p50/p95/p99 track hoti hai.
+"""
+import threading
+import time
+from config import (
+    logger, LLM_SOFT_DEADLINE, LLM_HEDGE_DELAY,
+    LLM_HARD_DEADLINE, LLM_FALLBACK_REPLY
+)
+from latency_stats import LatencyStats
+
+
+class _Attempt:
+    """One streaming request for the turn"""
+
+    def __init__(self, llm, user_text, wake, name):
+        self.name = name
+        self.wake = wake
+        self.cancel_event = threading.Event()
+        self.first_token = threading.Event()
+        self.first_token_at = None  # Monotonic time of the first text delta
+        self.done = threading.Event()
+        self.reply = ""
+        self.error = None
+        self.usage = []
+        self.thread = threading.Thread(target=self._run, args=(llm, user_text), daemon=True)
+        self.thread.start()
+
+    def _run(self, llm, user_text):
+        try:
+            for text in llm.stream_draft(user_text, self.cancel_event, self.usage):
+                self.reply += text
+                if not self.first_token.is_set():
+                    self.first_token_at = time.monotonic()
+                    self.first_token.set()
+                    self.wake.set()
+        except Exception as e:
+            self.error = e
+            logger.error(f"LLM Error ({self.name}): {e}")
+        finally:
+            self.done.set()
+            self.wake.set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def failed(self):
+        return self.done.is_set() and (self.error is not None or not self.first_token.is_set())
+
+
+class DeadlineResponder:
+    def __init__(self, llm, soft_deadline=LLM_SOFT_DEADLINE,
+                 hedge_delay=LLM_HEDGE_DELAY, hard_deadline=LLM_HARD_DEADLINE):
+        self.llm = llm
+        self.soft_deadline = soft_deadline
+        self.hedge_delay = hedge_delay
+        self.hard_deadline = hard_deadline
+
+        self.latency = LatencyStats()
+        self.turns = 0
+        self.fillers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+        self.last_first_token_at = None  # For tracing transcript -> first token
+
+    def respond(self, user_text, on_soft_deadline=None, draft=None):
+        """
+        Generate reply within the turn budget. on_soft_deadline() is called
+        (at most once) if no first token arrived by the soft deadline.
+        draft: speculative reply to try first - draft(timeout) -> committed
+        reply or None; its wait is part of the same budget (filler, hard deadline).
+        Returns the reply; the turn is committed to conversation history.
+        """
+        start = time.monotonic()
+        soft_fired = False
+        self.turns += 1
+
+        if draft is not None:
+            result = []
+            waiter = threading.Thread(target=lambda: result.append(draft(self.hard_deadline)), daemon=True)
+            waiter.start()
+            waiter.join(self.soft_deadline)
+            if waiter.is_alive():
+                # Matched draft still streaming
+                soft_fired = True
+                self.fillers += 1
+                logger.info(f"⏱️ Soft deadline ({self.soft_deadline}s) - playing filler (draft)")
+                if on_soft_deadline:
+                    on_soft_deadline()
+                waiter.join()
+            self.last_first_token_at = None  # Draft streamed before the transcript
+            if result and result[0]:
+                self.latency.add(time.monotonic() - start)
+                return result[0]
+
+        # Time spent on the draft counts - hedge / hard deadline may already be due
+        wake = threading.Event()
+        attempts = [_Attempt(self.llm, user_text, wake, "primary")]
+        hedged = False
+        winner = None
+
+        while True:
+            wake.clear()
+            now = time.monotonic() - start
+
+            winner = next((a for a in attempts if a.first_token.is_set() and a.error is None), None)
+            if winner or now >= self.hard_deadline:
+                break
+
+            if not hedged and (now >= self.hedge_delay or all(a.failed for a in attempts)):
+                # Slow (or failed) primary - race a second request
+                hedged = True
+                self.hedges += 1
+                logger.info(f"⏱️ No first token after {now:.1f}s - hedging")
+                attempts.append(_Attempt(self.llm, user_text, wake, "hedge"))
+                continue
+
+            if hedged and all(a.failed for a in attempts):
+                break
+
+            if not soft_fired and now >= self.soft_deadline:
+                soft_fired = True
+                self.fillers += 1
+                logger.info(f"⏱️ Soft deadline ({self.soft_deadline}s) - playing filler")
+                if on_soft_deadline:
+                    on_soft_deadline()
+                continue
+
+            upcoming = [self.hard_deadline]
+            if not hedged:
+                upcoming.append(self.hedge_delay)
+            if not soft_fired:
+                upcoming.append(self.soft_deadline)
+            wake.wait(max(0.0, min(upcoming) - now))
+
+        # Cancel the losers
+        for attempt in attempts:
+            if attempt is not winner:
+                attempt.cancel()
+
+        reply = None
+        self.last_first_token_at = winner.first_token_at if winner else None
+        if winner:
+            if winner.name == "hedge":
+                self.hedge_wins += 1
+            remaining = self.hard_deadline - (time.monotonic() - start)
+            if winner.done.wait(max(0.0, remaining)) and winner.error is None:
+                reply = ' '.join(winner.reply.split())
+            else:
+                winner.cancel()
+
+        if not reply:
+            self.fallbacks += 1
+            logger.warning(f"⏱️ Hard deadline ({self.hard_deadline}s) - canned reply")
+            reply = LLM_FALLBACK_REPLY
+
+        self.latency.add(time.monotonic() - start)
+        return self.llm.commit_turn(user_text, reply)
+
+    def as_dict(self):
+        return dict(
+            self.latency.summary(),
+            turns=self.turns,
+            fillers=self.fillers,
+            hedges=self.hedges,
+            hedge_wins=self.hedge_wins,
+            fallbacks=self.fallbacks,
+        )
@@ -0,0 +1,128 @@
+"""
+DTMF Detector - "interested ho to 1 dabaiye" wale keypress pakadta hai
+
+Goertzel filter bank (8 DTMF frequencies) ek matrix multiply me: har chunk
+ke saare ~25 ms frames (aadhe overlap ke saath, taaki 40 ms ki chhoti key
+bhi poore frame me aaye) ek saath. Har frame pe:
+  - row (697-941 Hz) aur column (1209-1633 Hz) group ka sabse tez tone
+  - dono milke 650-1700 Hz band ki energy ka bada hissa (speech / music
+    talk-off se bachav; band isliye ki opening ki awaaz neeche wali
+    frequencies me tone ko na dabaye)
+  - twist (row vs column level) limit me
+Digit tab maana jaata hai jab same key DTMF_MIN_SECONDS tak rahe; wahi key
+dobara tab hi ginti hai jab beech me DTMF_GAP_SECONDS ka gap aaye (debounce).
+
+CPU / accuracy: python benchmarks/bench_dtmf.py
+"""
+import numpy as np
+from config import DTMF_MIN_SECONDS, DTMF_GAP_SECONDS
+
+ROW_FREQS = (697, 770, 852, 941)
+COL_FREQS = (1209, 1336, 1477, 1633)
+KEYS = ("123A", "456B", "789C", "*0#D")
+
+FRAME_SECONDS = 0.0256  # 205 samples at 8 kHz - the classic Goertzel block
+HOP_SECONDS = FRAME_SECONDS / 2
+MIN_RMS = 40            # Quieter frames are ignored (int16 scale)
+BAND = (650, 1700)      # Hz - where the share is measured
+MIN_SHARE = 0.6         # Row + column tone energy / BAND energy
+MIN_TONE_SHARE = 0.08   # Each tone on its own
+MAX_TWIST = 8.0         # Stronger tone / weaker tone power (~9 dB)
+MAX_NEIGHBOUR = 0.25    # Runner-up in a group vs the winner (power)
+
+
+class DTMFDetector:
+    def __init__(self, sample_rate, min_seconds=DTMF_MIN_SECONDS, gap_seconds=DTMF_GAP_SECONDS):
+        """sample_rate: of the int16 samples passed to feed()"""
+        self.sample_rate = sample_rate
+        self.frame = int(round(sample_rate * FRAME_SECONDS))
+        self.hop = self.frame // 2
+        # Valid frames in a row that span min_seconds / invalid ones that fit in gap_seconds
+        self.min_frames = max(1, int(np.ceil((min_seconds - FRAME_SECONDS) / HOP_SECONDS - 0.01)) + 1)
+        self.gap_frames = max(1, int(round((gap_seconds - FRAME_SECONDS) / HOP_SECONDS)) + 1)
+
+        # Goertzel at the exact DTMF frequencies == DFT against these 8 cos/sin pairs
+        n = np.arange(self.frame)
+        freqs = np.array(ROW_FREQS + COL_FREQS, dtype=np.float64)
+        angles = 2 * np.pi * np.outer(n, freqs) / sample_rate
+        self._basis = np.hstack((np.cos(angles), np.sin(angles))).astype(np.float32)
+        bins = np.fft.rfftfreq(self.frame, 1.0 / sample_rate)
+        self._band = slice(*np.searchsorted(bins, BAND))
+        self._pending = np.empty(0, dtype=np.float32)
+
+        self.frames = 0          # Frames analysed
+        self.digits = []         # (digit, seconds into the stream)
+        self._current = None     # Key being held
+        self._held = 0
+        self._gap = self.gap_frames
+        self._reported = False
+
+    def feed(self, samples):
+        """int16 samples, any length. Returns digits that completed in this chunk ("" if none)"""
+        audio = np.concatenate((self._pending, np.asarray(samples, dtype=np.float32)))
+        if audio.size < self.frame:
+            self._pending = audio
+            return ""
+        count = (audio.size - self.frame) // self.hop + 1
+        self._pending = audio[count * self.hop:]
+        frames = np.lib.stride_tricks.sliding_window_view(audio, self.frame)[::self.hop][:count]
+        keys = self._keys(frames)
+        found = []
+        for key in keys.tolist():
+            self.frames += 1
+            digit = self._step(key)
+            if digit:
+                at = (self.frames - 1) * HOP_SECONDS + FRAME_SECONDS  # End of the confirming frame
+                self.digits.append((digit, round(at, 3)))
+                found.append(digit)
+        return "".join(found)
+
+    def _keys(self, frames):
+        """Key index (row * 4 + col) per frame, -1 = no valid DTMF"""
+        energy = np.einsum("ij,ij->i", frames, frames)
+        projection = frames @ self._basis
+        power = projection[:, :8] ** 2 + projection[:, 8:] ** 2
+        # Same |X|^2 scale as the Goertzel outputs: a tone inside BAND -> share ~1.0
+        band = np.abs(np.fft.rfft(frames, axis=1)[:, self._band]) ** 2
+        share = power / (band.sum(axis=1) + 1e-9)[:, None]
+
+        rows, cols = share[:, :4], share[:, 4:]
+        row = np.argmax(rows, axis=1)
+        col = np.argmax(cols, axis=1)
+        idx = np.arange(frames.shape[0])
+        row_share = rows[idx, row]
+        col_share = cols[idx, col]
+        rows_sorted = np.sort(rows, axis=1)
+        cols_sorted = np.sort(cols, axis=1)
+
+        valid = (energy / self.frame >= MIN_RMS ** 2)
+        valid &= row_share + col_share >= MIN_SHARE
+        valid &= np.minimum(row_share, col_share) >= MIN_TONE_SHARE
+        strong = np.maximum(row_share, col_share)
+        valid &= strong <= MAX_TWIST * np.minimum(row_share, col_share)
+        valid &= rows_sorted[:, -2] <= MAX_NEIGHBOUR * row_share
+        valid &= cols_sorted[:, -2] <= MAX_NEIGHBOUR * col_share
+        return np.where(valid, row * 4 + col, -1)
+
+    def _step(self, key):
+        """Debounce: returns the digit on the frame it's confirmed"""
+        if key < 0:
+            self._gap += 1
+            if self._gap >= self.gap_frames:
+                self._current = None
+                self._held = 0
+                self._reported = False
+            return None
+        if key != self._current:
+            if self._current is not None and self._gap < self.gap_frames and self._reported:
+                # Key changed without a gap - a glitch in the held tone, not a new press
+                return None
+            self._current = key
+            self._held = 0
+            self._reported = False
+        self._gap = 0
+        self._held += 1
+        if self._held >= self.min_frames and not self._reported:
+            self._reported = True
+            return KEYS[key // 4][key % 4]
+        return None
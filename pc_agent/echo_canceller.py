@@ -0,0 +1,518 @@
+"""
+Echo Canceller - agent ki apni awaaz (speaker -> mic) capture se hataata hai
+
+PC ka speaker phone ko awaaz deta hai aur wahi awaaz PC mic me bhi aa jaati
+hai. TTSEngine jo file bajata hai uska PCM (mic ke sample rate pe decode)
+EchoReference me player start ke monotonic time ke saath jaata hai. Mic ka
+har chunk EchoCanceller.process() se guzarta hai:
+
+  1. Delay: reference aur capture ka cross-correlation (GCC-PHAT, ek FFT) -
+     player start se mic tak kitni der (ffplay buffer + sound card + hawa).
+     Har naye ffplay ki start latency alag hoti hai, isliye har utterance ke
+     pehle ~100-200 ms pe filter ka apna prediction capture se match karke
+     reference khiskaya jaata hai (tab tak echo jaisi awaaz dheemi)
+  2. NLMS: ECHO_TAIL_MS lamba adaptive FIR (block update, numpy matmul)
+     room ka echo path seekhta hai; estimate capture se ghata diya jaata hai
+  3. Double-talk: filter seekh chuka ho aur ghatane ke baad bhi block me
+     zyada awaaz bache = saamne wala bol raha hai -> adaptation ruki rehti hai
+  4. Residual: sirf agent bol raha ho to bacha hua echo room noise ke level tak
+     dheema (usse neeche nahi - listener ka threshold noise ke upar hi rahe).
+     Filter seekhne se pehle (call ka pehla jawab) half duplex: agent ke bolte
+     waqt mic room noise tak dheema - listener ko apni awaaz nahi sunti
+
+EchoCancellingMicrophone kisi bhi sr.AudioSource ko wrap karta hai - listener,
+pickup screening aur keypad sabko saaf audio milta hai. ERLE (echo kitna
+ghata, dB) stats() / metrics me. CPU / ERLE: python benchmarks/bench_echo.py
+"""
+import threading
+import time
+
+import numpy as np
+import speech_recognition as sr
+
+import metrics
+from config import (
+    ECHO_TAIL_MS, ECHO_STEP_SIZE, ECHO_MAX_DELAY, ECHO_RESIDUAL_ATTENUATION
+)
+
+ECHO_ERLE = metrics.gauge("agent_echo_erle_db", "Echo removed by the canceller (dB, recent single-talk)")
+ECHO_DELAY = metrics.gauge("agent_echo_delay_ms", "Estimated player start -> mic echo delay")
+
+BLOCK_SECONDS = 0.004       # NLMS update every 64 samples at 16 kHz
+PRE_EMPHASIS = 0.9          # Adaptation on x[n] - 0.9 x[n-1] (speech energy is mostly low frequencies)
+CORRELATION_SECONDS = 1.0   # Capture window used for the delay estimate
+DELAY_CONFIDENCE = 8.0      # GCC-PHAT peak vs the spread of the other lags
+DELAY_RETRY = 0.5           # Seconds of playback between estimates until one is found
+DELAY_RECHECK = 5.0         # ... and once converged (path changes); every CORRELATION_SECONDS until then
+DELAY_HYSTERESIS = 2        # Samples - smaller moves are the peak hopping between neighbouring lags
+ALIGN_SECONDS = 0.1         # New player: once this much of its echo is heard, it's lined up...
+ALIGN_SEARCH = 0.03         # ... within this much of the last delay (start latency varies per launch)
+ALIGN_GIVE_UP = 1.0         # Seconds of trying before the last delay is kept
+ALIGN_ECHO_RATIO = 2.0      # Until then: a chunk this close to the predicted echo energy is echo
+MIN_REFERENCE_RMS = 20.0    # Quieter reference = speaker is silent, nothing to learn
+DOUBLE_TALK_RATIO = 0.25    # Energy left after cancelling vs before (~6 dB)...
+DOUBLE_TALK_DECAY = 0.7     # ... over the last few blocks (~12 ms): one badly cancelled block isn't the caller
+SWAP_RATIO = 0.7            # Background error vs foreground (~130 ms, leaky) to take its coefficients
+RESET_RATIO = 8.0           # ... and to throw the background away
+BACKGROUND_ERLE = 0.1       # Background must also remove 10 dB of what the mic hears (not near-end speech)
+CONVERGED_ERLE = 10.0       # dB - below this, everything is treated as single-talk
+RESYNC_SECONDS = 0.03       # Reads later than the sample clock by this much...
+LATE_CHUNKS = 8             # ... this many times in a row = samples were dropped, clock jumps
+CLOCK_GAIN = 0.001          # How fast the sample clock follows read() timestamps (jitter vs drift)
+NOISE_RISE = 1.002          # Per chunk: background noise estimate follows the quietest capture, rises slowly
+
+
+class EchoReference:
+    """What the speaker is playing - PCM segments on the monotonic clock (TTSEngine feeds it)"""
+
+    def __init__(self, sample_rate, keep_seconds=5.0):
+        self.sample_rate = sample_rate
+        self.keep_seconds = keep_seconds
+        self._segments = []       # (start, float32 samples)
+        self._stopped_at = None
+        self.played = 0           # Segments so far - each player start has its own latency
+        self._lock = threading.Lock()
+
+    def play(self, samples, started_at):
+        """Playback of samples (at sample_rate) began at started_at (time.monotonic())"""
+        samples = np.asarray(samples, dtype=np.float32)
+        with self._lock:
+            if self._stopped_at is not None and self._stopped_at >= started_at:
+                # stop() came before the decode finished
+                samples = samples[:int((self._stopped_at - started_at) * self.sample_rate)]
+            self._segments.append((started_at, samples))
+            self.played += 1
+
+    def stop(self, at):
+        """Player was killed at `at` - nothing after it reaches the speaker"""
+        with self._lock:
+            self._stopped_at = at
+            self._segments = [(start, samples[:max(0, int((at - start) * self.sample_rate))])
+                              for start, samples in self._segments]
+
+    def render(self, start, count):
+        """float32 reference for [start, start + count / sample_rate), zeros where nothing played"""
+        out = np.zeros(count, dtype=np.float32)
+        with self._lock:
+            self._segments = [(s, x) for s, x in self._segments
+                              if s + x.size / self.sample_rate > start - self.keep_seconds]
+            for seg_start, samples in self._segments:
+                offset = int(np.floor((seg_start - start) * self.sample_rate + 0.5))
+                lo, hi = max(0, offset), min(count, offset + samples.size)
+                if hi > lo:
+                    out[lo:hi] += samples[lo - offset:hi - offset]
+        return out
+
+
+class EchoCanceller:
+    def __init__(self, sample_rate, reference=None, tail_ms=ECHO_TAIL_MS, step_size=ECHO_STEP_SIZE,
+                 max_delay=ECHO_MAX_DELAY, residual_attenuation=ECHO_RESIDUAL_ATTENUATION):
+        """
+        sample_rate: of the int16 capture passed to process() (reference is rendered at the same rate)
+        reference:   EchoReference the player feeds (default: a new one)
+        """
+        self.sample_rate = sample_rate
+        self.reference = reference or EchoReference(sample_rate)
+        self.taps = max(16, int(sample_rate * tail_ms / 1000))
+        self.lead = self.taps // 8   # Filter starts a little before the estimated delay
+        self.block = max(16, int(sample_rate * BLOCK_SECONDS))
+        self.step_size = step_size
+        self.max_delay = max_delay
+        self.residual_attenuation = residual_attenuation
+
+        # Coefficients in reference order: y[i] = sum_j x[i + j] * weights[j]
+        self.weights = np.zeros(self.taps, dtype=np.float32)      # Foreground - subtracted
+        self.background = np.zeros(self.taps, dtype=np.float32)   # Adapts on every block
+        self.delay = None                 # Seconds, capture time - reference time
+        self.delay_estimates = 0
+        self._history = np.zeros(int(CORRELATION_SECONDS * sample_rate), dtype=np.float32)
+        self._history_filled = 0
+        self._since_estimate = 0.0        # Seconds of playback since the last delay estimate
+        self._played = 0                  # reference.played at the last check
+        self._aligning = None             # Seconds since a new player started (until it's aligned)
+        self._candidate = None            # Offset (samples) the last alignment attempt found
+        self._noise = None                # Capture RMS while nothing plays (tracks the quietest)
+        self._next_at = None              # Sample clock: capture time of the next chunk
+        self._late = 0.0                  # Smallest lateness in the current run of late reads
+        self._drift = 0.0                 # Slow clock correction not applied yet (< 1 sample)
+        self._late_chunks = 0
+        self._foreground_error = 0.0      # Leaky error energies of the two filters
+        self._background_error = 0.0
+        self._capture_energy = 0.0
+        self._talk_before = 0.0           # Short leaky energies around the subtraction (double-talk)
+        self._talk_after = 0.0
+        self._last_trial = 0.0            # Background error carried into the next block (pre-emphasis)
+        self._echo_smooth = 0.0           # Leaky single-talk energies (convergence)
+        self._residual_smooth = 0.0
+        self._learnt = False              # Converged since the last reset (double-talk detection on)
+
+        # Totals for stats()
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.echo_seconds = 0.0           # Single-talk (agent only) audio
+        self.converged_seconds = 0.0      # ... of it with the filter converged (totals below)
+        self.double_talk_seconds = 0.0
+        self._echo_in = 0.0
+        self._echo_out = 0.0              # After the filter
+        self._echo_final = 0.0            # After residual attenuation
+
+    @property
+    def converged(self):
+        return self._echo_smooth > self._residual_smooth * 10 ** (CONVERGED_ERLE / 10)
+
+    def stats(self):
+        return {
+            "delay_ms": round(self.delay * 1000, 1) if self.delay is not None else None,
+            "erle_db": _db(self._echo_smooth, self._residual_smooth),
+            "erle_converged_db": _db(self._echo_in, self._echo_out),
+            "erle_total_db": _db(self._echo_in, self._echo_final),
+            "echo_s": round(self.echo_seconds, 2),
+            "converged_s": round(self.converged_seconds, 2),
+            "double_talk_s": round(self.double_talk_seconds, 2),
+            "cpu_ms_per_audio_s": round(self.cpu_seconds / self.audio_seconds * 1000, 2) if self.audio_seconds else None,
+        }
+
+    def process(self, samples, captured_at):
+        """
+        int16 capture (any length) whose first sample was recorded at captured_at
+        (time.monotonic()). Returns int16 with the agent's echo removed.
+        """
+        t0 = time.perf_counter()
+        capture = np.asarray(samples, dtype=np.float32)
+        n = capture.size
+        start = self._clock(captured_at, n)
+        self._remember(capture)
+        self.audio_seconds += n / self.sample_rate
+
+        # Could anything the speaker played be in this chunk?
+        heard = self.reference.render(start - self.max_delay, int(self.max_delay * self.sample_rate) + n)
+        if not heard.any():
+            rms = float(np.sqrt(np.mean(capture * capture))) if n else 0.0
+            self._noise = rms if self._noise is None else min(rms, self._noise * NOISE_RISE)
+            self.cpu_seconds += time.perf_counter() - t0
+            return samples
+        end = start + n / self.sample_rate
+        self._since_estimate += n / self.sample_rate
+        if self.reference.played != self._played:
+            self._played = self.reference.played
+            if self.delay is not None:
+                self._aligning = 0.0
+                self._candidate = None
+        if self._aligning is not None:
+            self._aligning += n / self.sample_rate
+            if self._aligning >= self.delay + ALIGN_SECONDS:
+                if self._align(end) or self._aligning >= self.delay + ALIGN_GIVE_UP:
+                    self._aligning = None
+                    # Whatever the background learnt against the old alignment is wrong now
+                    self.background[:] = self.weights
+                    self._background_error = self._foreground_error
+        elif self._since_estimate >= (DELAY_RETRY if self.delay is None else
+                                      DELAY_RECHECK if self.converged else CORRELATION_SECONDS):
+            self._update_delay(end)
+        if self.delay is None:
+            out = self._quiet(capture)  # Can't tell the caller from the echo yet - half duplex
+        else:
+            out = self._cancel(capture, start)
+            if not self._learnt and self._aligning is None:
+                out = self._quiet(out)
+        self.cpu_seconds += time.perf_counter() - t0
+        return np.clip(np.rint(out), -32768, 32767).astype(np.int16)
+
+    def _quiet(self, audio):
+        """
+        Echo that can't be cancelled: turned down to the room's own noise level
+        (residual_attenuation until that's been heard). Not below it - the
+        listener's dynamic energy threshold follows what it hears, and after a
+        dead-silent reply plain line noise would start a phrase
+        """
+        if self._noise is None:
+            return audio * self.residual_attenuation
+        rms = float(np.sqrt(np.mean(audio * audio))) if audio.size else 0.0
+        return audio * (self._noise / rms) if rms > self._noise else audio
+
+    def resync(self):
+        """New capture stream (mic reopened) - next chunk's timestamp starts the sample clock again"""
+        self._next_at = None
+
+    def _clock(self, captured_at, count):
+        """
+        Capture time of this chunk from a sample counter. read() timestamps are
+        only ever late (buffered audio, busy thread), so the clock follows the
+        earliest ones: snaps back at once, drifts forward slowly, and jumps only
+        if reads stay late (samples were dropped). It moves in whole samples and
+        the filters move with it - a fraction of a sample would misalign them.
+        """
+        expected = self._next_at
+        if expected is None:
+            self._next_at = captured_at + count / self.sample_rate
+            self._drift = 0.0
+            return captured_at
+        offset = captured_at - expected
+        correction = 0.0
+        if offset < 0:
+            correction = offset
+        elif offset > RESYNC_SECONDS:
+            self._late = min(self._late, offset) if self._late_chunks else offset
+            self._late_chunks += 1
+            if self._late_chunks >= LATE_CHUNKS:
+                correction = self._late
+                self._late_chunks = 0
+        else:
+            self._drift += CLOCK_GAIN * offset
+            self._late_chunks = 0
+            if abs(self._drift) * self.sample_rate >= 1:
+                correction = self._drift
+        shift = int(round(correction * self.sample_rate))
+        if shift:
+            self._shift(shift)
+            self._drift = 0.0
+        start = expected + shift / self.sample_rate
+        self._next_at = start + count / self.sample_rate
+        return start
+
+    def _shift(self, samples):
+        """Capture is `samples` later than thought: keep both filters lined up with the reference"""
+        for weights in (self.weights, self.background):
+            if abs(samples) >= weights.size:
+                weights[:] = 0
+            elif samples > 0:
+                weights[:-samples] = weights[samples:]
+                weights[-samples:] = 0
+            else:
+                weights[-samples:] = weights[:samples].copy()
+                weights[:-samples] = 0
+
+    def _remember(self, capture):
+        keep = self._history.size
+        if capture.size >= keep:
+            self._history = capture[-keep:].copy()
+        else:
+            self._history = np.concatenate((self._history[capture.size:], capture))
+        self._history_filled = min(keep, self._history_filled + capture.size)
+
+    def _update_delay(self, end):
+        """Delay from up to CORRELATION_SECONDS of recent capture, any lag up to max_delay"""
+        self._since_estimate = 0.0
+        if self._history_filled < DELAY_RETRY * self.sample_rate:
+            return
+        delay = self._correlate(end, self._history_filled, 0, int(self.max_delay * self.sample_rate))
+        if delay is None:
+            return
+        moved = int(round((delay - self.delay) * self.sample_rate)) if self.delay is not None else 0
+        if self.delay is not None and (abs(moved) <= DELAY_HYSTERESIS or
+                                       self.converged and abs(moved) > self.taps / 2):
+            return  # Peak hopping / the caller talking - a real path change shows up as lost ERLE first
+        if self.delay is None or abs(moved) > self.taps / 2:
+            # First estimate or a different path - learn it from scratch
+            self.weights[:] = 0
+            self.background[:] = 0
+            self._foreground_error = self._background_error = self._capture_energy = 0.0
+            self._echo_smooth = self._residual_smooth = 0.0
+            self._learnt = False
+        else:
+            # Same playback, sharper estimate: coefficients follow, output stays the same
+            self._shift(-moved)
+        self._set_delay(delay)
+
+    def _align(self, end):
+        """
+        New player, new start latency - but the same room. The filter already
+        knows the echo, so its prediction for the new player's audio so far is
+        matched (GCC-PHAT, +-ALIGN_SEARCH) against the capture and the
+        reference moves by the offset; coefficients stay as they are. Two
+        attempts in a row must agree (the caller talking can fake a peak).
+        True once lined up
+        """
+        rate = self.sample_rate
+        window = min(int(min(self._aligning - self.delay, CORRELATION_SECONDS) * rate), self._history_filled)
+        search = int(ALIGN_SEARCH * rate)
+        if not self.weights.any():
+            return True  # Nothing learnt yet - it learns this player's alignment
+        # Same layout as _cancel: predicted[k] = echo at window start - search + k
+        start = end - (window + search) / rate
+        x = self.reference.render(start - self.delay + (self.lead - self.taps) / rate, window + 2 * search + self.taps)
+        predicted = np.lib.stride_tricks.sliding_window_view(x[1:], self.taps) @ self.weights
+        k = self._phat(predicted, self._history[-window:], 2 * search)
+        if k is None:
+            return False
+        # Offsets are relative to the delay, which only moves once they agree
+        agreed = self._candidate is not None and abs(k - self._candidate) <= DELAY_HYSTERESIS
+        self._candidate = k
+        if agreed and k != search:
+            self._set_delay(self.delay + (search - k) / rate)
+        return agreed
+
+    def _set_delay(self, delay):
+        self.delay = delay
+        ECHO_DELAY.set(round(delay * 1000, 1))
+
+    def _correlate(self, end, window, lo, hi):
+        """
+        GCC-PHAT between the last `window` capture samples and the reference:
+        best delay (seconds) between lo and hi samples, None if the peak isn't clear
+        """
+        window = min(window, self._history_filled)
+        capture = self._history[-window:]
+        span = int(self.max_delay * self.sample_rate)
+        reference = self.reference.render(end - window / self.sample_rate - self.max_delay, window + span)
+        if np.sqrt(np.mean(reference * reference)) < MIN_REFERENCE_RMS:
+            return None
+        m = self._phat(reference, capture, span, lo=span - hi, hi=span - lo)
+        if m is None:
+            return None
+        self.delay_estimates += 1
+        return (span - m) / self.sample_rate
+
+    def _phat(self, longer, capture, span, lo=0, hi=None):
+        """
+        GCC-PHAT: m in [lo, hi] (default the whole 0..span) where longer[i + m]
+        best matches capture[i]; None if the peak doesn't stand out
+        """
+        window = capture.size
+        nfft = 1 << (longer.size + window - 1).bit_length()
+        # Tapered capture - its cut-off edges would otherwise correlate with the reference's onset
+        cross = np.fft.rfft(longer, nfft) * np.conj(np.fft.rfft(capture * np.hanning(window), nfft))
+        freqs = np.fft.rfftfreq(nfft, 1.0 / self.sample_rate)
+        cross[(freqs < 100) | (freqs > 3800)] = 0  # Phone speech band
+        cross /= np.abs(cross) + 1e-12
+        correlation = np.fft.irfft(cross, nfft)[:span + 1]
+        hi = span if hi is None else hi
+        peak = lo + int(np.argmax(correlation[lo:hi + 1]))
+        if correlation[peak] / (np.std(correlation) + 1e-12) < DELAY_CONFIDENCE:
+            return None
+        return peak
+
+    def _cancel(self, capture, start):
+        taps, block = self.taps, self.block
+        n = capture.size
+        rate = self.sample_rate
+        # x[i + taps - 1] lines up with capture[i] shifted by (delay - lead)
+        first = start - self.delay + (self.lead - taps + 1) / rate
+        rendered = self.reference.render(first - 1 / rate, n + taps)
+        x = rendered[1:]
+        windows = np.lib.stride_tricks.sliding_window_view(x, taps)
+        if self._aligning is not None:
+            # New player not lined up yet: subtracting could add echo. Capture
+            # about as loud as the echo should be = only echo, turn it down
+            predicted = windows[:n] @ self.weights
+            if float(capture @ capture) <= ALIGN_ECHO_RATIO * float(predicted @ predicted):
+                return self._quiet(capture)
+            return capture
+        energy = np.cumsum(np.concatenate(([0.0], x.astype(np.float64) ** 2)))
+        row_energy = energy[taps:] - energy[:-taps]
+        # Adaptation runs on pre-emphasized signals (same echo path, flatter
+        # spectrum = faster NLMS); subtraction uses the filter on the real ones
+        emphasized = x - PRE_EMPHASIS * rendered[:-1]
+        emphasized_windows = np.lib.stride_tricks.sliding_window_view(emphasized, taps)
+        # Step normalised by the block's largest eigenvalue, not its average power:
+        # speech is peaky (harmonics) and a block update on it diverges otherwise.
+        # Bound: taps x peak of a PSD estimated from block-length segments.
+        segments = emphasized[:(x.size // block) * block].reshape(-1, block)
+        power = np.abs(np.fft.rfft(segments, axis=1)) ** 2 / block
+        power = np.vstack((np.zeros((1, power.shape[1])), np.cumsum(power, axis=0)))
+        span = -(-taps // block) + 1       # Segments under one block's rows
+        floor = taps * MIN_REFERENCE_RMS ** 2
+        out = capture.copy()
+        block_seconds = block / rate
+        for b in range(0, n, block):
+            rows = windows[b:b + block]
+            near = capture[b:b + block]
+            error = near - rows @ self.weights
+            before = float(near @ near)
+            after = float(error @ error)
+            # Once learnt, audio the filter can't explain is the caller - even if
+            # the recent ERLE dipped (that's how double-talk starts)
+            self._talk_before = DOUBLE_TALK_DECAY * self._talk_before + before
+            self._talk_after = DOUBLE_TALK_DECAY * self._talk_after + after
+            double_talk = self._learnt and self._talk_after > DOUBLE_TALK_RATIO * self._talk_before
+            if row_energy[b:b + block].mean() < floor:
+                # Echo tail only - nothing to learn from
+                out[b:b + block] = self._quiet(error) if self._learnt and not double_talk else error
+                self._last_trial = 0.0
+                continue
+            # Background filter always adapts; caller talking over the agent
+            # only bends it, the foreground (what's subtracted) takes its
+            # coefficients only once it clearly cancels better
+            trial = near - rows @ self.background
+            emphasized_trial = trial - PRE_EMPHASIS * np.concatenate(([self._last_trial], trial[:-1]))
+            self._last_trial = float(trial[-1])
+            first_segment = b // block
+            last_segment = min(first_segment + span, power.shape[0] - 1)
+            peak = np.max(power[last_segment] - power[first_segment]) / (last_segment - first_segment)
+            self.background += (self.step_size / (taps * peak + floor)) * (emphasized_windows[b:b + block].T @ emphasized_trial)
+
+            self._foreground_error = 0.97 * self._foreground_error + after
+            self._background_error = 0.97 * self._background_error + float(trial @ trial)
+            self._capture_energy = 0.97 * self._capture_energy + before
+            if (self._background_error < SWAP_RATIO * self._foreground_error
+                    and self._background_error < BACKGROUND_ERLE * self._capture_energy):
+                self.weights[:] = self.background
+                self._foreground_error = self._background_error
+            elif self._background_error > RESET_RATIO * self._foreground_error:
+                self.background[:] = self.weights  # Diverged during double-talk - start again from the good one
+                self._background_error = self._foreground_error
+
+            if double_talk:
+                self.double_talk_seconds += block_seconds
+            else:
+                self._echo_smooth = 0.98 * self._echo_smooth + before
+                self._residual_smooth = 0.98 * self._residual_smooth + after
+                self.echo_seconds += block_seconds
+                if self.converged:
+                    self._learnt = True
+                if self._learnt:
+                    error = self._quiet(error)
+                if self.converged:
+                    self.converged_seconds += block_seconds
+                    self._echo_in += before
+                    self._echo_out += after
+                    self._echo_final += float(error @ error)
+            out[b:b + block] = error
+        if self._residual_smooth:
+            ECHO_ERLE.set(_db(self._echo_smooth, self._residual_smooth))
+        return out
+
+
+def _db(before, after):
+    return round(float(10 * np.log10(before / after)), 1) if before and after else None
+
+
+class _CancellingStream:
+    def __init__(self, stream, microphone):
+        self.stream = stream
+        self.microphone = microphone
+
+    def read(self, frames, *args, **kwargs):
+        data = self.stream.read(frames, *args, **kwargs)
+        if not data:
+            return data
+        samples = np.frombuffer(data, dtype="<i2")
+        captured_at = time.monotonic() - samples.size / self.microphone.SAMPLE_RATE
+        return self.microphone.canceller.process(samples, captured_at).astype("<i2").tobytes()
+
+    def close(self):
+        self.stream.close()
+
+
+class EchoCancellingMicrophone(sr.AudioSource):
+    """Drop-in for the agent's mic: stream.read() returns the capture minus the agent's own voice"""
+
+    def __init__(self, source, canceller):
+        if source.SAMPLE_WIDTH != 2:
+            raise ValueError(f"16-bit audio expected, source gives {source.SAMPLE_WIDTH * 8}-bit")
+        self.source = source
+        self.canceller = canceller
+        self.SAMPLE_RATE = source.SAMPLE_RATE
+        self.SAMPLE_WIDTH = source.SAMPLE_WIDTH
+        self.CHUNK = source.CHUNK
+        self.stream = None
+
+    def __enter__(self):
+        self.source.__enter__()
+        self.canceller.resync()
+        self.stream = _CancellingStream(self.source.stream, self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+        return self.source.__exit__(exc_type, exc_value, traceback)
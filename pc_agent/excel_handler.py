@@ -1,18 +1,45 @@
 """
 Excel Handler - Results save karna
+
+openpyxl (~150 ms import) aur file banana pehli write pe hota hai (ya
+prepare() pe), agent start hone pe nahi.
 """
 import os
+import threading
 from datetime import datetime
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment
 from config import OUTPUT_EXCEL, logger
+import metrics
+
+# Shared with audio_tracker.py - every workbook write is a full load + save
+EXCEL_WRITE_SECONDS = metrics.histogram("agent_excel_write_seconds", "Workbook load + save", ["op"])
+EXCEL_ERRORS = metrics.counter("agent_excel_errors_total", "Failed workbook writes", ["op"])
+
+
+HEADERS = [
+    "Phone", "Time", "Duration", "Interest", "Result", "Summary", "Conversation",
+    "Prompt Tokens", "Cached Tokens", "Completion Tokens", "Avg TTFT (ms)", "Avg Latency (ms)", "Recording"
+]
+
+USAGE_SHEET = "Campaign Usage"
 
 
 class ExcelHandler:
-    def __init__(self):
-        self.output_file = OUTPUT_EXCEL
+    def __init__(self, output_file=None):
+        self.output_file = output_file or OUTPUT_EXCEL
+        self._lock = threading.Lock()  # Analysis worker writes from its own thread
+        self._ready = False
         logger.info(f"📊 Excel handler output path: {self.output_file}")
-        self._init_file()
+    
+    def prepare(self):
+        """Import openpyxl and create / upgrade the file now instead of on the first write"""
+        with self._lock:
+            self._ensure_file()
+    
+    def _ensure_file(self):
+        """Lock held"""
+        if not self._ready:
+            self._init_file()
+            self._ready = True
     
     def _init_file(self):
         """Initialize Excel file with headers"""
@@ -21,22 +48,15 @@ class ExcelHandler:
         
         if os.path.exists(self.output_file):
             logger.info(f"📊 Excel file exists: {self.output_file}")
+            self._upgrade_headers()
             return
         
+        from openpyxl import Workbook
         wb = Workbook()
         ws = wb.active
         ws.title = "Call Results"
         
-        headers = ["Phone", "Time", "Duration", "Interest", "Result", "Summary", "Conversation"]
-        
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal="center")
+        self._write_headers(ws)
         
         ws.column_dimensions['A'].width = 15
         ws.column_dimensions['B'].width = 18
@@ -45,47 +65,158 @@ class ExcelHandler:
         ws.column_dimensions['E'].width = 12
         ws.column_dimensions['F'].width = 40
         ws.column_dimensions['G'].width = 50
+        for col in "HIJKL":
+            ws.column_dimensions[col].width = 14
+        ws.column_dimensions['M'].width = 30
         
         wb.save(self.output_file)
         logger.info(f"📊 Created Excel: {self.output_file}")
     
-    def save_result(self, phone, duration, analysis, conversation):
-        """Save call result"""
+    def _write_headers(self, ws):
+        """Write (or complete) the header row"""
+        from openpyxl.styles import Font, PatternFill, Alignment
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+        
+        for col, header in enumerate(HEADERS, 1):
+            cell = ws.cell(row=1, column=col, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = Alignment(horizontal="center")
+    
+    def _upgrade_headers(self):
+        """Add usage / recording columns to results files created by older versions"""
         try:
+            from openpyxl import load_workbook
             wb = load_workbook(self.output_file)
             ws = wb.active
-            
-            row = [
-                phone,
-                datetime.now().strftime("%Y-%m-%d %H:%M"),
-                duration,
-                analysis.get("interest", ""),
-                analysis.get("result", ""),
-                analysis.get("summary", ""),
-                conversation[:500] if conversation else ""
-            ]
-            
-            ws.append(row)
-            
-            # Color code
-            last_row = ws.max_row
-            result = analysis.get("result", "").upper()
-            
-            if "POSITIVE" in result:
-                fill = PatternFill(start_color="C6EFCE", fill_type="solid")
-            elif "NEGATIVE" in result:
-                fill = PatternFill(start_color="FFC7CE", fill_type="solid")
-            else:
-                fill = PatternFill(start_color="FFEB9C", fill_type="solid")
-            
-            for col in range(1, 8):
-                ws.cell(row=last_row, column=col).fill = fill
-            
+            if ws.max_column >= len(HEADERS):
+                return
+            self._write_headers(ws)
             wb.save(self.output_file)
-            logger.info(f"💾 Saved result for {phone}")
-            
+            logger.info("📊 Added new columns to existing Excel")
         except Exception as e:
+            logger.error(f"Excel header upgrade error: {e}")
+    
+    def _result_fill(self, result):
+        """Row colour by result"""
+        from openpyxl.styles import PatternFill
+        result = (result or "").upper()
+        if "POSITIVE" in result:
+            return PatternFill(start_color="C6EFCE", fill_type="solid")
+        elif "NEGATIVE" in result:
+            return PatternFill(start_color="FFC7CE", fill_type="solid")
+        return PatternFill(start_color="FFEB9C", fill_type="solid")
+    
+    def save_result(self, phone, duration, analysis, conversation, usage=None, recording=None):
+        """
+        Save call result (usage = per-call LLM token/latency totals, recording =
+        path of the call's audio file). Returns the sheet row number, used later
+        by update_analysis().
+        """
+        try:
+            with self._lock, EXCEL_WRITE_SECONDS.labels("save_result").time():
+                self._ensure_file()
+                return self._save_result(phone, duration, analysis, conversation, usage, recording)
+        except Exception as e:
+            EXCEL_ERRORS.labels("save_result").inc()
             logger.error(f"Excel save error: {e}")
+            return None
+    
+    def _save_result(self, phone, duration, analysis, conversation, usage, recording):
+        from openpyxl import load_workbook
+        wb = load_workbook(self.output_file)
+        ws = wb.active
+        
+        row = [
+            phone,
+            datetime.now().strftime("%Y-%m-%d %H:%M"),
+            duration,
+            analysis.get("interest", ""),
+            analysis.get("result", ""),
+            analysis.get("summary", ""),
+            conversation[:500] if conversation else ""
+        ]
+        
+        if usage:
+            row += [
+                usage.get("prompt_tokens", 0),
+                usage.get("cached_tokens", 0),
+                usage.get("completion_tokens", 0),
+                usage.get("avg_ttft_ms", 0),
+                usage.get("avg_latency_ms", 0),
+            ]
+        if recording:
+            row += [None] * (HEADERS.index("Recording") - len(row)) + [os.path.basename(recording)]
+        
+        ws.append(row)
+        
+        # Color code
+        last_row = ws.max_row
+        fill = self._result_fill(analysis.get("result", ""))
+        
+        for col in range(1, len(row) + 1):
+            ws.cell(row=last_row, column=col).fill = fill
+        if recording:
+            ws.cell(row=last_row, column=len(row)).hyperlink = recording
+        
+        wb.save(self.output_file)
+        logger.info(f"💾 Saved result for {phone}")
+        return last_row
+    
+    def update_analysis(self, row, analysis):
+        """Fill in Interest/Result/Summary of an already saved row (background analysis)"""
+        try:
+            with self._lock, EXCEL_WRITE_SECONDS.labels("update_analysis").time():
+                from openpyxl import load_workbook
+                self._ensure_file()
+                wb = load_workbook(self.output_file)
+                ws = wb.active
+                
+                ws.cell(row=row, column=4, value=analysis.get("interest", ""))
+                ws.cell(row=row, column=5, value=analysis.get("result", ""))
+                ws.cell(row=row, column=6, value=analysis.get("summary", ""))
+                
+                fill = self._result_fill(analysis.get("result", ""))
+                for col in range(1, ws.max_column + 1):
+                    if ws.cell(row=row, column=col).value is not None:
+                        ws.cell(row=row, column=col).fill = fill
+                
+                wb.save(self.output_file)
+            logger.info(f"💾 Analysis updated for row {row}: {analysis.get('result', '')}")
+        except Exception as e:
+            EXCEL_ERRORS.labels("update_analysis").inc()
+            logger.error(f"Excel update error: {e}")
+    
+    def save_campaign_usage(self, usage):
+        """Overwrite campaign-wide LLM usage totals in their own sheet"""
+        try:
+            with self._lock, EXCEL_WRITE_SECONDS.labels("campaign_usage").time():
+                self._ensure_file()
+                self._save_campaign_usage(usage)
+        except Exception as e:
+            EXCEL_ERRORS.labels("campaign_usage").inc()
+            logger.error(f"Excel usage save error: {e}")
+    
+    def _save_campaign_usage(self, usage):
+        from openpyxl import load_workbook
+        from openpyxl.styles import Font
+        wb = load_workbook(self.output_file)
+        if USAGE_SHEET in wb.sheetnames:
+            del wb[USAGE_SHEET]
+        ws = wb.create_sheet(USAGE_SHEET)
+        
+        ws.append(["Metric", "Value"])
+        for cell in ws[1]:
+            cell.font = Font(bold=True)
+        ws.append(["Updated", datetime.now().strftime("%Y-%m-%d %H:%M:%S")])
+        for key, value in usage.items():
+            ws.append([key, value])
+        
+        ws.column_dimensions['A'].width = 20
+        ws.column_dimensions['B'].width = 20
+        
+        wb.save(self.output_file)
 
 
 if __name__ == "__main__":
@@ -94,5 +225,8 @@ if __name__ == "__main__":
         "interest": "INTERESTED",
         "result": "POSITIVE",
         "summary": "User interested in course"
-    }, "User: Hello\nAI: Hello sir")
+    }, "User: Hello\nAI: Hello sir", {
+        "prompt_tokens": 1200, "cached_tokens": 1024, "completion_tokens": 40,
+        "avg_ttft_ms": 350.0, "avg_latency_ms": 620.0
+    })
     print("Done!")
@@ -8,7 +8,74 @@ from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
 import sys
 import os
+from collections import deque
 from datetime import datetime
+from campaign_stats import CampaignAggregate, listen_band
+
+# Log window (kept here - the GUI imports nothing from the agent until Start, so logging
+# is set up after stdout/stderr are redirected)
+LOG_MAX_LINES = 5000     # Older lines are trimmed from the widget
+LOG_FLUSH_MS = 100       # Pending lines are inserted in one batch this often (~10 fps)
+DASHBOARD_REFRESH_MS = 1000
+
+
+class LogSink:
+    """
+    Thread-safe log window feed: write() from any thread only appends to a
+    deque, the Tk thread inserts everything pending in one go every
+    LOG_FLUSH_MS via root.after. The widget keeps at most max_lines lines.
+    """
+    
+    def __init__(self, root, widget, max_lines=LOG_MAX_LINES, interval_ms=LOG_FLUSH_MS):
+        self.root = root
+        self.widget = widget
+        self.max_lines = max_lines
+        self.interval_ms = interval_ms
+        self._pending = deque(maxlen=max_lines)  # GUI far behind -> oldest pending lines drop
+        self._after_id = None
+    
+    def write(self, line):
+        """Any thread - never touches Tk"""
+        self._pending.append(line)
+    
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self._flush)
+    
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+    
+    def clear(self):
+        self._pending.clear()
+        self.widget.delete("1.0", tk.END)
+    
+    def _flush(self):
+        self._after_id = None
+        try:
+            self.flush()
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._flush)
+    
+    def flush(self):
+        """Tk thread only - insert pending lines, trim, keep following the tail"""
+        lines = []
+        while self._pending:
+            lines.append(self._pending.popleft())
+        if not lines:
+            return
+        
+        # Only auto-scroll if the user hasn't scrolled up to read something
+        at_bottom = self.widget.yview()[1] >= 0.999
+        self.widget.insert(tk.END, "\n".join(lines) + "\n")
+        
+        line_count = int(self.widget.index("end-1c").split(".")[0]) - 1
+        if line_count > self.max_lines:
+            self.widget.delete("1.0", f"{line_count - self.max_lines + 1}.0")
+        if at_bottom:
+            self.widget.see(tk.END)
+
 
 class CallingAgentGUI:
     def __init__(self, root):
@@ -21,9 +88,11 @@ class CallingAgentGUI:
         self.agent_instance = None  # Store agent reference
         self.is_running = False
         self.audio_file = ""
+        self.stats = CampaignAggregate()  # Kept across agent restarts - whole session's campaign
         
         # Setup UI
         self.setup_ui()
+        self.refresh_dashboard()
         
     def setup_ui(self):
         # Main container
@@ -34,7 +103,7 @@ class CallingAgentGUI:
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(0, weight=1)
-        main_frame.rowconfigure(2, weight=1)
+        main_frame.rowconfigure(3, weight=1)
         
         # Title
         title_label = ttk.Label(main_frame, text="📞 Calling Agent System", 
@@ -84,15 +153,19 @@ class CallingAgentGUI:
                                      font=("Arial", 10, "bold"), foreground="blue")
         self.status_label.grid(row=3, column=0, columnspan=3, pady=5)
         
+        self.setup_dashboard(main_frame)
+        
         # Logs Panel
         logs_frame = ttk.LabelFrame(main_frame, text="System Logs", padding="10")
-        logs_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
+        logs_frame.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
         logs_frame.columnconfigure(0, weight=1)
         logs_frame.rowconfigure(0, weight=1)
         
         self.log_text = scrolledtext.ScrolledText(logs_frame, wrap=tk.WORD, 
                                                   height=20, font=("Consolas", 9))
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.log_sink = LogSink(self.root, self.log_text)
+        self.log_sink.start()
         
         # Clear logs button
         ttk.Button(logs_frame, text="Clear Logs", 
@@ -106,6 +179,49 @@ class CallingAgentGUI:
         self.log("  3. Connect phone via USB with USB debugging ON")
         self.log("  4. Click Start Agent")
     
+    def setup_dashboard(self, parent):
+        """Live campaign numbers (from self.stats, refreshed every DASHBOARD_REFRESH_MS)"""
+        frame = ttk.LabelFrame(parent, text="Campaign", padding="10")
+        frame.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        for col in range(4):
+            frame.columnconfigure(col, weight=1)
+        
+        self.dashboard = {}
+        # (key, title, row, column, columnspan) - the breakdowns get half a row each
+        fields = [
+            ("calls_per_hour", "Calls/hour", 0, 0, 1), ("pickup", "Picked / Dialed", 0, 1, 1),
+            ("listen", "Avg listen-through", 0, 2, 1), ("response", "Response p50 / p95", 0, 3, 1),
+            ("interest", "Interest", 1, 0, 2), ("results", "Results", 1, 2, 2),
+        ]
+        for key, title, row, col, span in fields:
+            cell = ttk.Frame(frame)
+            cell.grid(row=row, column=col, columnspan=span, sticky=tk.W, padx=5, pady=2)
+            ttk.Label(cell, text=title, font=("Arial", 8), foreground="gray").pack(anchor=tk.W)
+            value = tk.Label(cell, text="-", font=("Arial", 11, "bold"), anchor=tk.W)
+            value.pack(anchor=tk.W)
+            self.dashboard[key] = value
+    
+    def refresh_dashboard(self):
+        """Timer - reads the in-memory aggregate only (same cost at call 10 or 10,000)"""
+        snap = self.stats.snapshot()
+        d = self.dashboard
+        d["calls_per_hour"].config(text=f"{snap['calls_per_hour']:.1f}")
+        d["pickup"].config(text=f"{snap['picked']} / {snap['dialed']}  ({snap['pickup_rate_pct']:.0f}%)")
+        
+        if snap["listened"]:
+            _, colour = listen_band(snap["avg_listen_pct"])
+            d["listen"].config(text=f"{snap['avg_listen_pct']:.0f}%", bg=f"#{colour}")
+        else:
+            d["listen"].config(text="-", bg=self.root.cget("bg"))
+        
+        if snap["responses"]:
+            d["response"].config(text=f"{snap['response_p50_ms'] / 1000:.2f}s / {snap['response_p95_ms'] / 1000:.2f}s")
+        for key in ("interest", "results"):
+            counts = sorted(snap[key].items(), key=lambda item: -item[1])
+            d[key].config(text="  ".join(f"{name}: {count}" for name, count in counts) or "-")
+        
+        self.root.after(DASHBOARD_REFRESH_MS, self.refresh_dashboard)
+    
     def browse_audio(self):
         """Browse and select audio file"""
         file_path = filedialog.askopenfilename(
@@ -121,15 +237,13 @@ class CallingAgentGUI:
             self.log(f"✅ Audio selected: {os.path.basename(file_path)}")
         
     def log(self, message):
-        """Add message to log window"""
+        """Add message to log window (safe from any thread, shows up within LOG_FLUSH_MS)"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
-        self.log_text.see(tk.END)
-        self.log_text.update()
+        self.log_sink.write(f"[{timestamp}] {message}")
         
     def clear_logs(self):
         """Clear log window"""
-        self.log_text.delete(1.0, tk.END)
+        self.log_sink.clear()
         
     def start_agent(self):
         """Start the calling agent"""
@@ -171,7 +285,7 @@ class CallingAgentGUI:
             self.log("🔌 Connecting to phone via USB...")
             
             # Create and start agent directly (no banner in GUI mode)
-            self.agent_instance = CallingAgent(self.audio_file, mode == 'Y', show_banner=False)
+            self.agent_instance = CallingAgent(self.audio_file, mode == 'Y', show_banner=False, stats=self.stats)
             self.agent_instance.start()
             
         except Exception as e:
@@ -194,13 +308,8 @@ class CallingAgentGUI:
         # Stop the agent properly
         if self.agent_instance:
             try:
-                # Stop USB monitoring
-                if hasattr(self.agent_instance, 'usb_detector'):
-                    self.agent_instance.usb_detector.running = False
-                
-                # Stop audio playback
-                if hasattr(self.agent_instance, 'tts'):
-                    self.agent_instance.tts.stop()
+                # Wakes the agent's event loop - monitoring, playback and main loop stop
+                self.agent_instance.stop()
                 
                 # Stop listener if AI mode
                 if hasattr(self.agent_instance, 'listener') and self.agent_instance.listener:
@@ -225,8 +334,10 @@ class CallingAgentGUI:
         if self.is_running:
             if messagebox.askokcancel("Quit", "Agent is running. Stop and quit?"):
                 self.stop_agent()
+                self.log_sink.stop()
                 self.root.after(1000, self.root.destroy)
         else:
+            self.log_sink.stop()
             self.root.destroy()
 
 def main():
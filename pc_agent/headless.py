@@ -0,0 +1,140 @@
+"""
+Headless Agent - bina Tk / bina input() ke chalao (service, scheduled task, SSH)
+
+Settings JSON config file aur/ya CLI flags se aati hain (CLI jeetti hai):
+    {
+      "audio": "opening.mp3",
+      "ai_mode": true,
+      "numbers": "leads.xlsx",
+      "settings": {"LOG_LEVEL": "INFO", "LOG_JSON": true, "SILENCE_TIMEOUT": 15}
+    }
+"settings" me config.py ka koi bhi UPPER_CASE naam override ho sakta hai.
+"numbers" diya to PC campaign scheduler dial karta hai (retries, calling
+hours) - phone app pe Start nahi dabana.
+Heavy modules (openai, speech_recognition, edge_tts, openpyxl) sirf tab
+import hote hain jab unka feature use ho; start-up time:
+python benchmarks/bench_startup.py
+
+Run: python headless.py --config agent.json
+     python headless.py --audio opening.mp3 --ai --set LOG_LEVEL=INFO
+Ctrl+C / SIGTERM -> agent.stop()
+"""
+import time
+
+PROCESS_START = time.perf_counter()  # Before any other import - start-up is measured from here
+
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+
+
+def parse_value(text):
+    """--set values: JSON if it parses (numbers, true/false, lists), else the plain string"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def load_options(argv=None):
+    parser = argparse.ArgumentParser(description="Calling agent without the GUI")
+    parser.add_argument("--config", help="JSON file: audio, ai_mode, settings")
+    parser.add_argument("--audio", help="Opening audio file")
+    parser.add_argument("--numbers", help="xlsx / csv of numbers - the PC schedules the dialing")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--ai", dest="ai_mode", action="store_true", default=None, help="AI talks to the caller")
+    mode.add_argument("--audio-only", dest="ai_mode", action="store_false", help="Play audio and hang up")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Override a config.py setting (repeatable)")
+    parser.add_argument("--exit-when-ready", action="store_true",
+                        help="Stop as soon as the agent is ready (smoke test / start-up benchmark)")
+    args = parser.parse_args(argv)
+
+    options = {"audio": None, "ai_mode": False, "numbers": None, "settings": {}}
+    if args.config:
+        with open(args.config, encoding="utf-8") as f:
+            loaded = json.load(f)
+        unknown = set(loaded) - set(options)
+        if unknown:
+            parser.error(f"Unknown keys in {args.config}: {', '.join(sorted(unknown))}")
+        options.update(loaded)
+        for key in ("audio", "numbers"):
+            if options[key] and not os.path.isabs(options[key]):
+                # Relative to the config file, not the working directory
+                options[key] = os.path.join(os.path.dirname(os.path.abspath(args.config)), options[key])
+
+    if args.audio:
+        options["audio"] = args.audio
+    if args.numbers:
+        options["numbers"] = args.numbers
+    if args.ai_mode is not None:
+        options["ai_mode"] = args.ai_mode
+    settings = dict(options["settings"])
+    if options["numbers"]:
+        settings["CAMPAIGN_NUMBERS_FILE"] = options["numbers"]
+    for item in args.set:
+        name, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--set expects NAME=VALUE, got {item!r}")
+        settings[name.strip()] = parse_value(value)
+    options["settings"] = settings
+    options["exit_when_ready"] = args.exit_when_ready
+
+    if not options["audio"]:
+        parser.error("No opening audio - pass --audio or set \"audio\" in the config file")
+    if not os.path.exists(options["audio"]):
+        parser.error(f"Audio file not found: {options['audio']}")
+    if options["numbers"] and not os.path.exists(options["numbers"]):
+        parser.error(f"Numbers file not found: {options['numbers']}")
+    return options
+
+
+def run(options, **components):
+    """
+    Build and run the agent until stopped. components go to CallingAgent
+    (detector, tts, ... - the start-up benchmark injects a fake phone).
+    Returns the agent after it stopped.
+    """
+    import config
+    try:
+        config.apply_overrides(options["settings"])  # Before anything copies config values
+    except ValueError as e:
+        raise SystemExit(f"❌ {e}")  # Typo in the config file / --set
+
+    from config import logger
+    from main import CallingAgent
+
+    agent = CallingAgent(options["audio"], options["ai_mode"], show_banner=False, **components)
+
+    def on_ready():
+        agent.ready.wait()
+        agent.startup_seconds = time.perf_counter() - PROCESS_START
+        logger.info(f"🚀 Ready {agent.startup_seconds * 1000:.0f}ms after start-up")
+        if options.get("exit_when_ready"):
+            agent.stop()
+
+    threading.Thread(target=on_ready, daemon=True).start()
+
+    def on_signal(signum, frame):
+        logger.info(f"⛔ Signal {signum} - stopping")
+        agent.stop()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGINT, on_signal)
+        if hasattr(signal, "SIGTERM"):
+            signal.signal(signal.SIGTERM, on_signal)
+
+    agent.start()
+    return agent
+
+
+def main(argv=None):
+    agent = run(load_options(argv))
+    return 0 if agent.ready.is_set() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,33 @@
 """
 HTTP Server - Phone se call state receive karta hai
 Phone app HTTP se connect hoke state bhejti hai
+
+Har connection apne thread pe (ek slow / half-open phone baaki ko block
+nahi karta), HTTP/1.1 keep-alive, socket timeout aur body size limit.
+
+Dashboards / doosra PC calls live follow kar sakte hain:
+  GET /events                  - Server-Sent Events (Last-Event-ID se resume)
+  GET /events/poll?since=N     - long-poll fallback (JSON)
+Ye apni alag limit (HTTP_MAX_STREAMS) me chalte hain - khule dashboards phone
+ke pushes ko 503 nahi dilwa sakte. Har transition ka seq number + timestamp hota hai; recent events ek ring
+buffer me rehte hain taaki reconnect pe kuch miss na ho.
+
+GET /metrics - poore agent ke counters / histograms (Prometheus text format).
 """
 import json
 import threading
-from http.server import HTTPServer, BaseHTTPRequestHandler
-from config import HTTP_HOST, HTTP_PORT, logger
+import time
+from collections import deque
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from callback_dispatcher import CallbackDispatcher
+import metrics
+from config import (
+    HTTP_HOST, HTTP_PORT, HTTP_REQUEST_TIMEOUT, HTTP_MAX_BODY_BYTES, HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_STREAMS, HTTP_EVENT_HISTORY, HTTP_SSE_KEEPALIVE, HTTP_LONG_POLL_MAX, logger
+)
+
+STATE_NAMES = {0: "IDLE", 1: "RINGING", 2: "ACTIVE"}
 
 class CallState:
     """Shared call state between server and main agent"""
@@ -18,7 +40,13 @@ class CallState:
         self.phone_number = ""
         self.direction = "outgoing"  # "outgoing" or "incoming"
         self.lock = threading.Lock()
-        self.callbacks = []
+        self.dispatcher = CallbackDispatcher(name="call-state")  # Callbacks run outside the lock
+        
+        # Event stream: every transition gets a seq, recent ones kept for resume
+        self.seq = 0
+        self.changed_at = time.time()
+        self.history = deque(maxlen=HTTP_EVENT_HISTORY)
+        self.changed = threading.Condition(self.lock)
     
     def set_state(self, state, number="", direction="outgoing"):
         with self.lock:
@@ -28,28 +56,59 @@ class CallState:
             self.direction = direction
             
             if old_state != state:
-                state_names = {0: "IDLE", 1: "RINGING", 2: "ACTIVE"}
                 dir_emoji = "📤" if direction == "outgoing" else "📥"
-                logger.info(f"📞 Call: {state_names.get(state, state)} | {dir_emoji} {direction.upper()} | {number}")
+                logger.info(f"📞 Call: {STATE_NAMES.get(state, state)} | {dir_emoji} {direction.upper()} | {number}")
+                
+                self.seq += 1
+                self.changed_at = time.time()
+                self.history.append(self._event())
+                self.changed.notify_all()
                 
-                # Notify callbacks
-                for callback in self.callbacks:
-                    try:
-                        callback(state, number, direction)
-                    except Exception as e:
-                        logger.error(f"Callback error: {e}")
+                # Notify callbacks - only queued here (keeps seq order), run on the worker pool
+                self.dispatcher.publish(state, number, direction)
     
     def get_state(self):
         with self.lock:
             return self.state, self.phone_number, self.direction
     
+    def _event(self):
+        """Current state as an event dict (lock held)"""
+        return {
+            "seq": self.seq,
+            "time": self.changed_at,
+            "state": self.state,
+            "state_name": STATE_NAMES.get(self.state, str(self.state)),
+            "number": self.phone_number,
+            "direction": self.direction,
+        }
+    
+    def snapshot(self):
+        with self.lock:
+            return self._event()
+    
+    def events_since(self, since, timeout=0):
+        """
+        Events with seq > since, waiting up to timeout for the first one.
+        Returns (events, missed) - missed = some fell out of the ring, re-sync from a snapshot.
+        """
+        with self.changed:
+            if since > self.seq:
+                since = -1  # Seq from before a restart - treat as missed
+            self.changed.wait_for(lambda: self.seq > since, timeout=timeout)
+            events = [e for e in self.history if e["seq"] > since]
+            missed = since < self.seq and (not events or events[0]["seq"] > since + 1)
+            return events, missed
+    
     def is_outgoing(self):
         with self.lock:
             return self.direction == "outgoing"
     
     def on_state_change(self, callback):
-        """Register callback for state changes"""
-        self.callbacks.append(callback)
+        """Register callback for state changes - called as callback(state, number, direction)"""
+        self.dispatcher.register(callback)
+    
+    def callback_stats(self):
+        return self.dispatcher.stats()
 
 
 # Global call state
@@ -59,35 +118,159 @@ call_state = CallState()
 class CallHandler(BaseHTTPRequestHandler):
     """HTTP handler for phone requests"""
     
+    protocol_version = "HTTP/1.1"    # Keep-alive - phone reuses one connection
+    timeout = HTTP_REQUEST_TIMEOUT   # Per socket read - stalled / idle connections get dropped
+    disable_nagle_algorithm = True   # Headers + body are separate writes - don't wait for delayed ACK
+    
     def log_message(self, format, *args):
         # Suppress default logging
         pass
     
     def send_json(self, data, status=200):
+        self.send_body(json.dumps(data).encode(), "application/json", status)
+    
+    def send_body(self, body, content_type, status=200):
         self.send_response(status)
-        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))  # Required for keep-alive
+        if self.close_connection:
+            self.send_header("Connection", "close")
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
+    
+    def _read_json(self):
+        """Request body as dict, or None after sending an error (connection is closed then)"""
+        length = self.headers.get("Content-Length")
+        if length is None:
+            if self.headers.get("Transfer-Encoding"):
+                self.close_connection = True
+                self.send_json({"error": "Content-Length required"}, 411)
+                return None
+            return {}
+        
+        try:
+            length = int(length)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            self.close_connection = True
+            self.send_json({"error": "Bad Content-Length"}, 400)
+            return None
+        
+        if length > HTTP_MAX_BODY_BYTES:
+            # Body is not read - can't reuse this connection
+            self.close_connection = True
+            self.send_json({"error": f"Body too large (max {HTTP_MAX_BODY_BYTES} bytes)"}, 413)
+            return None
+        
+        body = self.rfile.read(length).decode(errors="replace")
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            data = {}
+        return data if isinstance(data, dict) else {}
+    
+    def _since(self, query):
+        """Resume point: Last-Event-ID header (SSE reconnect) or ?since=, None = fresh client"""
+        value = self.headers.get("Last-Event-ID") or (query.get("since") or [None])[0]
+        try:
+            return int(value) if value is not None else None
+        except ValueError:
+            return None
+    
+    def _stream_events(self, since):
+        """Server-Sent Events - runs until the client goes away or the server stops"""
+        self.close_connection = True  # Stream ends with the connection
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(b"retry: 2000\n\n")  # Browser EventSource reconnect delay (ms)
+        
+        def send(event_type, event):
+            self.wfile.write(f"id: {event['seq']}\nevent: {event_type}\ndata: {json.dumps(event)}\n\n".encode())
+        
+        try:
+            if since is None:
+                # Fresh client: current state first, then live transitions
+                snapshot = call_state.snapshot()
+                send("snapshot", snapshot)
+                since = snapshot["seq"]
+            
+            while not self.server.closing:
+                events, missed = call_state.events_since(since, timeout=HTTP_SSE_KEEPALIVE)
+                if missed:
+                    # Fell out of the ring - current state replaces the gap
+                    snapshot = call_state.snapshot()
+                    send("snapshot", snapshot)
+                    since = snapshot["seq"]
+                elif events:
+                    for event in events:
+                        send("state", event)
+                    since = events[-1]["seq"]
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except OSError:
+            pass  # Client disconnected
+    
+    def _long_poll(self, since, query):
+        try:
+            timeout = min(float((query.get("timeout") or [HTTP_LONG_POLL_MAX])[0]), HTTP_LONG_POLL_MAX)
+        except ValueError:
+            timeout = HTTP_LONG_POLL_MAX
+        
+        if since is None:
+            snapshot = call_state.snapshot()
+            self.send_json({"events": [], "snapshot": snapshot, "last_seq": snapshot["seq"], "missed": False})
+            return
+        
+        events, missed = call_state.events_since(since, timeout=max(0, timeout))
+        if missed:
+            snapshot = call_state.snapshot()
+            self.send_json({"events": [], "snapshot": snapshot, "last_seq": snapshot["seq"], "missed": True})
+        else:
+            self.send_json({"events": events, "last_seq": events[-1]["seq"] if events else since, "missed": False})
+    
+    def _streaming(self, serve, *args):
+        """Event stream / long-poll on a streaming slot instead of a phone one (full = 503)"""
+        if not self.server.begin_stream(self.request):
+            self.close_connection = True
+            self.send_json({"error": f"Too many event streams (max {self.server.max_streams})"}, 503)
+            return
+        try:
+            serve(*args)
+        finally:
+            if not self.server.end_stream(self.request):
+                self.close_connection = True  # No phone slot free for a next keep-alive request
     
     def do_GET(self):
         """Handle GET requests"""
-        if self.path == "/status":
-            state, number = call_state.get_state()
-            self.send_json({"state": state, "number": number})
-        elif self.path == "/ping":
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        
+        if url.path == "/status":
+            state, number, direction = call_state.get_state()
+            self.send_json({"state": state, "number": number, "direction": direction, "seq": call_state.seq})
+        elif url.path == "/events":
+            self._streaming(self._stream_events, self._since(query))
+        elif url.path == "/events/poll":
+            self._streaming(self._long_poll, self._since(query), query)
+        elif url.path == "/callbacks":
+            self.send_json(call_state.callback_stats())
+        elif url.path == "/metrics":
+            self.send_body(metrics.render().encode(), metrics.CONTENT_TYPE)
+        elif url.path == "/ping":
             self.send_json({"status": "ok"})
         else:
             self.send_json({"error": "Not found"}, 404)
     
     def do_POST(self):
         """Handle POST requests from phone"""
-        content_length = int(self.headers.get("Content-Length", 0))
-        body = self.rfile.read(content_length).decode()
-        
-        try:
-            data = json.loads(body) if body else {}
-        except:
-            data = {}
+        data = self._read_json()
+        if data is None:
+            return
         
         number = data.get("number", "")
         direction = data.get("direction", "outgoing")
@@ -115,6 +298,66 @@ class CallHandler(BaseHTTPRequestHandler):
             self.send_json({"error": "Unknown endpoint"}, 404)
 
 
+class _CallHTTPServer(ThreadingHTTPServer):
+    """
+    Thread per connection, capped at max_connections (extra phones get 503).
+    Event streams / long-polls move to their own max_streams slots while
+    they run, so dashboards can't use up the phones' connections.
+    """
+    
+    daemon_threads = True
+    request_queue_size = 128  # Listen backlog - many phones reconnecting at once
+    
+    def __init__(self, address, handler, max_connections=HTTP_MAX_CONNECTIONS, max_streams=HTTP_MAX_STREAMS):
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self.max_streams = max_streams
+        self._stream_slots = threading.BoundedSemaphore(max_streams)
+        self._streaming = set()  # Connections holding a stream slot instead of a phone slot
+        self.closing = False  # Ends open SSE streams on stop()
+        super().__init__(address, handler)
+    
+    def begin_stream(self, request):
+        """Move this connection from its phone slot to a stream slot. False = streams full"""
+        if not self._stream_slots.acquire(blocking=False):
+            return False
+        self._streaming.add(request)
+        self._slots.release()
+        return True
+    
+    def end_stream(self, request):
+        """Back to a phone slot for the next keep-alive request. False = none free, close it"""
+        self._stream_slots.release()
+        if not self._slots.acquire(blocking=False):
+            return False
+        self._streaming.discard(request)
+        return True
+    
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            try:
+                request.settimeout(1)
+                request.sendall(b"HTTP/1.1 503 Service Unavailable\r\n"
+                                b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+            except OSError:
+                pass
+            self.shutdown_request(request)
+            return
+        super().process_request(request, client_address)
+    
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            if request in self._streaming:
+                self._streaming.discard(request)  # Already gave its phone slot back
+            else:
+                self._slots.release()
+    
+    def handle_error(self, request, client_address):
+        # Phone dropped off WiFi mid-request etc. - not worth a traceback
+        logger.debug(f"HTTP connection error from {client_address[0]}", exc_info=True)
+
+
 class HTTPCallServer:
     """HTTP server for receiving call states from phone"""
     
@@ -126,7 +369,8 @@ class HTTPCallServer:
     
     def start(self):
         """Start HTTP server in background thread"""
-        self.server = HTTPServer((self.host, self.port), CallHandler)
+        self.server = _CallHTTPServer((self.host, self.port), CallHandler)
+        self.port = self.server.server_address[1]  # Actual port when 0 was asked for
         self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
         self.thread.start()
         logger.info(f"🌐 HTTP Server started on {self.host}:{self.port}")
@@ -134,7 +378,9 @@ class HTTPCallServer:
     def stop(self):
         """Stop HTTP server"""
         if self.server:
+            self.server.closing = True
             self.server.shutdown()
+            self.server.server_close()
             logger.info("🌐 HTTP Server stopped")
     
     def get_call_state(self):
@@ -148,6 +394,10 @@ class HTTPCallServer:
     def on_state_change(self, callback):
         """Register callback for state changes"""
         call_state.on_state_change(callback)
+    
+    def callback_stats(self):
+        """Per-callback execution time (see callback_dispatcher.py)"""
+        return call_state.callback_stats()
 
 
 if __name__ == "__main__":
@@ -162,6 +412,10 @@ if __name__ == "__main__":
     print("  POST /call/active   - Call picked up")
     print("  POST /call/ended    - Call ended")
     print("  GET  /status        - Get current state")
+    print("  GET  /events        - Live state stream (SSE)")
+    print("  GET  /events/poll   - Long-poll (?since=<seq>&timeout=<s>)")
+    print("  GET  /callbacks     - Callback timing stats")
+    print("  GET  /metrics       - Prometheus metrics")
     print("\nPress Ctrl+C to stop...")
     
     try:
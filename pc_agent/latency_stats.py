@@ -0,0 +1,36 @@
+"""
+Latency Stats - rolling p50/p95/p99 over the most recent samples
+"""
+import math
+import threading
+from collections import deque
+
+
+class LatencyStats:
+    def __init__(self, maxlen=1000):
+        self.samples = deque(maxlen=maxlen)  # Seconds
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+            self.count += 1
+
+    def percentile(self, p):
+        """p in 0-100, nearest-rank over the rolling window (seconds)"""
+        with self._lock:
+            data = sorted(self.samples)
+        if not data:
+            return 0.0
+        rank = max(0, min(len(data) - 1, math.ceil(p / 100 * len(data)) - 1))
+        return data[rank]
+
+    def summary(self):
+        """p50/p95/p99 in milliseconds"""
+        return {
+            "count": self.count,
+            "p50_ms": round(self.percentile(50) * 1000, 1),
+            "p95_ms": round(self.percentile(95) * 1000, 1),
+            "p99_ms": round(self.percentile(99) * 1000, 1),
+        }
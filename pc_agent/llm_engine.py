@@ -1,9 +1,75 @@
 """
-LLM Engine - OpenAI GPT for conversation and analysis
+LLM Engine - OpenAI GPT for conversation (analysis: see analysis_worker.py)
 Best quality for telecalling
+
+Request layout is prompt-cache friendly: the static system prompt always goes
+first (same bytes every call), history is appended after it, so the provider
+can reuse the cached prefix. Har completion ka token/latency usage record hota hai.
 """
-from openai import OpenAI
-from config import OPENAI_API_KEY, OPENAI_MODEL, SYSTEM_PROMPT, logger
+import threading
+import time
+from config import (
+    OPENAI_API_KEY, OPENAI_MODEL, SYSTEM_PROMPT, logger,
+    OPENAI_PRICE_INPUT_PER_M, OPENAI_PRICE_CACHED_INPUT_PER_M, OPENAI_PRICE_OUTPUT_PER_M, LLM_FALLBACK_REPLY
+)
+from openai_client import get_openai_client
+from rate_limiter import get_scheduler, LIVE, BACKGROUND
+from tracing import get_tracer
+import metrics
+
+LLM_REQUESTS = metrics.counter("agent_llm_requests_total", "Completions by outcome", ["outcome"])
+LLM_TOKENS = metrics.counter("agent_llm_tokens_total", "Tokens by kind (prompt includes cached)", ["kind"])
+LLM_TTFT = metrics.histogram("agent_llm_ttft_seconds", "Request -> first token")
+LLM_LATENCY = metrics.histogram("agent_llm_latency_seconds", "Request -> last token")
+
+# Static prefix - built ONCE so every request starts with identical bytes
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+
+class UsageStats:
+    """Aggregates token counts and latency of completions (per call / per campaign)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()  # Speculative drafts record from other threads
+        self.reset()
+    
+    def reset(self):
+        with self._lock:  # Last call's hedge / draft threads may still be adding
+            self.requests = 0
+            self.prompt_tokens = 0
+            self.cached_tokens = 0
+            self.completion_tokens = 0
+            self.ttft_total_ms = 0.0
+            self.latency_total_ms = 0.0
+    
+    def add(self, record):
+        """Add one completion record (see LLMEngine._record_usage)"""
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += record["prompt_tokens"]
+            self.cached_tokens += record["cached_tokens"]
+            self.completion_tokens += record["completion_tokens"]
+            self.ttft_total_ms += record["ttft_ms"]
+            self.latency_total_ms += record["latency_ms"]
+    
+    def as_dict(self):
+        n = self.requests or 1
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cache_hit_pct": round(self.cached_tokens * 100 / self.prompt_tokens, 1) if self.prompt_tokens else 0.0,
+            "avg_ttft_ms": round(self.ttft_total_ms / n, 1),
+            "avg_latency_ms": round(self.latency_total_ms / n, 1),
+            "cost_usd": round(self.cost_usd(), 6),
+        }
+    
+    def cost_usd(self):
+        """Cached prompt tokens are billed at the discounted rate"""
+        return ((self.prompt_tokens - self.cached_tokens) * OPENAI_PRICE_INPUT_PER_M
+                + self.cached_tokens * OPENAI_PRICE_CACHED_INPUT_PER_M
+                + self.completion_tokens * OPENAI_PRICE_OUTPUT_PER_M) / 1_000_000
 
 
 class LLMEngine:
@@ -12,32 +78,161 @@ class LLMEngine:
         if not OPENAI_API_KEY:
             logger.error("❌ OpenAI API key not set!")
             raise ValueError("OpenAI API key required")
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.client = get_openai_client()  # Shared keep-alive pool
+        self.scheduler = get_scheduler()   # Shared rate limits / priority lanes
+        self.tracer = get_tracer()
         self.model = OPENAI_MODEL
         
         self.conversation_history = []
+        
+        # Token/latency accounting
+        self.call_usage = UsageStats()       # Current call
+        self.campaign_usage = UsageStats()   # Whole session
+        
         logger.info(f"🤖 LLM Engine ready | Model: {self.model}")
     
     def reset_conversation(self):
         """Reset for new call"""
         self.conversation_history = []
+        self.call_usage.reset()
         logger.debug("Conversation reset")
     
+    def _build_messages(self):
+        """Static system prefix first, then history - keeps prefix byte-stable for prompt caching"""
+        return [SYSTEM_MESSAGE] + self.conversation_history
+    
+    def _stream_completion(self, messages, max_tokens, temperature, cancel_event=None, usage_sink=None,
+                           priority=LIVE, **extra):
+        """
+        Stream a completion, yielding text deltas.
+        Usage (prompt/cached/completion tokens, TTFT, total latency) is recorded
+        once the stream finishes. If cancel_event gets set the HTTP stream is
+        closed early and token counts are estimated (no usage chunk arrives).
+        The request waits in the shared scheduler's `priority` lane first.
+        BACKGROUND work (post-call analysis) usually finishes during a later
+        call, so it only counts towards the campaign, not call_usage.
+        """
+        start = time.perf_counter()
+        trace_start = self.tracer.now()
+        first_token_time = None
+        usage = None
+        chunks = 0
+        cancelled = False
+        
+        def send():
+            raw = self.client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True},
+                **extra
+            )
+            self.scheduler.observe_headers("chat", raw.headers)
+            return raw.parse()
+        
+        # Rough token estimate for the TPM bucket: prompt chars/4 + reply budget
+        est_tokens = sum(len(m["content"]) for m in messages) // 4 + max_tokens
+        response = self.scheduler.call("chat", send, priority=priority, tokens=est_tokens)
+        
+        try:
+            for chunk in response:
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                if chunk.usage:
+                    usage = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if first_token_time is None:
+                        first_token_time = time.perf_counter()
+                    chunks += 1
+                    yield chunk.choices[0].delta.content
+        finally:
+            if cancelled or usage is None:
+                response.close()
+            end = time.perf_counter()
+            record = self._record_usage(usage, start, first_token_time or end, end,
+                                        messages=messages, chunks=chunks, cancelled=cancelled,
+                                        record_call=priority != BACKGROUND)
+            if usage_sink is not None:
+                usage_sink.append(record)
+            self.tracer.interval("llm.request", trace_start, cat="llm", ttft_ms=round(record["ttft_ms"], 1),
+                                 priority=priority, cancelled=cancelled,
+                                 completion_tokens=record["completion_tokens"])
+    
+    def _complete(self, messages, max_tokens, temperature, **extra):
+        """Blocking completion (streamed internally so TTFT can be measured)"""
+        return "".join(self._stream_completion(messages, max_tokens, temperature, **extra))
+    
+    def _record_usage(self, usage, start, first_token_time, end, messages=None, chunks=0, cancelled=False,
+                      record_call=True):
+        """Store usage record for this completion in call (record_call) + campaign stats"""
+        if usage:
+            cached = 0
+            if getattr(usage, "prompt_tokens_details", None):
+                cached = usage.prompt_tokens_details.cached_tokens or 0
+            prompt_tokens = usage.prompt_tokens
+            completion_tokens = usage.completion_tokens
+        else:
+            # Stream cut short - estimate (~4 chars per token, ~1 token per chunk)
+            cached = 0
+            prompt_tokens = sum(len(m["content"]) for m in messages or []) // 4
+            completion_tokens = chunks
+        
+        record = {
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached,
+            "completion_tokens": completion_tokens,
+            "ttft_ms": (first_token_time - start) * 1000,
+            "latency_ms": (end - start) * 1000,
+            "cancelled": cancelled,
+        }
+        if record_call:
+            self.call_usage.add(record)
+        self.campaign_usage.add(record)
+        
+        LLM_REQUESTS.labels("cancelled" if cancelled else "ok").inc()
+        LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels("cached").inc(cached)
+        LLM_TOKENS.labels("completion").inc(completion_tokens)
+        LLM_TTFT.observe(first_token_time - start)
+        LLM_LATENCY.observe(end - start)
+        
+        logger.debug(
+            f"📈 Tokens: {record['prompt_tokens']} in ({record['cached_tokens']} cached) / "
+            f"{record['completion_tokens']} out | TTFT {record['ttft_ms']:.0f}ms | "
+            f"Total {record['latency_ms']:.0f}ms{' | CANCELLED' if cancelled else ''}"
+        )
+        return record
+    
+    def stream_draft(self, user_text, cancel_event=None, usage_sink=None, priority=LIVE):
+        """
+        Stream a reply to user_text WITHOUT touching conversation history.
+        Used for speculative generation on partial transcripts - call
+        commit_turn() if the draft is accepted.
+        """
+        messages = self._build_messages() + [{"role": "user", "content": user_text}]
+        return self._stream_completion(messages, max_tokens=200, temperature=0.7,
+                                       cancel_event=cancel_event, usage_sink=usage_sink,
+                                       priority=priority)
+    
+    def commit_turn(self, user_text, reply):
+        """Add an already generated (speculative) turn to history"""
+        reply = ' '.join(reply.split())
+        self.conversation_history.append({"role": "user", "content": user_text})
+        self.conversation_history.append({"role": "assistant", "content": reply})
+        logger.debug(f"AI Response: {reply}")
+        return reply
+    
     def generate_response(self, user_text):
         """Generate short but COMPLETE Hindi response"""
         try:
             self.conversation_history.append({"role": "user", "content": user_text})
             
-            messages = [{"role": "system", "content": SYSTEM_PROMPT}] + self.conversation_history
+            messages = self._build_messages()
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=200,
-                temperature=0.7
-            )
-            
-            full_reply = response.choices[0].message.content.strip()
+            full_reply = self._complete(messages, max_tokens=200, temperature=0.7).strip()
             full_reply = ' '.join(full_reply.split())
             
             self.conversation_history.append({"role": "assistant", "content": full_reply})
@@ -47,37 +242,27 @@ class LLMEngine:
         
         except Exception as e:
             logger.error(f"LLM Error: {e}")
-            return "Ji, ek second. Dobara boliye?"
+            return LLM_FALLBACK_REPLY
     
     def generate_response_streaming(self, user_text):
         """Generate response with STREAMING - yields sentences as they come"""
         try:
             self.conversation_history.append({"role": "user", "content": user_text})
             
-            messages = [{"role": "system", "content": SYSTEM_PROMPT}] + self.conversation_history
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=200,
-                temperature=0.7,
-                stream=True
-            )
+            messages = self._build_messages()
             
             full_reply = ""
             sentence_buffer = ""
             
-            for chunk in response:
-                if chunk.choices[0].delta.content:
-                    text = chunk.choices[0].delta.content
-                    full_reply += text
-                    sentence_buffer += text
-                    
-                    # Yield sentence when complete
-                    if any(p in text for p in ['.', '!', '?', '।', '\n']):
-                        if sentence_buffer.strip():
-                            yield sentence_buffer.strip()
-                            sentence_buffer = ""
+            for text in self._stream_completion(messages, max_tokens=200, temperature=0.7):
+                full_reply += text
+                sentence_buffer += text
+                
+                # Yield sentence when complete
+                if any(p in text for p in ['.', '!', '?', '।', '\n']):
+                    if sentence_buffer.strip():
+                        yield sentence_buffer.strip()
+                        sentence_buffer = ""
             
             # Yield remaining
             if sentence_buffer.strip():
@@ -92,47 +277,12 @@ class LLMEngine:
         
         except Exception as e:
             logger.error(f"LLM Error: {e}")
-            yield "Ji, ek second. Dobara boliye?"
-
+            yield LLM_FALLBACK_REPLY
     
     def analyze_conversation(self):
-        """Analyze call and return result"""
-        if not self.conversation_history:
-            return {
-                "interest": "NO_CONVERSATION",
-                "result": "NO_RESPONSE", 
-                "summary": "Koi baat nahi hui"
-            }
-        
-        try:
-            conversation_text = self.get_conversation_text()
-            
-            prompt = f"""Ye call conversation analyze karo:
-
-{conversation_text}
-
-Batao (Hindi me):
-1. INTEREST: INTERESTED / NOT_INTERESTED / NEUTRAL
-2. RESULT: POSITIVE / NEGATIVE / CUT / NO_RESPONSE  
-3. SUMMARY: 1 line summary
-
-Format:
-INTEREST: <value>
-RESULT: <value>
-SUMMARY: <summary>"""
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=100,
-                temperature=0.3
-            )
-            
-            return self._parse_analysis(response.choices[0].message.content)
-        
-        except Exception as e:
-            logger.error(f"Analysis Error: {e}")
-            return {"interest": "ERROR", "result": "ERROR", "summary": str(e)}
+        """Analyze current call right now (blocking) - see AnalysisWorker for batched background analysis"""
+        from analysis_worker import analyze_batch
+        return analyze_batch(self, [("call", self.conversation_history)])["call"]
     
     def get_conversation_text(self):
         """Get conversation as text"""
@@ -141,33 +291,6 @@ SUMMARY: <summary>"""
             role = "User" if msg["role"] == "user" else "AI"
             lines.append(f"{role}: {msg['content']}")
         return "\n".join(lines)
-    
-    def _parse_analysis(self, text):
-        """Parse analysis response"""
-        result = {"interest": "UNKNOWN", "result": "UNKNOWN", "summary": ""}
-        
-        for line in text.strip().split("\n"):
-            line = line.strip().upper()
-            if line.startswith("INTEREST:"):
-                val = line.split(":", 1)[1].strip()
-                if "NOT" in val:
-                    result["interest"] = "NOT_INTERESTED"
-                elif "INTERESTED" in val:
-                    result["interest"] = "INTERESTED"
-                else:
-                    result["interest"] = "NEUTRAL"
-            
-            elif line.startswith("RESULT:"):
-                val = line.split(":", 1)[1].strip()
-                for r in ["POSITIVE", "NEGATIVE", "CUT", "NO_RESPONSE"]:
-                    if r in val:
-                        result["result"] = r
-                        break
-            
-            elif line.startswith("SUMMARY:"):
-                result["summary"] = text.split("SUMMARY:", 1)[1].strip().split("\n")[0]
-        
-        return result
 
 
 if __name__ == "__main__":
@@ -182,3 +305,4 @@ if __name__ == "__main__":
     
     analysis = llm.analyze_conversation()
     print(f"Analysis: {analysis}")
+    print(f"Usage: {llm.call_usage.as_dict()}")
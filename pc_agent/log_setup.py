@@ -0,0 +1,153 @@
+"""
+Log Setup - logging call ke hot path se bahar
+
+Har logger.info/debug sirf record ko ek queue me daalta hai (QueueHandler);
+console aur file me likhna ek background QueueListener thread karta hai.
+Log file size YA time limit pe rotate hoti hai, purani files gzip ho jati
+hain aur sirf backup_count rakhi jati hain. json_lines=True -> file me har
+line ek JSON object (grep / jq / log shipper ke liye).
+
+config.py import hote hi setup_logging() chala deta hai.
+Benchmark: python benchmarks/bench_logging.py
+"""
+import atexit
+import glob
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import time
+from datetime import datetime
+
+_listener = None
+
+
+def rotated_files(log_file):
+    """Rotated copies of log_file, oldest first (the timestamp suffix sorts by time)"""
+    return sorted(glob.glob(glob.escape(os.path.abspath(log_file)) + ".*"))
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RotatingLogFile(logging.FileHandler):
+    """
+    FileHandler that rotates when the file passes max_bytes OR is older than
+    rotate_seconds. Rotated files: <name>.<YYYYmmdd-HHMMSS>[.gz]
+    """
+
+    def __init__(self, filename, max_bytes=0, rotate_seconds=0, backup_count=5, compress=True):
+        super().__init__(filename, mode="a", encoding="utf-8", delay=False)
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.compress = compress
+        # Restarted agent keeps the old period, so a file never outlives rotate_seconds
+        opened = os.path.getmtime(self.baseFilename) if os.path.getsize(self.baseFilename) else time.time()
+        self.rollover_at = opened + rotate_seconds if rotate_seconds else None
+
+    def should_rollover(self):
+        if self.max_bytes and self.stream.tell() >= self.max_bytes:
+            return True
+        return self.rollover_at is not None and time.time() >= self.rollover_at
+
+    def emit(self, record):
+        try:
+            if self.stream and self.should_rollover():
+                self.do_rollover()
+        except Exception:
+            self.handleError(record)
+        super().emit(record)
+
+    def do_rollover(self):
+        self.stream.close()
+        self.stream = None
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target = f"{self.baseFilename}.{stamp}"
+        n = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{self.baseFilename}.{stamp}-{n}"
+            n += 1
+        os.replace(self.baseFilename, target)
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(target)
+        self._prune()
+        self.stream = self._open()
+        if self.rotate_seconds:
+            self.rollover_at = time.time() + self.rotate_seconds
+
+    def _prune(self):
+        old = rotated_files(self.baseFilename)
+        for path in old[:max(0, len(old) - self.backup_count)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def setup_logging(level=logging.DEBUG, log_file="calling_agent.log", fmt=None, datefmt=None,
+                  max_bytes=0, rotate_seconds=0, backup_count=5, compress=True,
+                  json_lines=False, console=True):
+    """
+    Route the root logger through a queue -> background listener.
+    Calling it again replaces the previous setup. Returns the QueueListener.
+    """
+    global _listener
+    stop_logging()
+
+    text = logging.Formatter(fmt, datefmt)
+    handlers = []
+    if console:
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(text)
+        handlers.append(stream)
+    if log_file:
+        os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+        file_handler = RotatingLogFile(log_file, max_bytes, rotate_seconds, backup_count, compress)
+        file_handler.setFormatter(JsonFormatter() if json_lines else text)
+        handlers.append(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the listener (runs at exit too)"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(stop_logging)
@@ -3,29 +3,54 @@ AI Calling Agent - USB/ADB Based Detection
 
 Flow:
 1. Phone app se Excel select karo aur calling start karo
+   (ya CAMPAIGN_NUMBERS_FILE - PC numbers / retries chalata hai, DIAL broadcast)
 2. PC USB ke through call state detect karta hai (ADB)
 3. RINGING -> PICKUP -> Audio play -> AI conversation
 4. Call end -> Ready for next
 
 Phone USB se connected hona chahiye with USB Debugging ON
 
-Run: python main.py
+Run: python main.py          (Tk file dialog + Y/N prompt)
+     python headless.py      (no Tk - config file / CLI flags)
 """
 import time
 import os
 import subprocess
 import threading
-import tkinter as tk
-from tkinter import filedialog, messagebox
+from contextlib import closing
 from datetime import datetime
 from enum import Enum
 from config import (
-    logger, SILENCE_TIMEOUT, SILENCE_MESSAGE,
-    MAX_CALL_DURATION, get_random_pitch
+    logger, SILENCE_TIMEOUT, SILENCE_MESSAGE, MAX_DURATION_MESSAGE,
+    GOODBYE_MESSAGE, IRRELEVANT_GOODBYE_MESSAGE,
+    MAX_CALL_DURATION, RING_TIMEOUT, get_random_pitch, OPENING_PITCHES, CAMPAIGN_NUMBERS_FILE,
+    WARMUP_ENABLED, WARMUP_TIMEOUT, AMD_ENABLED, AMD_MAX_SECONDS, AMD_ENERGY_THRESHOLD,
+    DTMF_ENABLED, DTMF_INTERESTED_DIGITS, DTMF_AI_HANDOFF, DTMF_HANDOFF_MESSAGE, ECHO_CANCEL_ENABLED,
+    RECORDING_MODE,
+    SPECULATIVE_MODE, FILLER_PHRASES, HTTP_PUSH_ENABLED,
+    ADB_POLL_INTERVAL, ADB_WATCHDOG_INTERVAL, ADB_REVERSE_CHECK_INTERVAL
 )
 from tts_engine import TTSEngine
 from excel_handler import ExcelHandler
 from audio_tracker import AudioTracker
+from campaign_stats import CampaignAggregate
+from agent_events import EventQueue, EventType
+from call_bus import CallEventBus, CallPhase, attach_detector, attach_http, HTTP_PHASES
+from tracing import get_tracer
+import metrics
+
+ADB_COMMAND_SECONDS = metrics.histogram("agent_adb_command_seconds", "ADB command round trip", ["command"])
+ADB_ERRORS = metrics.counter("agent_adb_errors_total", "ADB commands that failed or timed out", ["command"])
+CALLS = metrics.counter("agent_calls_total", "Calls by outcome (dialed / picked / unanswered / handled)", ["outcome"])
+CALL_DURATION = metrics.histogram("agent_call_duration_seconds", "Handled call length",
+                                  buckets=(5, 10, 20, 30, 60, 90, 120, 180, 300))
+IN_CALL = metrics.gauge("agent_in_call", "1 while a call is being handled")
+EVENT_QUEUE_DEPTH = metrics.gauge("agent_event_queue_depth", "Agent events waiting for the main loop")
+ANALYSIS_QUEUE_DEPTH = metrics.gauge("agent_analysis_queue_depth", "Finished calls waiting for analysis")
+WARMUP_SECONDS = metrics.gauge("agent_warmup_seconds", "Start-up warm-up wall time")
+FIRST_CALL_AUDIO = metrics.gauge("agent_first_call_audio_seconds", "First call of the session: pickup -> audio")
+PICKUP_VERDICTS = metrics.counter("agent_pickup_verdicts_total", "Pickup screening verdicts", ["verdict"])
+KEYPRESSES = metrics.counter("agent_keypresses_total", "DTMF keys pressed during the opening", ["digit"])
 
 
 # ============================================================
@@ -42,7 +67,8 @@ class USBCallState(Enum):
 class ADBCallDetector:
     """USB/ADB based call detection - Phone USB se connected hona chahiye"""
     
-    def __init__(self):
+    def __init__(self, adb_runner=None):
+        """adb_runner: optional callable(args, timeout) -> CompletedProcess (simulator's fake adb)"""
         self.running = False
         self.monitor_thread = None
         self.current_state = USBCallState.IDLE
@@ -51,6 +77,7 @@ class ADBCallDetector:
         self.ring_start_time = None
         
         # Callbacks
+        self.on_dialing = None
         self.on_ringing = None
         self.on_pickup = None
         self.on_hangup = None
@@ -58,8 +85,44 @@ class ADBCallDetector:
         self._lock = threading.Lock()
         self._last_state = None
         
+        # Tracing: hangup -> next dial
+        self.tracer = get_tracer()
+        self._hangup_at = None
+        
+        # USB push tunnel (adb reverse) - once the phone's pushes actually arrive
+        # through it, polling is only a watchdog
+        self.reverse_port = None
+        self.push_active = False
+        self._reversed = set()  # Serials with the tunnel set up
+        self._push_seen = False  # Old app build / failing POST = tunnel up but no pushes
+        self._reverse_checked_at = 0
+        
         # Find ADB path
-        self.adb_path = self._find_adb()
+        self.adb_runner = adb_runner
+        self.adb_path = "fake-adb" if adb_runner else self._find_adb()
+    
+    def _adb(self, *args, timeout=5):
+        """Run one adb command - every adb call goes through here"""
+        command = args[2] if args[:1] == ("shell",) and len(args) > 2 else args[0]
+        start = time.perf_counter()
+        try:
+            if self.adb_runner:
+                result = self.adb_runner(list(args), timeout)
+            else:
+                result = subprocess.run(
+                    [self.adb_path, *args],
+                    capture_output=True,
+                    text=True,
+                    timeout=timeout,
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)  # Windows only
+                )
+        except Exception:
+            ADB_ERRORS.labels(command).inc()
+            raise
+        ADB_COMMAND_SECONDS.labels(command).observe(time.perf_counter() - start)
+        if result.returncode != 0:
+            ADB_ERRORS.labels(command).inc()
+        return result
     
     def _find_adb(self):
         """Find ADB executable - check bundled first, then system"""
@@ -119,13 +182,7 @@ class ADBCallDetector:
             return False
         
         try:
-            result = subprocess.run(
-                [self.adb_path, "devices"], 
-                capture_output=True, 
-                text=True, 
-                timeout=10,  # Increased timeout
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            result = self._adb("devices", timeout=10)  # Increased timeout
             lines = result.stdout.strip().split('\n')
             for line in lines[1:]:
                 if '\tdevice' in line:
@@ -141,19 +198,83 @@ class ADBCallDetector:
             logger.error(f"❌ ADB error: {e}")
             return False
     
+    def list_devices(self):
+        """Serials of connected, authorized phones"""
+        result = self._adb("devices", timeout=10)
+        return [line.split('\t')[0] for line in result.stdout.strip().split('\n')[1:]
+                if line.strip().endswith('\tdevice')]
+    
+    def enable_push(self, port):
+        """
+        Phone -> PC push over USB: `adb reverse tcp:port tcp:port` on every phone
+        (app posts to 127.0.0.1:port). Re-applied on re-plug by the monitor loop.
+        True = tunnel up; polling drops to the watchdog rate after the first push.
+        """
+        self.reverse_port = port
+        self._sync_reverse()
+        return bool(self._reversed)
+    
+    def _sync_reverse(self):
+        """Set up the tunnel on new phones, forget unplugged ones, repair lost rules"""
+        self._reverse_checked_at = time.time()
+        port = self.reverse_port
+        try:
+            devices = set(self.list_devices())
+        except Exception as e:
+            logger.error(f"adb devices error: {e}")
+            return
+        
+        for serial in self._reversed - devices:
+            logger.warning(f"🔌 {serial} unplugged - USB push tunnel gone")
+        self._reversed &= devices
+        
+        for serial in devices:
+            try:
+                if serial in self._reversed:
+                    # adb server restart / phone reboot drops the rule silently
+                    listing = self._adb("-s", serial, "reverse", "--list")
+                    if f"tcp:{port}" in listing.stdout:
+                        continue
+                    self._reversed.discard(serial)
+                result = self._adb("-s", serial, "reverse", f"tcp:{port}", f"tcp:{port}")
+                if result.returncode == 0:
+                    self._reversed.add(serial)
+                    logger.info(f"🔌 USB push tunnel up: {serial} -> PC:{port}")
+                else:
+                    logger.warning(f"⚠️ adb reverse failed on {serial}: {result.stderr.strip()}")
+            except Exception as e:
+                logger.error(f"adb reverse error ({serial}): {e}")
+        
+        if not self._reversed:
+            self._push_seen = False  # Next phone has to prove its pushes again
+        self._update_polling()
+    
+    def push_received(self):
+        """Phone pushed a state change (HTTP) - the tunnel works end to end"""
+        if not self._push_seen:
+            self._push_seen = True
+            self._update_polling()
+    
+    def push_missed(self):
+        """Polling saw a transition before the phone pushed it - primary source again until the next push"""
+        if self._push_seen:
+            self._push_seen = False
+            self._update_polling()
+    
+    def _update_polling(self):
+        was_active = self.push_active
+        self.push_active = bool(self._reversed) and self._push_seen
+        if self.push_active != was_active:
+            interval = ADB_WATCHDOG_INTERVAL if self.push_active else ADB_POLL_INTERVAL
+            logger.info(f"🐕 ADB polling every {interval}s ({'watchdog' if self.push_active else 'primary source'})")
+    
     def get_call_state(self):
         """Get current call state from phone via ADB"""
         if not self.adb_path:
             return USBCallState.IDLE
         
         try:
-            result = subprocess.run(
-                [self.adb_path, "shell", "dumpsys", "telephony.registry"],
-                capture_output=True,
-                text=True,
-                timeout=5,  # Increased timeout
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            result = self._adb("shell", "dumpsys", "telephony.registry")
             output = result.stdout
             
             # Parse states - get pairs of mCallState and mForegroundCallState
@@ -201,13 +322,7 @@ class ADBCallDetector:
         
         try:
             # Read from file that app saves
-            result = subprocess.run(
-                [self.adb_path, "shell", "cat", "/sdcard/Android/data/com.callingagent.app/files/current_number.txt"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            result = self._adb("shell", "cat", "/sdcard/Android/data/com.callingagent.app/files/current_number.txt")
             number = result.stdout.strip()
             logger.info(f"📱 Read from file: '{number}' (len={len(number)})")
             if number and len(number) > 5:  # Valid number
@@ -220,13 +335,7 @@ class ADBCallDetector:
         
         # Fallback: try telephony.registry (for incoming calls)
         try:
-            result = subprocess.run(
-                [self.adb_path, "shell", "dumpsys", "telephony.registry"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            result = self._adb("shell", "dumpsys", "telephony.registry")
             output = result.stdout
             
             for line in output.split('\n'):
@@ -276,12 +385,16 @@ class ADBCallDetector:
                 if check_count % 10 == 0:
                     print(f"   [DEBUG] State: {new_state.value}", end='\r')
                 
+                # Re-plug / lost tunnel check
+                if self.reverse_port and time.time() - self._reverse_checked_at > ADB_REVERSE_CHECK_INTERVAL:
+                    self._sync_reverse()
+                
                 with self._lock:
-                    # Check for ringing timeout (30 seconds)
+                    # Check for ringing timeout
                     if self.current_state == USBCallState.RINGING and self.ring_start_time:
                         ring_duration = time.time() - self.ring_start_time
-                        if ring_duration > 30:  # 30 seconds timeout
-                            print(f"\n⏰ RINGING TIMEOUT (30s) - Call not picked/busy")
+                        if ring_duration > RING_TIMEOUT:
+                            print(f"\n⏰ RINGING TIMEOUT ({RING_TIMEOUT}s) - Call not picked/busy")
                             logger.info("⏰ Ringing timeout - triggering next call")
                             # Trigger next call
                             self.hang_up_call()
@@ -297,7 +410,8 @@ class ADBCallDetector:
                         self._handle_state_change(new_state)
                         self._last_state = new_state
                 
-                time.sleep(0.3)
+                # Phone pushes over USB -> polling only cross-checks
+                time.sleep(ADB_WATCHDOG_INTERVAL if self.push_active else ADB_POLL_INTERVAL)
                 
             except Exception as e:
                 logger.error(f"Monitor error: {e}")
@@ -311,10 +425,14 @@ class ADBCallDetector:
             if self.current_state == USBCallState.IDLE:
                 print(f"📱 DIALING... | Time: {current_time}")
                 logger.info("📱 Dialing...")
+                self._trace_next_dial()
                 self.current_state = new_state
+                if self.on_dialing:
+                    self.on_dialing()
         
         elif new_state == USBCallState.RINGING:
             if self.current_state in [USBCallState.IDLE, USBCallState.DIALING]:
+                self._trace_next_dial()
                 if self.ring_start_time is None:
                     self.ring_count = 0
                     self.ring_start_time = time.time()
@@ -358,6 +476,7 @@ class ADBCallDetector:
                 
                 # Check if call was not picked (RINGING -> IDLE)
                 was_not_picked = self.current_state == USBCallState.RINGING
+                self._hangup_at = self.tracer.now()
                 
                 self.current_state = new_state
                 
@@ -375,6 +494,11 @@ class ADBCallDetector:
             else:
                 self.current_state = new_state
     
+    def _trace_next_dial(self):
+        if self._hangup_at is not None:
+            self.tracer.interval("hangup_to_next_dial", self._hangup_at, cat="detector")
+            self._hangup_at = None
+    
     def get_current_state(self):
         """Get current state"""
         with self._lock:
@@ -382,30 +506,33 @@ class ADBCallDetector:
     
     def hang_up_call(self):
         """Send END_CALL broadcast to Android app via ADB"""
+        # App will end call and trigger next (unless the PC campaign scheduler dials)
+        logger.info("� Sending END_CALL broadcast to app...")
+        if self._broadcast("com.callingagent.END_CALL"):
+            logger.info("✅ END_CALL broadcast sent successfully!")
+            logger.info("📱 App will end call and dial next number")
+            return True
+        return False
+    
+    def dial(self, number):
+        """Send DIAL broadcast - app places a call to number (campaign scheduler mode)"""
+        # number is digits / leading + only (normalize_number) - adb shell re-parses it
+        return self._broadcast("com.callingagent.DIAL", "--es", "number", number)
+    
+    def _broadcast(self, action, *extras):
+        """am broadcast to the app's PCCommandReceiver; True once the phone confirmed it"""
         if not self.adb_path:
             logger.error("❌ ADB not found - cannot send command")
             return False
         
         try:
-            # Send broadcast to app - app will end call and trigger next
-            cmd = [
-                self.adb_path, "shell", "am", "broadcast",
-                "-a", "com.callingagent.END_CALL",
+            result = self._adb(
+                "shell", "am", "broadcast",
+                "-a", action, *extras,
                 "-n", "com.callingagent.app/.receiver.PCCommandReceiver"
-            ]
-            
-            logger.info("� Sending END_CALL broadcast to app...")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=5,
-                creationflags=subprocess.CREATE_NO_WINDOW
             )
             
             if result.returncode == 0 and "Broadcast completed" in result.stdout:
-                logger.info("✅ END_CALL broadcast sent successfully!")
-                logger.info("📱 App will end call and dial next number")
                 return True
             else:
                 logger.warning(f"Broadcast result: {result.stdout} {result.stderr}")
@@ -427,6 +554,8 @@ AI_MODE = False
 def select_audio_file():
     """GUI to select opening audio file"""
     global OPENING_AUDIO
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
     
     root = tk.Tk()
     root.title("AI Calling Agent - USB Mode")
@@ -550,7 +679,10 @@ def ask_ai_mode():
 # ============================================================
 
 class CallingAgent:
-    def __init__(self, opening_audio, ai_mode, show_banner=True):
+    def __init__(self, opening_audio, ai_mode, show_banner=True,
+                 detector=None, tts=None, excel=None, audio_tracker=None, listener=None, llm=None,
+                 bus=None, call_server=None, stats=None, scheduler=None, microphone=None):
+        """Components can be injected (simulator / benchmarks); defaults are the real ones"""
         if show_banner:
             self._print_banner()
         
@@ -559,47 +691,127 @@ class CallingAgent:
         
         logger.info("Initializing components...")
         
+        # Call flow is driven by events posted from detector/listener/player threads
+        self.events = EventQueue()
+        self.tracer = get_tracer()
+        self.stats = stats or CampaignAggregate()  # Live dashboard numbers (GUI passes its own)
+        EVENT_QUEUE_DEPTH.set_function(self.events._queue.qsize)
+        
+        # Every call-state source reports into one bus; agent follows its canonical stream
+        self.bus = bus or CallEventBus()
+        self.bus.subscribe(self._on_call_event)
+        
         # USB/ADB Call Detector
-        self.usb_detector = ADBCallDetector()
-        self.usb_detector.on_ringing = self._on_ringing
-        self.usb_detector.on_pickup = self._on_pickup
-        self.usb_detector.on_hangup = self._on_hangup
+        self.usb_detector = detector or ADBCallDetector()
+        attach_detector(self.bus, self.usb_detector)
+        
+        # Phone's HTTP push - second source (real setup only, not when a detector is injected)
+        self.call_server = call_server
+        if self.call_server is None and detector is None and HTTP_PUSH_ENABLED:
+            from http_server import HTTPCallServer
+            self.call_server = HTTPCallServer()
+        if self.call_server:
+            attach_http(self.bus, self.call_server)
+            push_received = getattr(self.usb_detector, "push_received", None)
+            if push_received:
+                self.call_server.on_state_change(lambda state, number, direction: push_received())
+        
+        # PC-side dialing order / retries (optional - otherwise the app walks its own list)
+        self.dialer = None
+        if scheduler is None and CAMPAIGN_NUMBERS_FILE:
+            from campaign_scheduler import CampaignScheduler
+            scheduler = CampaignScheduler.from_file(CAMPAIGN_NUMBERS_FILE)
+        if scheduler is not None:
+            from campaign_scheduler import CampaignDialer
+            self.dialer = CampaignDialer(scheduler, self.usb_detector)
+            logger.info(f"📋 Campaign scheduler: {len(scheduler)} numbers")
         
-        self.tts = TTSEngine()
-        self.excel = ExcelHandler()
-        self.audio_tracker = AudioTracker()
+        self.tts = tts or TTSEngine()
+        self.excel = excel or ExcelHandler()
+        self.audio_tracker = audio_tracker or AudioTracker()
+        
+        # Listener + LLM: AI mode, or audio-only with the keypress hand-off to a conversation
+        wants_ai = self.ai_mode or (DTMF_ENABLED and DTMF_AI_HANDOFF)
         
         # Only load listener if AI mode
         self.listener = None
-        if self.ai_mode:
-            from speech_listener import SpeechListener
-            self.listener = SpeechListener()
+        if wants_ai:
+            if listener is None:
+                from speech_listener import SpeechListener
+                listener = SpeechListener()
+            self.listener = listener
+            self.listener.on_text = self._on_transcript
+        
+        # Pickup screening / keypad share the listener's mic; audio-only opens one on first use.
+        # Echo cancellation wraps it - everyone reading the mic gets the agent's own voice removed.
+        # Call recording wraps that - what they heard goes into the recording.
+        self.echo = None
+        self.recorder = None        # This call's CallRecorder (RECORDING_MODE)
+        self._last_recorder = None  # ... still encoding after the call, waited for on shutdown
+        self.microphone = self._record_microphone(
+            self._cancel_echo(microphone or getattr(self.listener, "microphone", None)))
+        self._microphone_opened = self.microphone is not None
+        if self.listener and self.microphone is not None:
+            self.listener.microphone = self.microphone
         
-        # Only load LLM if AI mode is ON
+        # Only load LLM if AI mode is ON (or the keypress hand-off needs it)
         self.llm = None
-        if self.ai_mode:
+        if wants_ai:
             try:
-                from llm_engine import LLMEngine
-                self.llm = LLMEngine()
-                logger.info("🤖 AI Mode: ON")
+                if llm is None:
+                    from llm_engine import LLMEngine
+                    llm = LLMEngine()
+                self.llm = llm
+                logger.info("🤖 AI Mode: ON" if self.ai_mode else "☎️ Keypress hand-off: AI conversation after an interested key")
             except Exception as e:
                 logger.error(f"LLM init failed: {e}")
                 logger.warning("⚠️ Running without AI - just audio playback")
                 self.ai_mode = False
-        else:
+        if not self.ai_mode:
             logger.info("📢 AI Mode: OFF - Audio only")
         
+        # Post-call analysis runs in background, batched
+        self.analysis_worker = None
+        if self.llm:
+            from analysis_worker import AnalysisWorker
+            self.analysis_worker = AnalysisWorker(self.llm, on_result=self._on_analysis)
+            self.analysis_worker.start()
+            ANALYSIS_QUEUE_DEPTH.set_function(self.analysis_worker._queue.qsize)
+        
+        # Per-turn latency budget (filler / hedge / canned fallback)
+        self.deadline = None
+        if self.llm:
+            from deadline import DeadlineResponder
+            self.deadline = DeadlineResponder(self.llm)
+        
+        # Speculative generation on partial transcripts (optional)
+        self.speculator = None
+        if self.ai_mode and self.llm and self.listener and SPECULATIVE_MODE:
+            from speculation import SpeculativeResponder
+            self.speculator = SpeculativeResponder(self.llm)
+            self.listener.on_partial = self.speculator.on_partial
+            logger.info("🔮 Speculative mode: ON")
+        
         self.current_number = ""
         self.call_start_time = 0
         self.last_speech_time = 0
         self.in_call = False
         self.audio_length = 0
         self.audio_start_time = 0
+        self.pickup_at = 0  # Monotonic, for tracing
+        self.pickup_verdict = None  # MACHINE / RINGBACK / SIT - call cut before the opening
+        self.keypress = None        # DTMF key pressed during the opening (audio-only)
+        self.running = False
+        self._playback_id = 0
         
-        # Threading events
-        self._pickup_event = threading.Event()
+        # Set on hangup so blocking TTS / filler threads can bail out early
         self._hangup_event = threading.Event()
+        self.tts.hangup_event = self._hangup_event  # Filler / fixed phrases don't undo the hangup's stop()
         self._call_lock = threading.Lock()  # Prevent duplicate call handling
+        self.ready = threading.Event()  # Set once monitoring is up and the main loop starts
+        self.warmup_seconds = None      # Wall time of _warm_up()
+        self.warmup_tasks = {}          # Task -> seconds (None = still running at READY)
+        self.first_call_audio = None    # Seconds, pickup -> audio of the session's first call
         
         logger.info(f"� Opening Audio: {os.path.basename(opening_audio)}")
     
@@ -611,10 +823,38 @@ class CallingAgent:
 ╚═══════════════════════════════════════════════════════════╝
         """)
     
+    def _on_call_event(self, event):
+        """Canonical transition from the call bus (first source to see it wins)"""
+        if (event.source == "adb" and event.phase in HTTP_PHASES.values()
+                and getattr(self.usb_detector, "push_active", False)):
+            logger.warning(f"🐕 Watchdog caught {event.phase.value} before the phone's push - back to fast polling")
+            self.usb_detector.push_missed()
+        if self.dialer:
+            self.dialer.on_phase(event.phase, event.previous)
+        if event.phase in (CallPhase.DIALING, CallPhase.RINGING) and event.previous == CallPhase.IDLE:
+            CALLS.labels("dialed").inc()  # Once per call, whichever phase came first
+            self.stats.record_dial()
+        if event.phase == CallPhase.RINGING:
+            self._on_ringing(event.number, 1)
+        elif event.phase == CallPhase.ACTIVE:
+            CALLS.labels("picked").inc()
+            self.stats.record_pickup()
+            self._on_pickup(event.number)
+        elif event.phase == CallPhase.IDLE and event.previous != CallPhase.IDLE:
+            if event.previous in (CallPhase.DIALING, CallPhase.RINGING):
+                CALLS.labels("unanswered").inc()
+                self.stats.record_unanswered()
+            self._on_hangup()
+    
     def _on_ringing(self, number, ring_count):
         """Called when phone is ringing"""
         if number and number != "Unknown":
             self.current_number = number
+        
+        # Warm OpenAI connection now so it's hot when caller answers
+        if self.llm and ring_count == 1:
+            from openai_client import prewarm
+            prewarm()
         # Don't start timer yet - wait for pickup
     
     def _on_pickup(self, number):
@@ -622,10 +862,11 @@ class CallingAgent:
         # Update number if we got it now
         if number and number != "Unknown":
             self.current_number = number
-        self._pickup_event.set()
+        self.events.post(EventType.PICKUP, number)
     
     def _on_hangup(self):
         """Called when call ends"""
+        self.events.post(EventType.HANGUP)
         self._hangup_event.set()
         # Stop audio safely
         try:
@@ -633,6 +874,27 @@ class CallingAgent:
         except:
             pass
     
+    def _on_analysis(self, row, analysis):
+        """Analysis worker finished a call - fill in the sheet row and the live numbers"""
+        self.excel.update_analysis(row, analysis)
+        self.stats.record_result(analysis.get("interest", ""), analysis.get("result", ""),
+                                 replaces=("PENDING", "PENDING"))
+    
+    def _on_transcript(self, text):
+        """Called from the listener thread with each final transcript"""
+        self.events.post(EventType.TRANSCRIPT, text)
+    
+    def stop(self):
+        """Stop the agent from another thread (GUI / simulator)"""
+        self.running = False
+        self.usb_detector.running = False
+        self._hangup_event.set()
+        self.events.post(EventType.STOP)
+        try:
+            self.tts.stop()
+        except:
+            pass
+    
     def start(self):
         """Start the agent"""
         if not self.usb_detector.start_monitoring():
@@ -645,33 +907,112 @@ class CallingAgent:
             print(f"   {self.usb_detector.adb_path or 'NOT FOUND'}")
             return
         
-        if self.ai_mode and self.listener:
+        if self.call_server:
+            try:
+                self.call_server.start()
+                # Phone reaches the server over USB - no WiFi / PC IP needed
+                self.usb_detector.enable_push(self.call_server.port)
+            except OSError as e:
+                # Port busy (another agent running) - ADB polling alone still works
+                logger.warning(f"⚠️ HTTP push disabled: {e}")
+                self.call_server = None
+        
+        if WARMUP_ENABLED:
+            self._warm_up()
+        elif self.listener:
             self.listener.calibrate()
         
         logger.info("=" * 50)
         logger.info("✅ READY - USB monitoring active")
-        logger.info("📱 Phone app se Excel select karo aur calling start karo")
+        if self.dialer:
+            logger.info("📋 PC dials from the campaign list - phone app pe Start mat dabao")
+        else:
+            logger.info("📱 Phone app se Excel select karo aur calling start karo")
         logger.info(f"🤖 AI Mode: {'ON' if self.ai_mode else 'OFF'}")
         logger.info("=" * 50)
         
-        print("\n" + "=" * 50)
-        print("📱 PHONE APP SE CALLING START KARO")
-        print("   PC automatically call detect karega")
-        print("=" * 50 + "\n")
+        if not self.dialer:
+            print("\n" + "=" * 50)
+            print("📱 PHONE APP SE CALLING START KARO")
+            print("   PC automatically call detect karega")
+            print("=" * 50 + "\n")
         
         self._main_loop()
     
+    def _warm_up(self):
+        """
+        Pay the first call's cold costs before READY, all at once: opening
+        audio decode, fixed TTS phrases, Excel files, and in AI mode mic
+        calibration + OpenAI connection (Whisper and chat share the pool)
+        """
+        tasks = {
+            "excel": self.excel.prepare,
+            "audio_tracker": self.audio_tracker.prepare,
+        }
+        if os.path.exists(self.opening_audio):
+            tasks["opening_audio"] = lambda: self.tts.preload(self.opening_audio)
+        phrases = []
+        if self.llm:
+            phrases = [SILENCE_MESSAGE, MAX_DURATION_MESSAGE, GOODBYE_MESSAGE, IRRELEVANT_GOODBYE_MESSAGE]
+            phrases += FILLER_PHRASES
+            if not self.ai_mode:
+                phrases.append(DTMF_HANDOFF_MESSAGE)
+            elif not os.path.exists(self.opening_audio):
+                phrases += OPENING_PITCHES  # Spoken instead of the missing file
+        if phrases:
+            tasks["phrases"] = lambda: self.tts.prepare(phrases)
+        if self.listener:
+            tasks["calibrate"] = self.listener.calibrate
+        if (AMD_ENABLED or DTMF_ENABLED) and not self._microphone_opened:
+            tasks["microphone"] = self._pickup_microphone
+        if self.llm:
+            from openai_client import prewarm
+            tasks["openai_connection"] = lambda: prewarm(blocking=True)
+        
+        self.warmup_tasks = dict.fromkeys(tasks)
+        
+        def run(name, task):
+            start = self.tracer.now()
+            try:
+                task()
+            except Exception as e:
+                logger.warning(f"⚠️ Warm-up {name} failed: {e}")
+            self.warmup_tasks[name] = self.tracer.now() - start
+            self.tracer.interval(f"warmup.{name}", start, cat="warmup")
+        
+        logger.info(f"🔥 Warming up: {', '.join(tasks)}")
+        start = self.tracer.now()
+        threads = [threading.Thread(target=run, args=item, daemon=True) for item in tasks.items()]
+        for thread in threads:
+            thread.start()
+        deadline = start + WARMUP_TIMEOUT
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - self.tracer.now()))
+        self.warmup_seconds = self.tracer.now() - start
+        WARMUP_SECONDS.set(self.warmup_seconds)
+        
+        took = " | ".join(f"{name} {'…' if s is None else f'{s * 1000:.0f}ms'}"
+                          for name, s in self.warmup_tasks.items())
+        logger.info(f"🔥 Warm-up {self.warmup_seconds * 1000:.0f}ms ({took})")
+    
     def _main_loop(self):
-        """Main loop - wait for calls from phone app"""
-        while True:
+        """Main loop - block on the event queue until a call is picked up"""
+        self.running = True
+        self.ready.set()
+        while self.running:
             try:
-                # Reset events
-                self._pickup_event.clear()
-                self._hangup_event.clear()
+                # Between calls: campaign scheduler dials the next number when due
+                wait = self.dialer.tick() if self.dialer else 1.0
+                # Timeout only keeps Ctrl+C responsive on Windows (and wakes the dialer)
+                event = self.events.wait(timeout=wait)
                 
-                # Wait for pickup
-                if self._pickup_event.wait(timeout=0.5):
-                    self._handle_call()
+                if event.type == EventType.PICKUP:
+                    # A hangup queued before this pickup belongs to the previous call
+                    self._hangup_event.clear()
+                    if self.events.has_pending(EventType.HANGUP):
+                        self._hangup_event.set()
+                    self._handle_call(event.time)
+                # Anything else between calls (late hangup, stale transcript) is ignored
                 
             except KeyboardInterrupt:
                 logger.info("\n⛔ Stopped by user")
@@ -681,9 +1022,16 @@ class CallingAgent:
                 time.sleep(1)
         
         self.usb_detector.stop_monitoring()
+        if self.call_server:
+            self.call_server.stop()
+        if self.analysis_worker:
+            logger.info("🔍 Flushing pending analyses...")
+            self.analysis_worker.stop()
+        if self._last_recorder:
+            self._last_recorder.wait(timeout=10)
     
-    def _handle_call(self):
-        """Handle active call"""
+    def _handle_call(self, pickup_at=None):
+        """Handle active call (pickup_at: monotonic time the pickup was detected)"""
         # Prevent duplicate call handling
         if not self._call_lock.acquire(blocking=False):
             logger.warning("⚠️ Call already being handled - skipping duplicate")
@@ -691,21 +1039,27 @@ class CallingAgent:
         
         try:
             self.in_call = True
+            IN_CALL.set(1)
             self.call_start_time = time.time()
             self.last_speech_time = time.time()
-            self._hangup_event.clear()
+            self.events.discard(EventType.TRANSCRIPT, EventType.PLAYBACK_DONE, EventType.KEYPRESS)
             
             # Start audio timer RIGHT NOW at pickup
             self.audio_start_time = time.time()
+            self.pickup_at = pickup_at or self.tracer.now()
+            self.tracer.set_call(self.current_number or "Unknown")
+            self._start_recording()
             
             if self.llm:
                 self.llm.reset_conversation()
             
             logger.info(f"📞 Call active: {self.current_number}")
             
-            time.sleep(0.5)
-            
-            if self.ai_mode:
+            self.pickup_verdict = None
+            self.keypress = None
+            if AMD_ENABLED and self._screen_pickup():
+                pass  # Machine / tone - nothing to play to
+            elif self.ai_mode:
                 self._handle_call_ai()
             else:
                 self._handle_call_audio_only()
@@ -714,6 +1068,106 @@ class CallingAgent:
         finally:
             self._call_lock.release()
     
+    def _pickup_microphone(self):
+        if not self._microphone_opened:
+            from mic_capture import default_microphone
+            self.microphone = self._record_microphone(self._cancel_echo(default_microphone()))
+            self._microphone_opened = True
+        return self.microphone
+    
+    def _cancel_echo(self, microphone):
+        """With ECHO_CANCEL_ENABLED: microphone wrapped so reads come back without what TTS is playing"""
+        if not ECHO_CANCEL_ENABLED or microphone is None:
+            return microphone
+        from echo_canceller import EchoCanceller, EchoCancellingMicrophone
+        try:
+            self.echo = EchoCanceller(microphone.SAMPLE_RATE)
+            wrapped = EchoCancellingMicrophone(microphone, self.echo)
+        except ValueError as e:
+            logger.error(f"Echo cancellation off: {e}")
+            self.echo = None
+            return microphone
+        self.tts.echo_reference = self.echo.reference
+        logger.info(f"🔁 Echo cancellation ON ({microphone.SAMPLE_RATE} Hz)")
+        return wrapped
+    
+    def _record_microphone(self, microphone):
+        """With RECORDING_MODE mic / both: microphone wrapped so the call's recorder gets every chunk read"""
+        if RECORDING_MODE not in ("mic", "both") or microphone is None:
+            return microphone
+        from call_recorder import RecordingMicrophone
+        try:
+            return RecordingMicrophone(microphone)
+        except ValueError as e:
+            logger.error(f"Mic recording off: {e}")
+            return microphone
+    
+    def _start_recording(self):
+        """RECORDING_MODE: this call's recorder gets the mic chunks and what TTS plays"""
+        if not RECORDING_MODE:
+            return
+        from call_recorder import CallRecorder
+        microphone = self._pickup_microphone() if RECORDING_MODE != "playback" else None
+        try:
+            self.recorder = CallRecorder(self.current_number, RECORDING_MODE,
+                                         mic_rate=microphone.SAMPLE_RATE if microphone else None).start()
+        except ValueError as e:
+            logger.error(f"Recording off: {e}")
+            return
+        if hasattr(microphone, "recorder"):
+            microphone.recorder = self.recorder
+        self.tts.record_reference = self.recorder.playback
+        self._last_recorder = self.recorder
+    
+    def _finish_recording(self):
+        """Detach the call's recorder - the file is finished in the background. Returns its path"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        if getattr(self.microphone, "recorder", None) is recorder:
+            self.microphone.recorder = None
+        self.tts.record_reference = None
+        return recorder.finish()
+    
+    def _screen_pickup(self):
+        """
+        Listen before the opening plays. True = not a person (voicemail /
+        announcement / ringback / SIT) - pickup_verdict is set and the call
+        should just end. No mic / errors / no verdict = carry on as a person.
+        """
+        microphone = self._pickup_microphone()
+        if microphone is None:
+            return False
+        from pickup_classifier import PickupClassifier, NOT_A_PERSON
+        from mic_capture import read_chunks
+        threshold = self.listener.recognizer.energy_threshold if self.listener else AMD_ENERGY_THRESHOLD
+        classifier = PickupClassifier(microphone.SAMPLE_RATE, energy_threshold=threshold)
+        try:
+            with closing(read_chunks(microphone, stop=self._hangup_event,
+                                     max_seconds=AMD_MAX_SECONDS + 0.5)) as chunks:
+                for samples in chunks:
+                    if classifier.feed(samples):
+                        break
+        except Exception as e:
+            logger.warning(f"⚠️ Pickup screening failed: {e}")
+            return False
+        if not classifier.verdict:
+            return False  # Hung up while we listened
+        
+        took = self.tracer.now() - self.pickup_at
+        self.tracer.interval("pickup_screen", self.pickup_at, verdict=classifier.verdict)
+        PICKUP_VERDICTS.labels(classifier.verdict).inc()
+        s = classifier.summary()
+        logger.info(f"🕵️ Pickup: {classifier.verdict} in {took * 1000:.0f}ms "
+                    f"(voice {s['voice_s']}s / tone {s['tone_s']}s)")
+        if classifier.verdict not in NOT_A_PERSON:
+            return False
+        self.pickup_verdict = classifier.verdict
+        if self.dialer:
+            self.dialer.tag(classifier.verdict)
+        logger.info(f"🤖 Not a person ({classifier.verdict}) - hanging up without the opening")
+        return True
+    
     def _handle_call_ai(self):
         """AI MODE: Play audio then conversation"""
         logger.info("🤖 MODE: AI Active")
@@ -722,6 +1176,7 @@ class CallingAgent:
             logger.info(f"� Playing: {os.path.basename(self.opening_audio)}")
             self._play_audio_with_hangup_check(self.opening_audio)
             
+            self._trace_pickup_audio()
             if self._hangup_event.is_set():
                 logger.info("📴 Call ended during audio")
                 return
@@ -729,7 +1184,8 @@ class CallingAgent:
             logger.info("✅ Audio finished")
         else:
             pitch = get_random_pitch()
-            self.tts.speak(pitch)
+            self.tts.play_cached(pitch)
+            self._trace_pickup_audio(pitch=True)
             if self.llm:
                 self.llm.conversation_history.append({"role": "assistant", "content": pitch})
         
@@ -750,7 +1206,8 @@ class CallingAgent:
             # Start timer RIGHT BEFORE audio play
             audio_play_start = time.time()
             
-            self._play_audio_with_hangup_check(self.opening_audio)
+            self.keypress = self._play_audio_with_hangup_check(self.opening_audio, keypad=DTMF_ENABLED)
+            self._trace_pickup_audio()
             
             # Calculate ACTUAL listened time (from audio start to hangup/end)
             listened_time = time.time() - audio_play_start
@@ -761,6 +1218,8 @@ class CallingAgent:
             
             if self._hangup_event.is_set():
                 logger.info(f"📴 Call ended during audio (listened: {listened_time:.1f}s / {self.audio_length:.1f}s)")
+            elif self.keypress:
+                logger.info(f"☎️ Pressed {self.keypress} after {listened_time:.1f}s - opening stopped")
             else:
                 logger.info("✅ Audio finished - call will end now")
             
@@ -768,133 +1227,267 @@ class CallingAgent:
             phone = self.current_number if self.current_number else "Unknown"
             
             # Log to Excel
-            self.audio_tracker.log_call(phone, self.audio_length, listened_time)
+            self.audio_tracker.log_call(phone, self.audio_length, listened_time, keypress=self.keypress)
+            if self.audio_length > 0:
+                self.stats.record_listen(listened_time / self.audio_length * 100)
+            
+            if (self.keypress and self.keypress in DTMF_INTERESTED_DIGITS and self.llm and self.listener
+                    and not self._hangup_event.is_set()):
+                self._keypress_handoff()
         else:
             logger.error("❌ Audio file not found!")
             return
     
-    def _play_audio_with_hangup_check(self, audio_file):
-        """Play audio file with hangup check"""
+    def _keypress_handoff(self):
+        """Interested key in audio-only mode - carry on as an AI conversation"""
+        logger.info("🤖 Interested key - handing over to the AI conversation")
+        self.llm.conversation_history.append({
+            "role": "assistant",
+            "content": f"(Recorded opening played; caller pressed {self.keypress} to show interest) {DTMF_HANDOFF_MESSAGE}",
+        })
+        self.tts.play_cached(DTMF_HANDOFF_MESSAGE)
+        self.last_speech_time = time.time()
+        if not self._hangup_event.is_set():
+            self._conversation_loop()
+    
+    def _play_audio_with_hangup_check(self, audio_file, keypad=False):
+        """Play audio file with hangup check. keypad: DTMF key stops it - returns the key (else None)"""
         # Prevent duplicate playback
         if self.tts._playing:
             logger.warning("⚠️ Audio already playing - skipping")
             return
         
-        play_thread = threading.Thread(
-            target=self.tts.play_file, 
-            args=(audio_file,),
-            daemon=True
-        )
+        self._playback_id += 1
+        playback_id = self._playback_id
+        
+        def play():
+            try:
+                self.tts.play_file(audio_file)
+            finally:
+                self.events.post(EventType.PLAYBACK_DONE, playback_id)
+        
+        play_thread = threading.Thread(target=play, daemon=True)
         play_thread.start()
+        keypad = self._watch_keypad(playback_id) if keypad else None
         
-        # Monitor for hangup while audio plays
-        while play_thread.is_alive():
-            if self._hangup_event.is_set():
-                logger.debug("🛑 Hangup detected - stopping audio")
+        # Block until playback finishes, a key is pressed or the caller hangs up
+        digit = None
+        while not self._hangup_event.is_set():
+            event = self.events.wait()
+            if event.type == EventType.PLAYBACK_DONE and event.data == playback_id:
+                break
+            if event.type == EventType.KEYPRESS and event.data[0] == playback_id:
+                digit = event.data[1]
                 self.tts.stop()
+                play_thread.join(timeout=1)
+                break
+            if event.type in (EventType.HANGUP, EventType.STOP):
                 break
-            time.sleep(0.1)
         
-        # Ensure thread is cleaned up
-        play_thread.join(timeout=1)
+        if keypad:
+            keypad_thread, keypad_stop = keypad
+            keypad_stop.set()
+            keypad_thread.join(timeout=1)  # Mic must be free before the listener opens it
+        
+        if self._hangup_event.is_set():
+            logger.debug("🛑 Hangup detected - stopping audio")
+            self.tts.stop()
+            play_thread.join(timeout=1)
         
         # Force stop if still playing
         if self.tts._playing:
             self.tts.stop()
+        return digit
+    
+    def _watch_keypad(self, playback_id):
+        """Mic -> DTMFDetector while the opening plays; first key posts KEYPRESS. Returns (thread, stop) or None"""
+        microphone = self._pickup_microphone()
+        if microphone is None:
+            return None
+        stop = threading.Event()
+        
+        def watch():
+            from dtmf_detector import DTMFDetector
+            from mic_capture import read_chunks
+            detector = DTMFDetector(microphone.SAMPLE_RATE)
+            try:
+                with closing(read_chunks(microphone, stop=stop)) as chunks:
+                    for samples in chunks:
+                        digits = detector.feed(samples)
+                        if digits:
+                            KEYPRESSES.labels(digits[0]).inc()
+                            self.events.post(EventType.KEYPRESS, (playback_id, digits[0]))
+                            return
+            except Exception as e:
+                logger.warning(f"⚠️ Keypad listening failed: {e}")
+        
+        thread = threading.Thread(target=watch, daemon=True)
+        thread.start()
+        return thread, stop
     
     def _conversation_loop(self):
-        """AI conversation loop"""
+        """AI conversation loop - waits on transcript / hangup events, silence and max duration are wait timeouts"""
         if not self.llm or not self.listener:
             return
         
         logger.info("🎤 Listening...")
-        self.listener.start_continuous()
-        self.listener.clear_queue()
+        self._start_listening()
         
         # Track irrelevant questions
         irrelevant_count = 0
         MAX_IRRELEVANT = 4  # End call after 4 irrelevant questions
         
         while self.in_call and not self._hangup_event.is_set():
-            if self._hangup_event.is_set():
+            now = time.time()
+            max_left = self.call_start_time + MAX_CALL_DURATION - now
+            silence_left = self.last_speech_time + SILENCE_TIMEOUT - now
+            event = self.events.wait(timeout=max(0.0, min(max_left, silence_left)))
+            
+            if event.type in (EventType.HANGUP, EventType.STOP):
                 break
             
-            if time.time() - self.call_start_time > MAX_CALL_DURATION:
-                logger.info("⏰ Max duration")
-                self.tts.speak("Bahut accha laga. Bye!")
+            if event.type == EventType.TIMEOUT:
+                if time.time() - self.call_start_time >= MAX_CALL_DURATION:
+                    logger.info("⏰ Max duration")
+                    self.tts.play_cached(MAX_DURATION_MESSAGE)
+                else:
+                    logger.info(f"⏳ {SILENCE_TIMEOUT}s silence")
+                    if not self._hangup_event.is_set():
+                        self.tts.play_cached(SILENCE_MESSAGE)
                 break
             
-            user_text = self.listener.get_text()
+            if event.type != EventType.TRANSCRIPT:
+                continue
             
-            if user_text:
-                self.last_speech_time = time.time()
-                
-                logger.info("=" * 50)
-                logger.info(f"👤 USER: \"{user_text}\"")
-                logger.info("=" * 50)
-                
-                if self._is_end_signal(user_text):
-                    self.listener.pause()  # Pause instead of stop to avoid context error
-                    self.tts.speak("Theek hai, dhanyavaad! Bye!")
-                    break
-                
-                if self._hangup_event.is_set():
-                    break
-                
-                logger.info("🤔 AI...")
-                
-                # STOP listener completely before AI speaks
-                self.listener.stop_continuous()
-                time.sleep(0.2)
-                
-                # Get full response
-                full_response = self.llm.generate_response(user_text)
-                
-                logger.info("-" * 50)
-                logger.info(f"🤖 AI: \"{full_response}\"")
-                logger.info("-" * 50)
-                
-                # Split by sentence and speak each separately (prevents skipping)
-                if not self._hangup_event.is_set():
-                    import re
-                    sentences = re.split(r'[.!?।]\s*', full_response)
-                    for sentence in sentences:
-                        if sentence.strip() and not self._hangup_event.is_set():
-                            self.tts.speak(sentence.strip())
-                            time.sleep(0.1)  # Minimal gap
-                    time.sleep(0.2)
-                
-                # Check if response indicates irrelevant question
-                if "maaf" in full_response.lower() or "pata nahi" in full_response.lower():
-                    irrelevant_count += 1
-                    logger.info(f"⚠️ Irrelevant question #{irrelevant_count}/{MAX_IRRELEVANT}")
-                    
-                    if irrelevant_count >= MAX_IRRELEVANT:
-                        logger.info("❌ Too many irrelevant questions - ending call")
-                        if not self._hangup_event.is_set():
-                            self.listener.pause()
-                            # Already spoken via streaming
-                            time.sleep(0.5)
-                            self.tts.speak("Theek hai, aapka dhanyavaad. Agar course me interest ho to call kijiye. Bye!")
-                        break
+            user_text = event.data
+            self.last_speech_time = time.time()
+            
+            logger.info("=" * 50)
+            logger.info(f"👤 USER: \"{user_text}\"")
+            logger.info("=" * 50)
+            
+            if self._is_end_signal(user_text):
+                if self.speculator:
+                    self.speculator.cancel_all()
+                self.listener.pause()  # Pause instead of stop to avoid context error
+                self.tts.play_cached(GOODBYE_MESSAGE)
+                break
+            
+            if self._hangup_event.is_set():
+                break
+            
+            logger.info("🤔 AI...")
+            
+            # STOP listener before AI speaks (don't wait for the mic thread to wind down) -
+            # with echo cancellation it keeps listening: the caller talking over the AI isn't lost
+            if not self.echo:
+                self.listener.stop_continuous(wait=False)
+            
+            # Get full response - reuse speculative draft if it matches
+            # (same turn budget - a matched draft still streaming gets the filler / hard deadline too)
+            draft = None
+            if self.speculator:
+                draft = lambda timeout: self.speculator.resolve(user_text, timeout=timeout)
+            fillers = []
+            full_response = self.deadline.respond(
+                user_text,
+                on_soft_deadline=lambda: fillers.append(self._play_filler()),
+                draft=draft
+            )
+            for filler in fillers:
+                filler.join()  # Don't talk over the filler
+            first_token_at = self.deadline.last_first_token_at  # None = speculative hit, streamed before the transcript
+            if first_token_at:
+                self.tracer.interval("transcript_to_first_token", event.time, first_token_at, cat="llm")
+            
+            logger.info("-" * 50)
+            logger.info(f"🤖 AI: \"{full_response}\"")
+            logger.info("-" * 50)
+            
+            # Split by sentence and speak each separately (prevents skipping)
+            if not self._hangup_event.is_set():
+                import re
+                sentences = re.split(r'[.!?।]\s*', full_response)
+                speak_start = self.tracer.now()
+                for sentence in sentences:
+                    if sentence.strip() and not self._hangup_event.is_set():
+                        self.tts.speak(sentence.strip())
+                        if speak_start:
+                            self._trace_reply_audio(event.time, first_token_at, speak_start)
+                            speak_start = None  # First sentence only
+            
+            # Check if response indicates irrelevant question
+            if "maaf" in full_response.lower() or "pata nahi" in full_response.lower():
+                irrelevant_count += 1
+                logger.info(f"⚠️ Irrelevant question #{irrelevant_count}/{MAX_IRRELEVANT}")
                 
-                if not self._hangup_event.is_set():
-                    # Restart listener
-                    self.listener.start_continuous()
-                    self.listener.clear_queue()
-                    self.last_speech_time = time.time()
-                else:
-                    break
-            else:
-                if time.time() - self.last_speech_time >= SILENCE_TIMEOUT:
-                    logger.info(f"⏳ {SILENCE_TIMEOUT}s silence")
+                if irrelevant_count >= MAX_IRRELEVANT:
+                    logger.info("❌ Too many irrelevant questions - ending call")
                     if not self._hangup_event.is_set():
-                        self.tts.speak(SILENCE_MESSAGE)
+                        self.listener.pause()
+                        self.tts.play_cached(IRRELEVANT_GOODBYE_MESSAGE)
                     break
             
-            time.sleep(0.15)
+            if self._hangup_event.is_set():
+                break
+            
+            # Restart listener
+            self._start_listening()
+            self.last_speech_time = time.time()
         
-        self.listener.stop_continuous()
+        self.listener.stop_continuous(wait=False)
+        if self.speculator:
+            self.speculator.cancel_all()
+        if self.echo:
+            stats = self.echo.stats()
+            logger.info(f"🔁 Echo: ERLE {stats['erle_db']} dB | delay {stats['delay_ms']} ms | "
+                        f"{stats['cpu_ms_per_audio_s']} ms CPU per audio second")
+    
+    def _trace_audio_start(self, name, start, **attrs):
+        """Span from `start` to when the TTS player last started (first audio sample)"""
+        played = getattr(self.tts, "last_playback_at", None)
+        if played and played >= start:
+            self.tracer.interval(name, start, played, **attrs)
+    
+    def _trace_pickup_audio(self, **attrs):
+        """pickup_to_audio span; the session's first call is also reported on its own"""
+        self._trace_audio_start("pickup_to_audio", self.pickup_at, **attrs)
+        played = getattr(self.tts, "last_playback_at", None)
+        if self.first_call_audio is None and played and played >= self.pickup_at:
+            self.first_call_audio = played - self.pickup_at
+            FIRST_CALL_AUDIO.set(self.first_call_audio)
+            logger.info(f"🥇 First call: pickup -> audio {self.first_call_audio * 1000:.0f}ms")
+    
+    def _trace_reply_audio(self, transcript_at, first_token_at, speak_start):
+        """Spans for the first spoken sentence of a reply"""
+        first_byte = getattr(self.tts, "last_first_byte_at", None)
+        if first_byte and first_byte >= speak_start:
+            if first_token_at:
+                self.tracer.interval("first_token_to_tts_byte", first_token_at, first_byte, cat="tts")
+            self._trace_audio_start("tts_byte_to_audio", first_byte)
+        self._trace_audio_start("transcript_to_audio", transcript_at)
+        played = getattr(self.tts, "last_playback_at", None)
+        if played and played >= transcript_at:
+            self.stats.record_response(played - transcript_at)
+    
+    def _start_listening(self):
+        """(Re)start the listener and drop transcripts heard while the AI was talking"""
+        if self.echo and self.listener.is_listening:
+            return  # Never stopped - what was heard meanwhile is the caller, not the AI
+        self.listener.start_continuous()
+        self.listener.clear_queue()
+        self.events.discard(EventType.TRANSCRIPT)
+    
+    def _play_filler(self):
+        """Play a cached filler phrase in background (LLM is slow this turn)"""
+        import random
+        filler = threading.Thread(
+            target=self.tts.play_cached,
+            args=(random.choice(FILLER_PHRASES),),
+            daemon=True
+        )
+        filler.start()
+        return filler
     
     def _is_end_signal(self, text):
         end_words = ["bye", "nahi", "no", "bas", "cut", "band", "rakhiye", "busy"]
@@ -905,26 +1498,93 @@ class CallingAgent:
             return
         
         self.in_call = False
+        IN_CALL.set(0)
+        CALLS.labels("handled").inc()
+        CALL_DURATION.observe(time.time() - self.call_start_time)
         duration = int(time.time() - self.call_start_time)
+        recording = self._finish_recording()
         
         logger.info(f"📊 Duration: {duration}s")
         
-        if self.ai_mode and self.llm and self.llm.conversation_history:
-            logger.info("🔍 Analyzing...")
-            analysis = self.llm.analyze_conversation()
+        if self.pickup_verdict:
+            analysis = {"interest": self.pickup_verdict, "result": "HUNG_UP",
+                        "summary": "Screened at pickup - opening not played"}
+            self.excel.save_result(self.current_number, duration, analysis, "", recording=recording)
+            self.stats.record_result(analysis["interest"], analysis["result"])
+        elif self.llm and self.llm.conversation_history:
+            # Save now, analysis result is filled in later by the worker
+            analysis = {"interest": "PENDING", "result": "PENDING", "summary": "Analyzing..."}
             conversation = self.llm.get_conversation_text()
-            logger.info(f"   Result: {analysis['result']}")
-            self.excel.save_result(self.current_number, duration, analysis, conversation)
+            
+            call_usage = self.llm.call_usage.as_dict()
+            campaign_usage = self.llm.campaign_usage.as_dict()
+            logger.info(
+                f"📈 Call usage: {call_usage['prompt_tokens']} in "
+                f"({call_usage['cached_tokens']} cached) / {call_usage['completion_tokens']} out | "
+                f"TTFT {call_usage['avg_ttft_ms']:.0f}ms | Latency {call_usage['avg_latency_ms']:.0f}ms"
+            )
+            logger.info(
+                f"📈 Campaign usage: {campaign_usage['requests']} requests | "
+                f"{campaign_usage['prompt_tokens']} in / {campaign_usage['completion_tokens']} out | "
+                f"Cache hit {campaign_usage['cache_hit_pct']}%"
+            )
+            
+            turns = self.deadline.as_dict()
+            logger.info(
+                f"⏱️ Turn latency p50/p95/p99: {turns['p50_ms']:.0f}/{turns['p95_ms']:.0f}/"
+                f"{turns['p99_ms']:.0f}ms | Fillers: {turns['fillers']} | Hedges: {turns['hedges']} | "
+                f"Fallbacks: {turns['fallbacks']}"
+            )
+            
+            if self.speculator:
+                spec = self.speculator.stats.as_dict()
+                logger.info(
+                    f"🔮 Speculation: {spec['hits']}/{spec['hits'] + spec['misses']} hits "
+                    f"({spec['hit_rate_pct']}%) | Wasted tokens: {spec['wasted_tokens']}"
+                )
+            
+            for endpoint, limits in self.llm.scheduler.stats().items():
+                logger.info(
+                    f"🚦 {endpoint}: {limits['granted']} sent | 429s: {limits['throttled']} | "
+                    f"Queue: {limits['queue_depth']} | Avg wait (ms): {limits['avg_wait_ms']}"
+                )
+            
+            row = self.excel.save_result(self.current_number, duration, analysis, conversation, call_usage,
+                                         recording=recording)
+            self.excel.save_campaign_usage(campaign_usage)
+            self.stats.record_result(analysis["interest"], analysis["result"])
+            
+            if row:
+                logger.info("🔍 Queued for analysis")
+                self.analysis_worker.submit(row, self.llm.conversation_history)
+        elif self.keypress:
+            interested = self.keypress in DTMF_INTERESTED_DIGITS
+            analysis = {"interest": "INTERESTED" if interested else "AUDIO_ONLY", "result": f"KEY_{self.keypress}",
+                        "summary": f"Pressed {self.keypress} during the opening"}
+            self.excel.save_result(self.current_number, duration, analysis, "", recording=recording)
+            self.stats.record_result(analysis["interest"], analysis["result"])
         else:
-            self.excel.save_result(self.current_number, duration, {
+            analysis = {
                 "interest": "AUDIO_ONLY" if not self.ai_mode else "NO_CONVERSATION",
                 "result": "PLAYED" if not self.ai_mode else "NO_RESPONSE",
                 "summary": "Audio played" if not self.ai_mode else "No conversation"
-            }, "")
+            }
+            self.excel.save_result(self.current_number, duration, analysis, "", recording=recording)
+            self.stats.record_result(analysis["interest"], analysis["result"])
+        
+        # Which source saw transitions first (only interesting with 2+ sources)
+        for device, sources in self.bus.source_stats().items():
+            if len(sources) > 1:
+                for source, s in sources.items():
+                    logger.info(
+                        f"📡 {device}/{source}: first {s['first']} | confirmed {s['confirmed']} | "
+                        f"lag p50/p95 {s['lag_p50_ms']:.0f}/{s['lag_p95_ms']:.0f}ms"
+                    )
         
         # End call and trigger next (for both AI and Audio-only modes)
         logger.info("📴 Ending call and triggering next...")
         self.usb_detector.hang_up_call()
+        self.tracer.set_call("")
         
         logger.info("=" * 50)
         logger.info("👂 Ready for next call...")
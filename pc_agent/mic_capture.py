@@ -0,0 +1,43 @@
+"""
+Mic Capture - sr.AudioSource se raw samples (numpy int16 chunks)
+
+SpeechListener phrases record karta hai; yahan woh log hain jinhe har chunk
+chahiye (pickup screening waghera). Same mic object share hota hai, isliye
+ek time pe ek hi reader - sr.Microphone ka `with` nest nahi hota.
+
+    for samples in read_chunks(mic, stop=hangup_event, max_seconds=3):
+        ...
+"""
+import numpy as np
+from config import logger, ECHO_CANCEL_ENABLED, ECHO_SAMPLE_RATE
+
+
+def default_microphone():
+    """System mic (speech_recognition import is lazy - audio-only mode doesn't load it otherwise)"""
+    try:
+        import speech_recognition as sr
+        microphone = sr.Microphone(sample_rate=ECHO_SAMPLE_RATE if ECHO_CANCEL_ENABLED else None)
+        logger.info("🎤 Microphone ready")
+        return microphone
+    except Exception as e:
+        logger.error(f"Microphone error: {e}")
+        return None
+
+
+def read_chunks(source, stop=None, max_seconds=None):
+    """
+    Yields one int16 numpy array per source.CHUNK read, until stop is set,
+    max_seconds of audio has been read or the caller stops iterating.
+    """
+    with source as s:
+        if s.SAMPLE_WIDTH != 2:
+            raise ValueError(f"16-bit audio expected, source gives {s.SAMPLE_WIDTH * 8}-bit")
+        limit = int(max_seconds * s.SAMPLE_RATE) if max_seconds else None
+        read = 0
+        while not (stop is not None and stop.is_set()) and (limit is None or read < limit):
+            data = s.stream.read(s.CHUNK)
+            if not data:
+                return
+            samples = np.frombuffer(data, dtype="<i2")
+            read += samples.size
+            yield samples
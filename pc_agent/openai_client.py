@@ -0,0 +1,96 @@
+"""
+OpenAI Client - One shared client for all OpenAI traffic (Whisper + Chat)
+
+Ek hi keep-alive connection pool poore process me use hota hai, with explicit
+connect/read timeouts. prewarm() RINGING pe call hota hai taaki caller ke
+answer karne tak TLS connection already open ho.
+"""
+import threading
+import time
+import httpx
+from openai import OpenAI
+from config import (
+    logger, OPENAI_API_KEY, OPENAI_BASE_URL,
+    OPENAI_CONNECT_TIMEOUT, OPENAI_READ_TIMEOUT,
+    OPENAI_POOL_SIZE, OPENAI_KEEPALIVE_EXPIRY, OPENAI_MAX_RETRIES
+)
+
+_client = None
+_client_lock = threading.Lock()
+_prewarm_lock = threading.Lock()
+
+
+def build_client(api_key=None, base_url=None, verify=True):
+    """Create an OpenAI client with a tuned keep-alive pool"""
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(
+            connect=OPENAI_CONNECT_TIMEOUT,
+            read=OPENAI_READ_TIMEOUT,
+            write=OPENAI_READ_TIMEOUT,
+            pool=OPENAI_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=OPENAI_POOL_SIZE,
+            max_keepalive_connections=OPENAI_POOL_SIZE,
+            keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+        ),
+        verify=verify
+    )
+    return OpenAI(
+        api_key=api_key or OPENAI_API_KEY,
+        base_url=base_url or OPENAI_BASE_URL,
+        http_client=http_client,
+        max_retries=OPENAI_MAX_RETRIES
+    )
+
+
+def get_openai_client():
+    """Process-wide shared client (created on first use)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if not OPENAI_API_KEY:
+                raise ValueError("OpenAI API key required")
+            _client = build_client()
+            logger.info(f"🔌 OpenAI client ready | Pool: {OPENAI_POOL_SIZE} | "
+                        f"Timeouts: connect {OPENAI_CONNECT_TIMEOUT}s / read {OPENAI_READ_TIMEOUT}s")
+        return _client
+
+
+def warm_connection(client):
+    """
+    Open (or refresh) a pooled connection to the API host with a cheap
+    GET /models, so TCP + TLS is done before the first real request.
+    Returns time taken in seconds, or None on failure.
+    """
+    start = time.perf_counter()
+    try:
+        client.with_options(max_retries=0).models.list()
+        return time.perf_counter() - start
+    except Exception as e:
+        logger.debug(f"Pre-warm failed: {e}")
+        return None
+
+
+def prewarm(blocking=False):
+    """
+    Warm the shared client's connection (RINGING hook).
+    Non-blocking by default; overlapping calls are skipped.
+    """
+    if not OPENAI_API_KEY:
+        return
+
+    def run():
+        if not _prewarm_lock.acquire(blocking=False):
+            return  # Already warming
+        try:
+            took = warm_connection(get_openai_client())
+            if took is not None:
+                logger.debug(f"🔥 OpenAI connection warm ({took * 1000:.0f}ms)")
+        finally:
+            _prewarm_lock.release()
+
+    if blocking:
+        run()
+    else:
+        threading.Thread(target=run, daemon=True).start()
@@ -0,0 +1,165 @@
+"""
+Pickup Classifier - call uthi to saamne insaan hai ya machine?
+
+ADB "ACTIVE" voicemail, operator announcement (SIT tones ke saath ya bina)
+aur network ki ringback ke liye bhi aata hai. Opening bajne se pehle mic ke
+pehle kuch second yahan se guzarte hain (streaming, 40 ms frames):
+
+  - Tone: frame ki band energy ka bada hissa ek peak ke paas (tonality)
+      350-500 Hz           -> ringback (400 / 425 / 440+480 Hz)
+      SIT bands            -> 913.8 / 985.2, 1370.6 / 1428.5, 1776.7 Hz
+      kuch aur             -> beep / IVR tone (machine)
+  - Voice: energy threshold se upar, tonal nahi
+  - Greeting: voice + chhote gaps, pehle AMD_HUMAN_PAUSE silence tak
+      chhota greeting + pause     -> HUMAN ("Hello?" aur hamara wait)
+      AMD_MACHINE_SPEECH se lamba -> MACHINE (voicemail / announcement)
+      kuch bhi nahi suna          -> HUMAN (chup-chaap uthaya)
+
+Sirf numpy - har chunk ek vectorized FFT. Accuracy / latency:
+python benchmarks/bench_pickup.py
+"""
+import numpy as np
+from config import (
+    AMD_MAX_SECONDS, AMD_HUMAN_SILENCE, AMD_HUMAN_PAUSE, AMD_MACHINE_SPEECH,
+    AMD_TONE_SECONDS, AMD_ENERGY_THRESHOLD
+)
+
+# Verdicts
+HUMAN = "HUMAN"
+MACHINE = "MACHINE"
+RINGBACK = "RINGBACK"
+SIT = "SIT"
+UNKNOWN = "UNKNOWN"  # AMD_MAX_SECONDS without a verdict - treated like a person
+
+NOT_A_PERSON = (MACHINE, RINGBACK, SIT)
+
+FRAME_SECONDS = 0.04
+MIN_GREETING = 0.12     # Shorter voice bursts are clicks / line noise
+TONALITY = 0.6          # Share of 100-3400 Hz energy within PEAK_WIDTH of the peak
+PEAK_WIDTH = 60         # Hz either side (Hann main lobe at 40 ms is +-50 Hz)
+TONE_GATE = 0.25        # Tones count from this fraction of the voice threshold
+
+RINGBACK_BAND = (350, 500)
+SIT_BANDS = ((880, 1010), (1340, 1460), (1740, 1810))
+
+# Frame labels
+_SILENCE, _VOICE, _RINGBACK, _SIT, _OTHER_TONE = range(5)
+
+
+class PickupClassifier:
+    def __init__(self, sample_rate, energy_threshold=AMD_ENERGY_THRESHOLD, max_seconds=AMD_MAX_SECONDS,
+                 human_silence=AMD_HUMAN_SILENCE, human_pause=AMD_HUMAN_PAUSE,
+                 machine_speech=AMD_MACHINE_SPEECH, tone_seconds=AMD_TONE_SECONDS):
+        """
+        sample_rate: of the int16 samples passed to feed()
+        energy_threshold: voice RMS (int16 units - same scale as sr's energy_threshold)
+        """
+        self.sample_rate = sample_rate
+        self.energy_threshold = energy_threshold
+        self.max_seconds = max_seconds
+        self.human_silence = human_silence
+        self.human_pause = human_pause
+        self.machine_speech = machine_speech
+        self.tone_seconds = tone_seconds
+
+        self.frame = int(sample_rate * FRAME_SECONDS)
+        self.nfft = 1 << (4 * self.frame - 1).bit_length()  # Zero-padded: ~4 Hz peak steps at 16 kHz
+        self._window = np.hanning(self.frame).astype(np.float32)
+        self._freqs = np.fft.rfftfreq(self.nfft, 1.0 / sample_rate)
+        self._band = np.searchsorted(self._freqs, (100, 3400))
+        self._peak_band = np.searchsorted(self._freqs, (300, 2000))
+        self._peak_width = max(1, int(round(PEAK_WIDTH * self.nfft / sample_rate)))
+        self._pending = np.empty(0, dtype=np.float32)
+
+        self.verdict = None
+        self.elapsed = 0.0          # Seconds of audio classified
+        self.voice_seconds = 0.0
+        self.tone_seconds_heard = {_RINGBACK: 0.0, _SIT: 0.0, _OTHER_TONE: 0.0}
+        self._sit_bands = set()
+        self._greeting = 0.0        # Current greeting span (voice + short gaps)
+        self._silence = 0.0         # Current silence run
+
+    def summary(self):
+        return {
+            "verdict": self.verdict,
+            "seconds": round(self.elapsed, 2),
+            "voice_s": round(self.voice_seconds, 2),
+            "tone_s": round(sum(self.tone_seconds_heard.values()), 2),
+        }
+
+    def feed(self, samples):
+        """int16 samples, any length. Returns the verdict once decided (then ignores more audio), else None"""
+        if self.verdict:
+            return self.verdict
+        audio = np.concatenate((self._pending, np.asarray(samples, dtype=np.float32)))
+        count = audio.size // self.frame
+        self._pending = audio[count * self.frame:]
+        if not count:
+            return None
+        labels, bands = self._label(audio[:count * self.frame].reshape(count, self.frame))
+        for label, band in zip(labels.tolist(), bands.tolist()):
+            self._step(label, band)
+            if self.verdict:
+                break
+        return self.verdict
+
+    def _label(self, frames):
+        """Per frame: (label, SIT band index or -1) - one FFT for the whole batch"""
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        power = np.abs(np.fft.rfft(frames * self._window, n=self.nfft, axis=1)) ** 2
+        cumulative = np.cumsum(power, axis=1)
+        lo, hi = self._band
+        total = cumulative[:, hi] - cumulative[:, lo] + 1e-9
+
+        plo, phi = self._peak_band
+        peak = plo + np.argmax(power[:, plo:phi], axis=1)
+        rows = np.arange(frames.shape[0])
+        w = self._peak_width
+        around = cumulative[rows, peak + w] - cumulative[rows, peak - w - 1]
+        freq = self._freqs[peak]
+
+        labels = np.full(frames.shape[0], _SILENCE, dtype=np.int8)
+        labels[rms >= self.energy_threshold] = _VOICE
+        tonal = (rms >= self.energy_threshold * TONE_GATE) & (around / total >= TONALITY)
+        labels[tonal] = _OTHER_TONE
+        labels[tonal & (freq >= RINGBACK_BAND[0]) & (freq < RINGBACK_BAND[1])] = _RINGBACK
+        bands = np.full(frames.shape[0], -1, dtype=np.int8)
+        for index, (band_lo, band_hi) in enumerate(SIT_BANDS):
+            in_band = tonal & (freq >= band_lo) & (freq < band_hi)
+            labels[in_band] = _SIT
+            bands[in_band] = index
+        return labels, bands
+
+    def _step(self, label, band):
+        self.elapsed += FRAME_SECONDS
+        if label == _VOICE:
+            if self._greeting:
+                self._greeting += self._silence  # Gap inside the greeting
+            self._greeting += FRAME_SECONDS
+            self._silence = 0.0
+            self.voice_seconds += FRAME_SECONDS
+            if self._greeting >= self.machine_speech:
+                return self._decide(MACHINE)
+        elif label == _SILENCE:
+            self._silence += FRAME_SECONDS
+            if self._greeting and self._silence >= self.human_pause:
+                if self._greeting >= MIN_GREETING:
+                    return self._decide(HUMAN)
+                self._greeting = 0.0  # Click, not a greeting
+            heard = self.voice_seconds >= MIN_GREETING or any(self.tone_seconds_heard.values())
+            if not heard and self.elapsed >= self.human_silence:
+                return self._decide(HUMAN)
+        else:
+            self.tone_seconds_heard[label] += FRAME_SECONDS
+            self._greeting = self._silence = 0.0
+            if label == _SIT:
+                self._sit_bands.add(band)
+                if len(self._sit_bands) >= 2 or self.tone_seconds_heard[_SIT] >= self.tone_seconds:
+                    return self._decide(SIT)
+            elif self.tone_seconds_heard[label] >= self.tone_seconds:
+                return self._decide(RINGBACK if label == _RINGBACK else MACHINE)
+        if self.elapsed >= self.max_seconds:
+            self._decide(UNKNOWN)
+
+    def _decide(self, verdict):
+        self.verdict = verdict
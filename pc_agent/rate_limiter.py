@@ -0,0 +1,267 @@
+"""
+Request Scheduler - rate-limit aware gate for all OpenAI requests
+
+Har endpoint (chat, transcription) ke liye token buckets (requests/min aur
+tokens/min). Requests priority lanes me wait karti hain - live turn pehle,
+speculative drafts uske baad, post-call analysis sabse last. 429 aane pe
+Retry-After / x-ratelimit-* headers padh ke poora endpoint utni der pause
+hota hai aur request retry hoti hai.
+"""
+import heapq
+import itertools
+import re
+import threading
+import time
+import openai
+import metrics
+from config import (
+    logger, CHAT_RPM, CHAT_TPM, TRANSCRIPTION_RPM, RATE_LIMIT_MAX_ATTEMPTS
+)
+
+# Priority lanes (lower = served first)
+LIVE = 0
+SPECULATIVE = 1
+BACKGROUND = 2
+
+LANE_NAMES = {LIVE: "live", SPECULATIVE: "speculative", BACKGROUND: "background"}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+QUEUE_DEPTH = metrics.gauge("agent_openai_queue_depth", "Requests waiting for the scheduler", ["endpoint"])
+QUEUE_WAIT = metrics.histogram("agent_openai_queue_wait_seconds", "Time spent waiting for the scheduler", ["endpoint", "lane"])
+THROTTLED = metrics.counter("agent_openai_throttled_total", "429 responses received", ["endpoint"])
+
+
+def parse_duration(value):
+    """'1s', '6m0s', '20ms', '0.5s' -> seconds (None if unparseable)"""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(str(value))
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(num) * _UNITS[unit] for num, unit in parts)
+
+
+def retry_after_seconds(headers):
+    """Delay requested by the server in a 429 / rate limit headers"""
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    resets = [parse_duration(headers.get(h)) for h in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+class TokenBucket:
+    """
+    Refills at per_minute/60 per second; holds at most one second's worth so a
+    full minute's quota is never fired as a single burst. After a 429 the rate
+    is halved and then creeps back up with every granted request (AIMD).
+    """
+
+    def __init__(self, per_minute):
+        self.base_rate = per_minute / 60.0
+        self.rate = self.base_rate
+        self.capacity = max(1.0, self.base_rate)
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` can be taken (0 = now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount):
+        self.available -= min(amount, self.capacity)
+        self.rate = min(self.base_rate, self.rate * 1.05)
+
+    def throttle(self):
+        self.available = 0.0
+        self.rate = max(self.base_rate / 10, self.rate / 2)
+
+
+class _Endpoint:
+    def __init__(self, name, rpm, tpm):
+        self.name = name
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.blocked_until = 0.0
+        self.waiters = []  # heap of (priority, seq)
+
+        # Metrics
+        self.granted = 0
+        self.throttled = 0          # 429s received
+        self.wait_total = {}        # lane -> seconds
+        self.wait_count = {}        # lane -> requests
+        self.wait_max = {}          # lane -> seconds
+        QUEUE_DEPTH.labels(name).set_function(lambda: len(self.waiters))
+
+    def wait_time(self, tokens, now):
+        waits = [self.blocked_until - now]
+        if self.requests:
+            waits.append(self.requests.wait_time(1, now))
+        if self.tokens and tokens:
+            waits.append(self.tokens.wait_time(tokens, now))
+        return max(0.0, *waits)
+
+    def take(self, tokens):
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens and tokens:
+            self.tokens.take(tokens)
+
+    def record_wait(self, priority, waited):
+        lane = LANE_NAMES.get(priority, str(priority))
+        self.granted += 1
+        self.wait_total[lane] = self.wait_total.get(lane, 0.0) + waited
+        self.wait_count[lane] = self.wait_count.get(lane, 0) + 1
+        self.wait_max[lane] = max(self.wait_max.get(lane, 0.0), waited)
+        QUEUE_WAIT.labels(self.name, lane).observe(waited)
+
+
+class RequestScheduler:
+    def __init__(self, limits=None, max_attempts=RATE_LIMIT_MAX_ATTEMPTS):
+        """limits: {endpoint: (requests_per_min, tokens_per_min or None)}"""
+        if limits is None:
+            limits = {
+                "chat": (CHAT_RPM, CHAT_TPM),
+                "transcription": (TRANSCRIPTION_RPM, None),
+            }
+        self.max_attempts = max_attempts
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._endpoints = {name: _Endpoint(name, rpm, tpm) for name, (rpm, tpm) in limits.items()}
+
+    def _endpoint(self, name):
+        if name not in self._endpoints:
+            self._endpoints[name] = _Endpoint(name, None, None)
+        return self._endpoints[name]
+
+    def acquire(self, endpoint, priority=LIVE, tokens=0):
+        """Block until this request may be sent (highest priority waiter goes first)"""
+        start = time.monotonic()
+        with self._cond:
+            ep = self._endpoint(endpoint)
+            entry = (priority, next(self._seq))
+            heapq.heappush(ep.waiters, entry)
+            try:
+                while True:
+                    if ep.waiters[0] == entry:
+                        wait = ep.wait_time(tokens, time.monotonic())
+                        if wait <= 0:
+                            ep.take(tokens)
+                            break
+                    else:
+                        wait = 1.0  # Not our turn - woken by notify_all
+                    self._cond.wait(timeout=wait)
+            finally:
+                ep.waiters.remove(entry)
+                heapq.heapify(ep.waiters)
+                self._cond.notify_all()
+            ep.record_wait(priority, time.monotonic() - start)
+
+    def penalize(self, endpoint, delay, throttle=False):
+        """
+        Pause an endpoint for `delay` seconds (server said slow down).
+        throttle=True (a real 429) also slows the buckets so the queue
+        drains gradually after the pause instead of all at once.
+        """
+        with self._cond:
+            ep = self._endpoint(endpoint)
+            now = time.monotonic()
+            if throttle:
+                ep.throttled += 1
+                THROTTLED.labels(endpoint).inc()
+                # 429s from one burst arrive together - slow down once per pause
+                if ep.blocked_until <= now:
+                    for bucket in (ep.requests, ep.tokens):
+                        if bucket:
+                            bucket.throttle()
+            ep.blocked_until = max(ep.blocked_until, now + delay)
+            self._cond.notify_all()
+
+    def observe_headers(self, endpoint, headers):
+        """Sync with x-ratelimit-* headers of a successful response"""
+        if not headers:
+            return
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None and remaining.strip() == "0":
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self.penalize(endpoint, reset)
+
+    def call(self, endpoint, fn, priority=LIVE, tokens=0):
+        """
+        Run fn() once the scheduler allows it. On 429 the endpoint is paused for
+        the server's Retry-After and fn is retried (up to max_attempts).
+        """
+        last_error = None
+        for attempt in range(self.max_attempts):
+            self.acquire(endpoint, priority, tokens)
+            try:
+                return fn()
+            except openai.RateLimitError as e:
+                last_error = e
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                delay = retry_after_seconds(headers) or min(2 ** attempt, 20)
+                logger.warning(f"🚦 429 on {endpoint} ({LANE_NAMES.get(priority, priority)}) - "
+                               f"pausing {delay:.2f}s (attempt {attempt + 1}/{self.max_attempts})")
+                self.penalize(endpoint, delay, throttle=True)
+            except (openai.APIConnectionError, openai.InternalServerError) as e:
+                last_error = e
+                delay = min(0.5 * 2 ** attempt, 4)
+                logger.warning(f"🚦 {endpoint} error: {e} - retry in {delay:.1f}s")
+                time.sleep(delay)
+        raise last_error
+
+    def stats(self):
+        """Queue depth and wait times per endpoint/lane"""
+        with self._cond:
+            result = {}
+            for name, ep in self._endpoints.items():
+                result[name] = {
+                    "queue_depth": len(ep.waiters),
+                    "granted": ep.granted,
+                    "throttled": ep.throttled,
+                    "paused_for_s": round(max(0.0, ep.blocked_until - time.monotonic()), 2),
+                    "avg_wait_ms": {
+                        lane: round(ep.wait_total[lane] * 1000 / ep.wait_count[lane], 1)
+                        for lane in ep.wait_count
+                    },
+                    "max_wait_ms": {lane: round(v * 1000, 1) for lane, v in ep.wait_max.items()},
+                }
+            return result
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide scheduler shared by Whisper, chat and analysis"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
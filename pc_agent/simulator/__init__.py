@@ -0,0 +1,6 @@
+"""
+Simulator - Local stand-ins for everything outside the PC
+(OpenAI endpoints, phone, mic, speakers) so the agent can be measured offline.
+
+End-to-end run: python -m simulator.run --calls 10 --output report.json
+"""
@@ -0,0 +1,353 @@
+"""
+Simulator Audio - WAV-driven microphone, fake TTS backend and null speaker
+
+WavMicrophone ek speech_recognition AudioSource hai: caller jo WAV "bolta"
+hai wo real-time pace se stream hota hai, beech me halka noise (jaise line
+hiss) - isliye recognizer ka energy VAD / pause_threshold asli jaisa chalta
+hai. FakeTTSBackend Edge TTS ki jagah bytes stream karta hai (first byte
+delay ke saath), NullAudioSink ffplay ki jagah utni der "bajta" hai jitni
+file ki duration hai. `speed` > 1 audio time ko compress karta hai
+(network / LLM latency pe asar nahi). AcousticLeak lagao to jo sink
+"bajata" hai (synthetic awaaz) wo delay + reflections ke saath mic me bhi
+sunai deta hai - echo cancellation ke liye.
+"""
+import os
+import subprocess
+import threading
+import time
+import wave
+import zlib
+
+import numpy as np
+import speech_recognition as sr
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+FAKE_AUDIO_BYTES_PER_SEC = 6000  # ~48 kbps, Edge TTS mp3 jaisa
+
+
+def speech_samples(seconds, sample_rate=SAMPLE_RATE, seed=0, level=6000):
+    """Synthetic voiced speech: 120 Hz harmonics with a ~4 syllables/s envelope (float, no noise)"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    f0 = 120 + 15 * np.sin(2 * np.pi * 0.7 * t + rng.uniform(0, np.pi))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.abs(np.sin(2 * np.pi * 4 * t)) ** 0.5
+    envelope *= np.minimum(1.0, np.minimum(t, seconds - t) / 0.05)  # No clicks
+    return level * voice / 2 * envelope
+
+
+def tone_samples(freqs, seconds, sample_rate=SAMPLE_RATE, level=3000):
+    """Sum of sine tones (e.g. (440, 480) ringback); () = silence"""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = np.zeros(t.size)
+    for freq in freqs:
+        samples += level / len(freqs) * np.sin(2 * np.pi * freq * t)
+    return samples
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(SAMPLE_WIDTH)
+        w.setframerate(sample_rate)
+        w.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+    return path
+
+
+def make_speech_wav(path, seconds, sample_rate=SAMPLE_RATE, seed=0):
+    rng = np.random.default_rng(seed)
+    samples = speech_samples(seconds, sample_rate, seed)
+    return write_wav(path, samples + rng.normal(0, 30, samples.size), sample_rate)
+
+
+def dtmf_samples(digits, tone_seconds=0.1, gap_seconds=0.1, sample_rate=SAMPLE_RATE, level=3000, twist_db=0.0):
+    """Keypad tones for digits (row + column sine); twist_db: column tone louder (+) / quieter (-)"""
+    from dtmf_detector import ROW_FREQS, COL_FREQS, KEYS
+    twist = 10 ** (twist_db / 20)
+    parts = []
+    for digit in digits:
+        row = next(i for i, keys in enumerate(KEYS) if digit in keys)
+        col = KEYS[row].index(digit)
+        t = np.arange(int(tone_seconds * sample_rate)) / sample_rate
+        tone = np.sin(2 * np.pi * ROW_FREQS[row] * t) + twist * np.sin(2 * np.pi * COL_FREQS[col] * t)
+        parts += [level / (1 + twist) * tone, np.zeros(int(gap_seconds * sample_rate))]
+    return np.concatenate(parts) if parts else np.zeros(0)
+
+
+def make_dtmf_wav(path, digits, sample_rate=SAMPLE_RATE, noise=30, seed=0, **kwargs):
+    rng = np.random.default_rng(seed)
+    samples = dtmf_samples(digits, sample_rate=sample_rate, **kwargs)
+    return write_wav(path, samples + rng.normal(0, noise, samples.size), sample_rate)
+
+
+# What the far end sounds like in the first seconds after "pickup"
+# (expected PickupClassifier verdict in the benchmark / simulator scenarios)
+PICKUP_KINDS = {
+    "hello": "HUMAN",             # "Hello?" then waits for us
+    "silent": "HUMAN",            # Picks up, says nothing
+    "voicemail": "MACHINE",       # Long greeting, then the beep
+    "announcement": "MACHINE",    # Operator / IVR message, no tones
+    "ringback_in": "RINGBACK",    # 400 Hz, 0.4 on 0.2 off 0.4 on 2.0 off (still ringing)
+    "ringback_us": "RINGBACK",    # 440+480 Hz, 2 on 4 off
+    "sit": "SIT",                 # 913.8 / 1370.6 / 1776.7 Hz, then the announcement
+}
+
+
+def pickup_samples(kind, sample_rate=SAMPLE_RATE, seed=0, level=1.0, seconds=6.0):
+    """One PICKUP_KINDS fixture as float samples (speech/tones scaled by level, no noise)"""
+    rng = np.random.default_rng(seed)
+    parts = [tone_samples((), rng.uniform(0.1, 0.4), sample_rate)]  # Line connects
+    if kind == "hello":
+        parts.append(speech_samples(rng.uniform(0.4, 0.9), sample_rate, seed))
+    elif kind == "voicemail":
+        parts.append(speech_samples(rng.uniform(3.0, 4.5), sample_rate, seed))
+        parts.append(tone_samples((1000,), 0.4, sample_rate))
+    elif kind == "announcement":
+        parts.append(speech_samples(seconds, sample_rate, seed))
+    elif kind.startswith("ringback"):
+        freqs, cadence = ((400,), [(0.4, True), (0.2, False), (0.4, True), (2.0, False)]) if kind == "ringback_in" \
+            else ((440, 480), [(2.0, True), (4.0, False)])
+        cycle = np.concatenate([tone_samples(freqs if on else (), span, sample_rate) for span, on in cadence])
+        start = int(rng.uniform(0, 0.3) * cycle.size)  # Joined somewhere in the first "on"
+        parts.append(np.tile(cycle, 4)[start:])
+    elif kind == "sit":
+        for freq, span in ((913.8, 0.274), (1370.6, 0.274), (1776.7, 0.380)):
+            parts.append(tone_samples((freq,), span, sample_rate))
+        parts.append(speech_samples(seconds, sample_rate, seed))
+    samples = np.concatenate(parts)[:int(seconds * sample_rate)] * level
+    return np.concatenate([samples, np.zeros(max(0, int(seconds * sample_rate) - samples.size))])
+
+
+def make_pickup_wav(path, kind, sample_rate=SAMPLE_RATE, seed=0, level=1.0, noise=30, seconds=6.0):
+    rng = np.random.default_rng(seed + 1000)
+    samples = pickup_samples(kind, sample_rate, seed, level, seconds)
+    return write_wav(path, samples + rng.normal(0, noise, samples.size), sample_rate)
+
+
+def write_fake_audio(path, seconds, bytes_per_sec=FAKE_AUDIO_BYTES_PER_SEC):
+    """Placeholder "mp3" whose NullAudioSink duration is `seconds` (e.g. opening audio)"""
+    with open(path, "wb") as f:
+        f.write(bytes(int(seconds * bytes_per_sec)))
+    return path
+
+
+class _PacedStream:
+    """stream.read(frames) that blocks like a real sound card"""
+
+    def __init__(self, mic):
+        self.mic = mic
+        self.next_at = time.monotonic()
+
+    def read(self, frames):
+        now = time.monotonic()
+        if now - self.next_at > 1.0:
+            self.next_at = now  # Reader stalled (transcribing) - don't burst to catch up
+        self.next_at += frames / self.mic.SAMPLE_RATE / self.mic.speed
+        delay = self.next_at - now
+        if delay > 0:
+            time.sleep(delay)
+        return self.mic._read(frames, ends_at=self.next_at)
+
+    def close(self):
+        pass
+
+
+class WavMicrophone(sr.AudioSource):
+    def __init__(self, sample_rate=SAMPLE_RATE, chunk_size=1024, noise=30, speed=1.0):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = chunk_size
+        self.speed = speed
+        self.stream = None
+        self._lock = threading.Lock()
+        self._pending = bytearray()
+        # 1s of line noise, looped while nobody speaks
+        rng = np.random.default_rng(1)
+        self._noise = rng.normal(0, noise, sample_rate).astype("<i2").tobytes()
+        self._noise_pos = 0
+        self.leak = None  # AcousticLeak - the agent's own voice, mixed in by read time
+
+    def __enter__(self):
+        # Same rule as sr.Microphone - one reader at a time
+        if self.stream is not None:
+            raise RuntimeError("This audio source is already inside a context manager")
+        self.stream = _PacedStream(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    @property
+    def is_open(self):
+        return self.stream is not None
+
+    @property
+    def speaking(self):
+        with self._lock:
+            return len(self._pending) > 0
+
+    def clear(self):
+        """Drop whatever hasn't been heard yet (call cut mid-announcement)"""
+        with self._lock:
+            self._pending.clear()
+
+    def say(self, wav_path):
+        """Queue a WAV file to be heard; returns its duration (audio seconds)"""
+        with sr.AudioFile(wav_path) as source:
+            audio = sr.Recognizer().record(source)
+        raw = audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=self.SAMPLE_WIDTH)
+        with self._lock:
+            self._pending += raw
+        return len(raw) / (self.SAMPLE_RATE * self.SAMPLE_WIDTH)
+
+    def _read(self, frames, ends_at=None):
+        size = frames * self.SAMPLE_WIDTH
+        with self._lock:
+            data = bytes(self._pending[:size])
+            del self._pending[:size]
+        while len(data) < size:
+            take = min(size - len(data), len(self._noise) - self._noise_pos)
+            data += self._noise[self._noise_pos:self._noise_pos + take]
+            self._noise_pos = (self._noise_pos + take) % len(self._noise)
+        if self.leak is not None and ends_at is not None:
+            echo = self.leak.render(ends_at - frames / self.SAMPLE_RATE, frames)
+            if echo.any():
+                mixed = np.frombuffer(data, dtype="<i2") + echo
+                data = np.clip(mixed, -32768, 32767).astype("<i2").tobytes()
+        return data
+
+
+class FakeTTSBackend:
+    """Stands in for Edge TTS: first-byte delay, then synthesis faster than real time"""
+
+    def __init__(self, first_byte_delay=0.25, seconds_per_char=0.06, realtime_factor=8.0,
+                 bytes_per_sec=FAKE_AUDIO_BYTES_PER_SEC, chunk_seconds=0.25):
+        self.first_byte_delay = first_byte_delay
+        self.seconds_per_char = seconds_per_char  # Spoken length at rate +25%
+        self.realtime_factor = realtime_factor
+        self.bytes_per_sec = bytes_per_sec
+        self.chunk_seconds = chunk_seconds
+
+    def stream(self, text):
+        time.sleep(self.first_byte_delay)
+        remaining = max(0.3, len(text) * self.seconds_per_char)
+        while remaining > 0:
+            seconds = min(self.chunk_seconds, remaining)
+            yield bytes(int(seconds * self.bytes_per_sec))
+            remaining -= seconds
+            if remaining > 0:
+                time.sleep(seconds / self.realtime_factor)
+
+
+class _NullPlayback:
+    """Popen look-alike that "plays" for a fixed time"""
+
+    def __init__(self, sink, duration):
+        self.sink = sink
+        self.duration = duration
+        self.ends_at = time.monotonic() + duration
+        self._stopped = threading.Event()
+        self.returncode = None
+
+    def wait(self, timeout=None):
+        remaining = self.ends_at - time.monotonic()
+        if timeout is not None and remaining > timeout:
+            self._stopped.wait(timeout)
+            if not self._stopped.is_set():
+                raise subprocess.TimeoutExpired("null-sink", timeout)
+        else:
+            self._stopped.wait(max(0, remaining))
+        self.returncode = 0
+        return 0
+
+    def poll(self):
+        if self._stopped.is_set() or time.monotonic() >= self.ends_at:
+            self.returncode = 0
+        return self.returncode
+
+    def terminate(self):
+        self._stopped.set()
+        self.sink._cut(self)
+
+    kill = terminate
+
+
+class AcousticLeak:
+    """Speaker -> mic path: what the sink plays reaches the WavMicrophone after delay, with reflections"""
+
+    def __init__(self, mic, delay=0.12, gain=0.5, tail=0.04, decay=0.008, seed=0):
+        from echo_canceller import EchoReference  # Same timeline mixer the canceller uses
+        rng = np.random.default_rng(seed)
+        t = np.arange(int(tail * mic.SAMPLE_RATE)) / mic.SAMPLE_RATE
+        self.response = gain * rng.normal(0, 0.25, t.size) * np.exp(-t / decay)
+        self.response[0] = gain
+        self.delay = delay
+        self.sample_rate = mic.SAMPLE_RATE
+        self._sound = EchoReference(mic.SAMPLE_RATE)
+        mic.leak = self
+
+    def play(self, samples, started_at):
+        self._sound.play(np.convolve(samples, self.response), started_at + self.delay)
+
+    def stop(self, at):
+        self._sound.stop(at + self.delay)
+
+    def render(self, start, count):
+        return self._sound.render(start, count)
+
+
+class NullAudioSink:
+    """Speaker stand-in: tracks when the agent is audible so the fake caller can take turns"""
+
+    def __init__(self, bytes_per_sec=FAKE_AUDIO_BYTES_PER_SEC, speed=1.0, leak=None):
+        self.bytes_per_sec = bytes_per_sec
+        self.speed = speed
+        self.leak = leak  # AcousticLeak (speed 1 only - leak and mic run on wall time)
+        self._pcm = {}
+        self.play_count = 0
+        self._busy_until = 0.0
+        self._current = None
+        self._lock = threading.Lock()
+
+    def duration(self, path):
+        """Audio seconds of a file (what ffprobe would say)"""
+        try:
+            return os.path.getsize(path) / self.bytes_per_sec
+        except OSError:
+            return 0
+
+    def pcm(self, path, sample_rate=SAMPLE_RATE):
+        """What the file "sounds like": synthetic voice as long as its duration (echo reference / leak)"""
+        seconds = self.duration(path) / self.speed
+        key = (path, seconds, sample_rate)
+        if key not in self._pcm:
+            # The leak renders it when playback starts - the reference decode then finds it ready
+            seed = zlib.crc32(f"{path}|{seconds}".encode())
+            self._pcm = {k: v for k, v in self._pcm.items() if k[0] != path}
+            self._pcm[key] = np.rint(speech_samples(seconds, sample_rate, seed=seed, level=5000)).astype(np.int16)
+        return self._pcm[key]
+
+    def play(self, path):
+        playback = _NullPlayback(self, self.duration(path) / self.speed)
+        if self.leak is not None:
+            self.leak.play(self.pcm(path, self.leak.sample_rate), playback.ends_at - playback.duration)
+        with self._lock:
+            self.play_count += 1
+            self._current = playback
+            self._busy_until = max(self._busy_until, playback.ends_at)
+        return playback
+
+    def _cut(self, playback):
+        with self._lock:
+            if playback is not self._current:
+                return
+            self._busy_until = time.monotonic()
+        if self.leak is not None:
+            self.leak.stop(self._busy_until)
+
+    def idle_for(self):
+        """Seconds since the agent last made a sound (negative while playing)"""
+        with self._lock:
+            return time.monotonic() - self._busy_until
@@ -0,0 +1,109 @@
+"""
+Fake Caller - the person on the other end of a simulated call
+
+Agent ke bolna khatam karne ke baad (speaker idle + listener ready) apni
+agli line WavMicrophone me "bolta" hai. Stand-in Whisper endpoint
+`transcript()` se wahi line lautata hai jo abhi boli gayi. Jawab nahi
+aaya to line dohrata hai (jaise asli insaan "hello?" bolta hai).
+
+Call uthte hi scenario ka "pickup" sunata hai (simulator.audio.PICKUP_KINDS):
+"hello" (default) ya "silent" ke baad baat-cheet; voicemail / ringback /
+sit waghera pe sirf woh audio, jab tak agent call na kaat de.
+"keypress": {"digit": "1", "after": 1.5} - opening shuru hone ke itne second
+baad keypad tone (DTMF).
+"""
+import os
+import threading
+import time
+
+from simulator.audio import make_speech_wav, make_pickup_wav, make_dtmf_wav, PICKUP_KINDS
+
+WORDS_PER_SECOND = 2.5
+
+
+class FakeCaller:
+    def __init__(self, mic, sink, wav_dir, ready=None, turn_gap=0.4, reply_timeout=15.0, speed=1.0):
+        """ready: optional callable() -> True when the agent is listening"""
+        self.mic = mic
+        self.sink = sink
+        self.wav_dir = wav_dir
+        self.ready = ready or (lambda: True)
+        self.turn_gap = turn_gap / speed
+        self.speed = speed
+        self.reply_timeout = reply_timeout
+        self.current_text = ""
+        self.lines_said = 0
+        self.repeats = 0
+        self._wavs = {}
+
+    def transcript(self):
+        """What Whisper "hears" - the line being said right now"""
+        return self.current_text
+
+    def talk(self, call, phone):
+        threading.Thread(target=self._talk, args=(call, phone), daemon=True).start()
+
+    def _wav_for(self, text):
+        if text not in self._wavs:
+            seconds = max(0.8, len(text.split()) / WORDS_PER_SECOND)
+            path = os.path.join(self.wav_dir, f"line_{len(self._wavs)}.wav")
+            self._wavs[text] = make_speech_wav(path, seconds, seed=len(self._wavs))
+        return self._wavs[text]
+
+    def _pickup_wav(self, kind):
+        key = ("pickup", kind)
+        if key not in self._wavs:
+            path = os.path.join(self.wav_dir, f"pickup_{kind}.wav")
+            # A person's greeting is short; machines keep going until cut off
+            seconds = 1.5 if PICKUP_KINDS[kind] == "HUMAN" else 8.0
+            self._wavs[key] = make_pickup_wav(path, kind, seed=len(self._wavs), seconds=seconds)
+        return self._wavs[key]
+
+    def _wait(self, condition, phone, timeout):
+        deadline = time.monotonic() + timeout
+        while phone.in_call and time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return False
+
+    def _agent_turn_over(self):
+        return self.sink.idle_for() >= self.turn_gap and self.ready() and not self.mic.speaking
+
+    def _talk(self, call, phone):
+        hangup_after = call.get("hangup_after")
+        if hangup_after is not None:
+            threading.Timer(hangup_after, phone.end_call, args=("caller",)).start()
+
+        pickup = call.get("pickup", "hello")
+        if pickup != "silent":
+            self.mic.say(self._pickup_wav(pickup))
+        if PICKUP_KINDS[pickup] != "HUMAN":
+            self._wait(lambda: False, phone, phone.max_call_seconds)
+            self.mic.clear()
+            return
+
+        # Opening pitch first
+        plays = self.sink.play_count
+        self._wait(lambda: self.sink.play_count > plays, phone, self.reply_timeout)
+        keypress = call.get("keypress")
+        if keypress:
+            self._wait(lambda: False, phone, keypress.get("after", 1.0) / self.speed)
+            if not phone.in_call:
+                return
+            key = ("dtmf", keypress["digit"])
+            if key not in self._wavs:
+                path = os.path.join(self.wav_dir, f"dtmf_{len(self._wavs)}.wav")
+                self._wavs[key] = make_dtmf_wav(path, keypress["digit"], seed=len(self._wavs))
+            self.mic.say(self._wavs[key])
+        for line in call.get("lines", []):
+            for attempt in range(2):
+                if not self._wait(self._agent_turn_over, phone, self.reply_timeout):
+                    return
+                plays = self.sink.play_count
+                self.current_text = line
+                self.mic.say(self._wav_for(line))
+                self.lines_said += 1
+                if self._wait(lambda: self.sink.play_count > plays, phone, self.reply_timeout):
+                    break
+                self.repeats += 1
@@ -0,0 +1,160 @@
+"""
+Fake ADB - scripted phone behind ADBCallDetector's adb runner
+
+FakePhone wahi output deta hai jo asli phone adb pe deta hai (devices,
+dumpsys telephony.registry, current_number.txt, END_CALL broadcast), aur
+scenario ke hisaab se call dial -> ring -> pick / no answer -> end karta
+hai. Detector ka poll loop bilkul real code path chalta hai.
+
+    phone = FakePhone(calls, caller)
+    detector = ADBCallDetector(adb_runner=phone.run)
+
+pc_driven=True: phone khud list nahi chalata, sirf PC ke DIAL broadcast pe
+call lagata hai (campaign scheduler). "answer" ek list bhi ho sakta hai -
+per attempt, e.g. [false, true] = doosri baar uthata hai.
+"""
+import queue
+import subprocess
+import threading
+import time
+
+# (mCallState, mForegroundCallState) per state - same pairs the detector parses
+_REGISTRY_STATES = {
+    "idle": (0, 0),
+    "dialing": (2, 3),
+    "ringing": (2, 4),
+    "active": (2, 1),
+}
+
+NUMBER_FILE = "/sdcard/Android/data/com.callingagent.app/files/current_number.txt"
+
+
+class FakePhone:
+    def __init__(self, calls, caller=None, dial_seconds=0.5, dial_gap=1.0, max_call_seconds=600, pc_driven=False):
+        """
+        calls: list of dicts - number, answer (bool or per-attempt list), ring_seconds, lines, hangup_after
+        caller: FakeCaller that talks once a call is answered
+        """
+        self.calls = calls
+        self.pc_driven = pc_driven
+        self._dials = queue.Queue()  # Numbers from DIAL broadcasts
+        self.caller = caller
+        self.dial_seconds = dial_seconds
+        self.dial_gap = dial_gap  # Previous call ended -> app dials next
+        self.max_call_seconds = max_call_seconds
+        self.state = "idle"
+        self.number = ""
+        self.results = []
+        self.commands = {}  # adb command -> count
+        self.done = threading.Event()
+        self._ended = threading.Event()
+        self._ended_by = None
+        self._lock = threading.Lock()
+
+    # ---------------- adb side ----------------
+
+    def run(self, args, timeout=5):
+        """adb_runner for ADBCallDetector: args without the adb path"""
+        key = " ".join(args[:3])
+        with self._lock:
+            self.commands[key] = self.commands.get(key, 0) + 1
+            state, number = self.state, self.number
+
+        if args == ["devices"]:
+            return self._result("List of devices attached\nSIMULATOR\tdevice\n")
+        if args[:3] == ["shell", "dumpsys", "telephony.registry"]:
+            call_state, foreground = _REGISTRY_STATES[state]
+            incoming = number if state != "idle" else ""
+            return self._result(
+                f"  mCallState={call_state}\n"
+                f"  mForegroundCallState={foreground}\n"
+                f"  mCallIncomingNumber={incoming}\n"
+            )
+        if args[:2] == ["shell", "cat"] and args[2:] == [NUMBER_FILE]:
+            return self._result(f"{number}\n")
+        if args[:3] == ["shell", "am", "broadcast"] and "com.callingagent.DIAL" in args:
+            self._dials.put(args[args.index("number") + 1])
+            return self._result("Broadcasting: Intent { act=com.callingagent.DIAL }\nBroadcast completed: result=0\n")
+        if args[:3] == ["shell", "am", "broadcast"] and "com.callingagent.END_CALL" in args:
+            self.end_call("agent")
+            return self._result("Broadcasting: Intent { act=com.callingagent.END_CALL }\nBroadcast completed: result=0\n")
+        return self._result("", returncode=1, stderr=f"fake adb: unsupported command {args}")
+
+    @staticmethod
+    def _result(stdout, returncode=0, stderr=""):
+        return subprocess.CompletedProcess(["adb"], returncode, stdout=stdout, stderr=stderr)
+
+    # ---------------- phone side ----------------
+
+    def start(self):
+        threading.Thread(target=self._drive_pc if self.pc_driven else self._drive, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._dials.put(None)
+
+    def end_call(self, by):
+        """Call cut from either end (agent's END_CALL or the caller hanging up)"""
+        with self._lock:
+            if self.state != "active" or self._ended.is_set():
+                return
+            self._ended_by = by
+        self._ended.set()
+
+    def _set_state(self, state, number=None):
+        with self._lock:
+            self.state = state
+            if number is not None:
+                self.number = number
+
+    def _drive(self):
+        for call in self.calls:
+            time.sleep(self.dial_gap)
+            self._place(call, bool(call.get("answer", True)))
+        self.done.set()
+
+    def _drive_pc(self):
+        """Dial whatever the PC asks for, until stop()"""
+        specs = {call["number"]: call for call in self.calls}
+        attempts = {}
+        while True:
+            number = self._dials.get()
+            if number is None:
+                break
+            call = specs.get(number, {"number": number, "answer": False})
+            attempts[number] = attempts.get(number, 0) + 1
+            answer = call.get("answer", True)
+            if isinstance(answer, list):
+                answer = answer[min(attempts[number], len(answer)) - 1]
+            self._place(call, bool(answer))
+        self.done.set()
+
+    def _place(self, call, answered):
+        self._ended.clear()
+        self._ended_by = None
+        self._set_state("dialing", call["number"])
+        time.sleep(self.dial_seconds)
+        self._set_state("ringing")
+        time.sleep(call.get("ring_seconds", 2.0))
+
+        result = {"number": call["number"], "answered": answered}
+        if not answered:
+            self._set_state("idle", "")
+            result["ended_by"] = "no_answer"
+            self.results.append(result)
+            return
+
+        answered_at = time.monotonic()
+        self._set_state("active")
+        if self.caller:
+            self.caller.talk(call, self)
+        if not self._ended.wait(timeout=self.max_call_seconds):
+            self._ended_by = "timeout"
+        result["ended_by"] = self._ended_by
+        result["duration_s"] = round(time.monotonic() - answered_at, 2)
+        self._set_state("idle", "")
+        self.results.append(result)
+
+    @property
+    def in_call(self):
+        return self.state == "active" and not self._ended.is_set()
@@ -0,0 +1,329 @@
+"""
+Stand-in OpenAI Server - local chat + transcription endpoints
+
+Implements just enough of the OpenAI HTTP API for our code:
+  GET  /v1/models                 - used by connection pre-warm
+  POST /v1/chat/completions       - normal + streaming (SSE), with usage;
+                                    response_format json_schema = schema-shaped JSON
+  POST /v1/audio/transcriptions   - Whisper (response_format=text)
+
+Latency, per-connection setup delay (fake RTT/TLS cost) and replies are
+configurable, optional TLS uses a throwaway self-signed certificate.
+With rate_limit_rps set, each endpoint answers 429 (Retry-After +
+x-ratelimit-* headers) once more requests than that arrive in a second.
+
+Run: python -m simulator.openai_server --port 8800 --latency 0.3
+"""
+import itertools
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import logging
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger("CallingAgent")
+
+DEFAULT_REPLIES = [
+    "Humare paas MS Office, Excel, Tally aur English Speaking courses hain. Sirf 3000 me!",
+    "Aap Monday se Saturday, 9 se 6 baje tak aa sakte hain. Kab aayenge aap?",
+]
+
+DEFAULT_TRANSCRIPTS = [
+    "कौन कौन से कोर्स हैं",
+    "फीस कितनी है",
+]
+
+
+def make_self_signed_cert(directory=None):
+    """Create a throwaway localhost cert with the openssl CLI. Returns (cert, key)."""
+    if not shutil.which("openssl"):
+        raise RuntimeError("openssl not found - needed for TLS stand-in server")
+    directory = directory or tempfile.mkdtemp(prefix="standin_tls_")
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+         "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=localhost"],
+        capture_output=True, check=True
+    )
+    return cert, key
+
+
+def _as_delay(value):
+    """Latency settings may be a number or a zero-arg callable (for jitter)"""
+    return value() if callable(value) else (value or 0.0)
+
+
+def _request_ids(messages):
+    """ids from a batched request - last user message is a JSON list of {"id": ...} (post-call analysis)"""
+    user = [m for m in messages if m.get("role") == "user"]
+    try:
+        items = json.loads(user[-1]["content"]) if user else []
+    except (TypeError, ValueError):
+        return []
+    return [str(item["id"]) for item in items if isinstance(item, dict) and "id" in item] if isinstance(items, list) else []
+
+
+def schema_reply(schema, ids, key=None):
+    """
+    Value shaped like a JSON schema: first enum value, "Stand-in <key>" for
+    strings. Arrays of objects with an "id" get one item per request id.
+    """
+    kind = schema.get("type")
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {name: schema_reply(sub, ids, name) for name, sub in properties.items()}
+    if kind == "array":
+        items = schema.get("items", {})
+        if "id" in items.get("properties", {}):
+            return [dict(schema_reply(items, ids), id=item_id) for item_id in ids]
+        return [schema_reply(items, ids)]
+    if kind in ("integer", "number"):
+        return 0
+    if kind == "boolean":
+        return False
+    return f"Stand-in {key or 'text'}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        standin = self.server.standin
+        standin._count("connections")
+        # Fake network cost of a fresh connection (RTT, TLS handshake)
+        time.sleep(_as_delay(standin.connect_delay))
+        if standin.ssl_context:
+            self.request = standin.ssl_context.wrap_socket(self.request, server_side=True)
+        super().setup()
+
+    # -------- helpers --------
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, body, content_type="application/json", headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data):
+        data = data.encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    # -------- routes --------
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self.server.standin._count("models")
+            self._send(200, {"object": "list", "data": [
+                {"id": "standin", "object": "model", "created": 0, "owned_by": "standin"}
+            ]})
+        else:
+            self._send(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        body = self._read_body()
+        standin = self.server.standin
+        override = standin.rate_limited(self.path) or standin.before_request(self)
+        if override:
+            status, payload, headers = override
+            standin._count(f"status_{status}")
+            self._send(status, payload, headers=headers)
+            return
+
+        if self.path.endswith("/chat/completions"):
+            standin._count("chat")
+            self._chat(json.loads(body or b"{}"))
+        elif self.path.endswith("/audio/transcriptions"):
+            standin._count("transcriptions")
+            time.sleep(_as_delay(standin.transcription_latency))
+            self._send(200, standin.next_transcript(), content_type="text/plain")
+        else:
+            self._send(404, {"error": {"message": "Not found"}})
+
+    def _chat(self, request):
+        standin = self.server.standin
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            schema = response_format.get("json_schema", {}).get("schema", {})
+            reply = json.dumps(schema_reply(schema, _request_ids(request.get("messages", []))),
+                               ensure_ascii=False)
+        else:
+            reply = standin.next_reply(request.get("messages", []))
+        prompt_tokens = sum(len(str(m.get("content", ""))) // 4 for m in request.get("messages", []))
+        words = reply.split(" ")
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words),
+            "prompt_tokens_details": {"cached_tokens": 0}
+        }
+        base = {"id": "chatcmpl-standin", "created": int(time.time()), "model": request.get("model", "standin")}
+
+        time.sleep(_as_delay(standin.latency))
+
+        if not request.get("stream"):
+            self._send(200, dict(base, object="chat.completion", usage=usage, choices=[{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": reply}
+            }]))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                if i:
+                    time.sleep(_as_delay(standin.token_delay))
+                text = word if i == 0 else " " + word
+                chunk = dict(base, object="chat.completion.chunk", choices=[{
+                    "index": 0, "finish_reason": None, "delta": {"content": text}
+                }])
+                self._chunk(f"data: {json.dumps(chunk)}\n\n")
+            if (request.get("stream_options") or {}).get("include_usage"):
+                self._chunk(f"data: {json.dumps(dict(base, object='chat.completion.chunk', choices=[], usage=usage))}\n\n")
+            self._chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            standin._count("cancelled_streams")
+
+
+class StandInOpenAIServer:
+    """Local OpenAI-compatible server for benchmarks and the offline simulator"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, token_delay=0.0,
+                 connect_delay=0.0, replies=None, transcripts=None, tls=False, rate_limit_rps=None,
+                 transcription_latency=None):
+        self.host = host
+        self.port = port
+        self.latency = latency              # Before first byte (number or callable)
+        self.token_delay = token_delay      # Between streamed words
+        self.connect_delay = connect_delay  # Per new connection (RTT/TLS stand-in)
+        self.transcription_latency = latency if transcription_latency is None else transcription_latency
+        self.replies = replies or DEFAULT_REPLIES
+        self._reply_cycle = itertools.cycle(self.replies) if not callable(self.replies) else None
+        self.transcripts = transcripts or DEFAULT_TRANSCRIPTS  # List or callable() -> text
+        self._transcript_cycle = itertools.cycle(self.transcripts) if not callable(self.transcripts) else None
+        self.tls = tls
+        self.rate_limit_rps = rate_limit_rps  # Per endpoint, fixed 1s window
+        self._windows = {}                    # path -> (window start, count)
+        self.ssl_context = None
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        scheme = "https" if self.tls else "http"
+        return f"{scheme}://{self.host}:{self.port}/v1"
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def next_reply(self, messages):
+        if callable(self.replies):
+            return self.replies(messages)
+        with self._stats_lock:
+            return next(self._reply_cycle)
+
+    def next_transcript(self):
+        if callable(self.transcripts):
+            return self.transcripts()
+        with self._stats_lock:
+            return next(self._transcript_cycle)
+
+    def rate_limited(self, path):
+        """429 response (status, body, headers) if path is over its rate limit"""
+        if not self.rate_limit_rps:
+            return None
+        now = time.monotonic()
+        with self._stats_lock:
+            start, count = self._windows.get(path, (now, 0))
+            if now - start >= 1.0:
+                start, count = now, 0
+            count += 1
+            self._windows[path] = (start, count)
+        if count <= self.rate_limit_rps:
+            return None
+        reset_ms = max(1, int((start + 1.0 - now) * 1000))
+        return 429, {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}, {
+            "retry-after-ms": str(reset_ms),
+            "x-ratelimit-limit-requests": str(self.rate_limit_rps),
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": f"{reset_ms}ms",
+        }
+
+    def before_request(self, handler):
+        """Hook for fault injection - return (status, body, headers) to short-circuit"""
+        return None
+
+    def start(self):
+        if self.tls:
+            cert, key = make_self_signed_cert()
+            self.ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            self.ssl_context.load_cert_chain(cert, key)
+        self.server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self.server.daemon_threads = True
+        self.server.standin = self
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logger.info(f"🧪 Stand-in OpenAI server on {self.base_url}")
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in for the OpenAI API")
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before first byte")
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--connect-delay", type=float, default=0.0)
+    parser.add_argument("--tls", action="store_true")
+    parser.add_argument("--rate-limit-rps", type=int, default=None, help="429 above this many requests/s")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(message)s")
+    server = StandInOpenAIServer(
+        port=args.port, latency=args.latency, token_delay=args.token_delay,
+        connect_delay=args.connect_delay, tls=args.tls, rate_limit_rps=args.rate_limit_rps
+    ).start()
+    print(f"OPENAI_BASE_URL={server.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,269 @@
+"""
+Offline Call Simulator - N scripted calls through the real CallingAgent
+
+Sab kuch asli chalta hai (ADBCallDetector poll loop, SpeechListener VAD +
+Whisper client, LLMEngine + deadline, TTSEngine, Excel, AudioTracker) -
+sirf bahar ki duniya fake hai:
+  phone      -> FakePhone (adb runner)
+  mic        -> WavMicrophone (caller ki synthetic WAV lines)
+  OpenAI     -> StandInOpenAIServer (chat + transcriptions)
+  TTS/speaker-> FakeTTSBackend + NullAudioSink
+
+Report (JSON): calls/hour, per-stage latency percentiles (trace spans),
+CPU aur memory. Do runs ka report compare karke regressions pakdo.
+
+Run: python -m simulator.run [--calls 5] [--scenario calls.json]
+         [--llm-latency 0.3] [--asr-latency 0.4] [--speed 1.0] [--output report.json]
+         [--pc-dial [--retry-delay 2]]   (campaign scheduler sends DIAL, retries)
+         [--audio-only [--keypad [--handoff]]]   (opening only; DTMF "press 1" / AI after it)
+         [--screen]   (AMD_ENABLED - voicemail / tone pickups hung up before the opening)
+         [--echo leak|cancel]   (agent's voice leaks into the mic / + echo cancellation)
+         [--record mic|playback|both]   (per-call recordings, listed in the report)
+
+Scenario file: {"calls": [{"number": "9820012345", "answer": true,
+    "ring_seconds": 2, "lines": ["fees kitni hai", "theek hai bye"],
+    "hangup_after": null, "pickup": "hello"}, ...]}
+    With --pc-dial "answer" may be per attempt: [false, true]
+    "pickup": what's heard at answer - hello (default), silent, voicemail,
+    announcement, ringback_in, ringback_us, sit (see simulator.audio.PICKUP_KINDS);
+    only screened with --screen
+    "keypress": {"digit": "1", "after": 1.5} - key pressed that long into the opening
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simulator.openai_server import StandInOpenAIServer
+
+DEFAULT_LINES = ["course kaun se hain", "fees kitni hai", "timing kya hai", "theek hai bye"]
+
+
+def default_scenario(count):
+    """Mostly full conversations; every 5th call unanswered, every 7th caller cuts early, every 9th voicemail"""
+    calls = []
+    for i in range(count):
+        call = {"number": f"98200{i:05d}", "answer": i % 5 != 4, "ring_seconds": 2.0,
+                "lines": DEFAULT_LINES, "hangup_after": None}
+        if i % 7 == 6:
+            call["hangup_after"] = 8.0
+        if i % 9 == 8:
+            call.update(pickup="voicemail", lines=[])
+        calls.append(call)
+    return calls
+
+
+def load_scenario(path, count):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    calls = data["calls"] if isinstance(data, dict) else data
+    # Cycle the script if more calls were asked for
+    return [dict(calls[i % len(calls)]) for i in range(count or len(calls))]
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _recordings(directory):
+    """Files the call recorder left behind, with their size"""
+    if not os.path.isdir(directory):
+        return []
+    return [{"file": name, "kb": round(os.path.getsize(os.path.join(directory, name)) / 1024, 1)}
+            for name in sorted(os.listdir(directory))]
+
+
+def simulate(calls, llm_latency=0.3, asr_latency=0.4, token_delay=0.02, tts_first_byte=0.25,
+             speed=1.0, dial_gap=1.0, pc_dial=False, retry_delay=2.0, audio_only=False, keypad=False,
+             handoff=False, echo=None, record=None, screen=False, workdir=None):
+    """Run the calls, return the report dict"""
+    workdir = workdir or tempfile.mkdtemp(prefix="callsim_")
+    caller = None  # Server needs caller.transcript, caller needs the mic - wire up below
+
+    server = StandInOpenAIServer(
+        latency=llm_latency, token_delay=token_delay, transcription_latency=asr_latency,
+        transcripts=lambda: caller.transcript() if caller else ""
+    ).start()
+    os.environ["OPENAI_API_KEY"] = "simulator"
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+
+    # Imported after the env vars so config / clients point at the stand-in server
+    import config
+    recordings_dir = os.path.join(workdir, "recordings")
+    config.apply_overrides({"AMD_ENABLED": screen, "DTMF_ENABLED": keypad, "DTMF_AI_HANDOFF": handoff,
+                            "ECHO_CANCEL_ENABLED": echo == "cancel",
+                            "RECORDING_MODE": record, "RECORDING_DIR": recordings_dir})
+    import tracing
+    tracing.set_tracer(tracing.Tracer(path=os.path.join(workdir, "trace.json"), enabled=True))
+
+    from main import CallingAgent, ADBCallDetector
+    from tts_engine import TTSEngine
+    from speech_listener import SpeechListener
+    from excel_handler import ExcelHandler
+    from audio_tracker import AudioTracker
+    from simulator.audio import WavMicrophone, FakeTTSBackend, NullAudioSink, AcousticLeak, write_fake_audio
+    from simulator.caller import FakeCaller
+    from simulator.fake_adb import FakePhone
+
+    mic = WavMicrophone(speed=speed)
+    sink = NullAudioSink(speed=speed, leak=AcousticLeak(mic) if echo else None)
+    listener = SpeechListener(microphone=mic)
+    caller = FakeCaller(mic, sink, workdir, ready=lambda: listener.is_listening, speed=speed)
+    phone = FakePhone(calls, caller, dial_gap=dial_gap, pc_driven=pc_dial)
+    
+    scheduler = None
+    if pc_dial:
+        from campaign_scheduler import CampaignScheduler, NO_ANSWER, BUSY, TIMEOUT, FAILED, MACHINE, UNREACHABLE
+        delays = dict.fromkeys((NO_ANSWER, BUSY, TIMEOUT, FAILED, MACHINE, UNREACHABLE), retry_delay)
+        scheduler = CampaignScheduler([c["number"] for c in calls], retry_delays=delays, calling_hours=None)
+
+    tts = TTSEngine(backend=FakeTTSBackend(first_byte_delay=tts_first_byte), sink=sink)
+    tts.cache_dir = os.path.join(workdir, "tts_cache")
+    os.makedirs(tts.cache_dir, exist_ok=True)
+
+    agent = CallingAgent(
+        write_fake_audio(os.path.join(workdir, "opening.mp3"), seconds=4.0),
+        ai_mode=not audio_only, show_banner=False, microphone=mic,
+        detector=ADBCallDetector(adb_runner=phone.run),
+        tts=tts, listener=listener,
+        excel=ExcelHandler(os.path.join(workdir, "results.xlsx")),
+        audio_tracker=AudioTracker(os.path.join(workdir, "audio_tracker.xlsx")),
+        scheduler=scheduler,
+    )
+    if agent.dialer:
+        agent.dialer.dial_gap = dial_gap
+        agent.dialer.busy_seconds = 1.5  # Scenario "ring_seconds" < ~0.5 = busy (ADB poll lag)
+
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+    runner = threading.Thread(target=agent.start, daemon=True)
+    runner.start()
+    phone.start()
+    if agent.dialer:
+        agent.dialer.finished.wait()
+        phone.stop()
+    else:
+        phone.done.wait()
+    # Last call's hangup -> agent back to idle
+    deadline = time.monotonic() + 30
+    while agent.in_call and time.monotonic() < deadline:
+        time.sleep(0.05)
+    wall = time.monotonic() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    agent.stop()
+    runner.join(timeout=15)
+    server.stop()
+    tracing.get_tracer().flush()
+
+    answered = [r for r in phone.results if r["answered"]]
+    report = {
+        "calls": len(calls),
+        "answered": len(answered),
+        "ended_by": {k: sum(1 for r in phone.results if r.get("ended_by") == k)
+                     for k in ("agent", "caller", "no_answer", "timeout")},
+        "wall_s": round(wall, 2),
+        "calls_per_hour": round(len(calls) / wall * 3600, 1) if wall else 0,
+        "cpu": {"process_s": round(cpu, 2), "pct_of_one_core": round(cpu / wall * 100, 1) if wall else 0},
+        "memory": {"max_rss_mb": _max_rss_mb()},
+        "caller": {"lines_said": caller.lines_said, "repeats": caller.repeats},
+        "stages": tracing.summarize(tracing.read_events([os.path.join(workdir, "trace.json")])),
+        "llm_turns": agent.deadline.as_dict() if agent.deadline else None,
+        "dashboard": agent.stats.snapshot(),
+        "campaign": scheduler.stats() if scheduler else None,
+        "warmup": {"wall_ms": round(agent.warmup_seconds * 1000, 1) if agent.warmup_seconds is not None else None,
+                   "tasks_ms": {name: round(s * 1000, 1) if s is not None else None
+                                for name, s in agent.warmup_tasks.items()}},
+        "first_call_audio_ms": round(agent.first_call_audio * 1000, 1) if agent.first_call_audio else None,
+        "echo": agent.echo.stats() if agent.echo else None,
+        "recordings": _recordings(recordings_dir) if record else None,
+        "adb_commands": phone.commands,
+        "openai_requests": server.stats,
+        "settings": {"llm_latency": llm_latency, "asr_latency": asr_latency, "token_delay": token_delay,
+                     "tts_first_byte": tts_first_byte, "speed": speed, "dial_gap": dial_gap,
+                     "pc_dial": pc_dial, "retry_delay": retry_delay, "audio_only": audio_only,
+                     "keypad": keypad, "handoff": handoff, "echo": echo, "record": record,
+                     "screen": screen},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "git_rev": _git_rev()},
+        "workdir": workdir,
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scripted calls through the real CallingAgent offline")
+    parser.add_argument("--calls", type=int, default=5, help="Number of calls (scenario is cycled)")
+    parser.add_argument("--scenario", help="JSON scenario file (default: built-in mix)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Chat time to first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Between streamed words (s)")
+    parser.add_argument("--asr-latency", type=float, default=0.4, help="Whisper round trip (s)")
+    parser.add_argument("--tts-first-byte", type=float, default=0.25, help="TTS time to first byte (s)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Audio time compression (mic + speaker)")
+    parser.add_argument("--dial-gap", type=float, default=1.0, help="Call end -> next dial (s)")
+    parser.add_argument("--pc-dial", action="store_true", help="Campaign scheduler dials (DIAL broadcast, retries)")
+    parser.add_argument("--retry-delay", type=float, default=2.0, help="With --pc-dial: seconds before a retry")
+    parser.add_argument("--audio-only", action="store_true", help="Opening only, no AI conversation")
+    parser.add_argument("--screen", action="store_true",
+                        help="AMD_ENABLED - scenario \"pickup\" (voicemail, tones) screened before the opening")
+    parser.add_argument("--keypad", action="store_true", help="DTMF_ENABLED - scenario \"keypress\" stops the opening")
+    parser.add_argument("--handoff", action="store_true", help="With --audio-only --keypad: AI conversation after the key")
+    parser.add_argument("--echo", choices=("leak", "cancel"),
+                        help="Agent's voice leaks into the mic; cancel = with ECHO_CANCEL_ENABLED (speed 1 only)")
+    parser.add_argument("--record", choices=("mic", "playback", "both"),
+                        help="RECORDING_MODE - per-call files in the work dir (speed 1 only)")
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--keep", action="store_true", help="Keep the work dir (trace, Excel files)")
+    args = parser.parse_args()
+    if args.echo and args.speed != 1.0:
+        parser.error("--echo needs --speed 1 (the leak runs on wall time)")
+    if args.record and args.speed != 1.0:
+        parser.error("--record needs --speed 1 (recordings are on wall time)")
+
+    calls = load_scenario(args.scenario, args.calls) if args.scenario else default_scenario(args.calls)
+    report = simulate(calls, llm_latency=args.llm_latency, asr_latency=args.asr_latency,
+                      token_delay=args.token_delay, tts_first_byte=args.tts_first_byte,
+                      speed=args.speed, dial_gap=args.dial_gap, pc_dial=args.pc_dial,
+                      retry_delay=args.retry_delay, audio_only=args.audio_only, keypad=args.keypad,
+                      handoff=args.handoff, echo=args.echo, record=args.record,
+                      screen=args.screen)
+    if not args.keep:
+        shutil.rmtree(report.pop("workdir"), ignore_errors=True)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"Report written to {args.output}")
+    else:
+        print(text)
+    sys.stdout.flush()
+    from log_setup import stop_logging
+    stop_logging()  # os._exit skips atexit - flush the log queue first
+    # Agent threads (listener, analysis) are daemons - don't wait on them
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
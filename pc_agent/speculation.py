@@ -0,0 +1,157 @@
+"""
+Speculative Responder - LLM reply shuru karo jab caller abhi bol hi raha hai
+
+SpeechListener interim transcripts (partial audio) deta hai. Har naye partial
+pe ek cancellable streaming LLM request start hoti hai. Jab final transcript
+aata hai:
+  - speculated text se kaafi match kare -> wahi reply use karo (HIT)
+  - warna request cancel, normal generate_response (MISS)
+"""
+import difflib
+import re
+import threading
+from config import logger, SPECULATION_MATCH_THRESHOLD
+from rate_limiter import SPECULATIVE
+
+
+def normalize(text):
+    """Lowercase, drop punctuation, collapse spaces"""
+    text = re.sub(r"[^\w\s]", " ", (text or "").lower())
+    return " ".join(text.split())
+
+
+def similarity(a, b):
+    return difflib.SequenceMatcher(None, normalize(a), normalize(b)).ratio()
+
+
+class Speculation:
+    """One in-flight draft reply for a partial transcript"""
+
+    def __init__(self, llm, prefix):
+        self.llm = llm
+        self.prefix = prefix
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self.reply = ""
+        self.error = None
+        self.usage = []  # Filled with the usage record when the stream ends
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            for text in self.llm.stream_draft(self.prefix, self.cancel_event, self.usage,
+                                              priority=SPECULATIVE):
+                self.reply += text
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def result(self, timeout=None):
+        """Wait for the draft to finish. Returns reply text or None."""
+        if not self.done.wait(timeout):
+            return None
+        if self.error or self.cancel_event.is_set():
+            return None
+        return self.reply.strip() or None
+
+
+class SpeculationStats:
+    """Hit rate and wasted tokens of speculative generation"""
+
+    def __init__(self):
+        self.partials = 0
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted_tokens = 0
+
+    def as_dict(self):
+        resolved = self.hits + self.misses
+        return {
+            "partials": self.partials,
+            "speculations": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate_pct": round(self.hits * 100 / resolved, 1) if resolved else 0.0,
+            "wasted_tokens": self.wasted_tokens,
+        }
+
+
+class SpeculativeResponder:
+    def __init__(self, llm, match_threshold=SPECULATION_MATCH_THRESHOLD):
+        self.llm = llm
+        self.match_threshold = match_threshold
+        self.stats = SpeculationStats()
+        self._current = None
+        self._discarded = []
+        self._lock = threading.Lock()
+
+    def on_partial(self, text):
+        """Interim transcript from listener thread - (re)start speculation if needed"""
+        if not text:
+            return
+        with self._lock:
+            self.stats.partials += 1
+            current = self._current
+            if current and similarity(text, current.prefix) >= self.match_threshold:
+                return  # Running draft still fits
+            if current:
+                current.cancel()
+                self._discarded.append(current)
+            self._current = Speculation(self.llm, text)
+            self.stats.started += 1
+            logger.debug(f"🔮 Speculating on: \"{text}\"")
+
+    def resolve(self, final_text, timeout=None):
+        """
+        Final transcript arrived. Returns the speculated reply (already committed
+        to history) on a hit, or None - caller should then generate normally.
+        """
+        with self._lock:
+            current, self._current = self._current, None
+
+        reply = None
+        if current and similarity(final_text, current.prefix) >= self.match_threshold:
+            reply = current.result(timeout)
+
+        if reply:
+            self.stats.hits += 1
+            logger.info(f"🔮 Speculation HIT ({similarity(final_text, current.prefix):.2f})")
+            self._settle_discarded()
+            return self.llm.commit_turn(final_text, reply)
+
+        if current:
+            self.stats.misses += 1
+            current.cancel()
+            with self._lock:
+                self._discarded.append(current)
+            logger.info("🔮 Speculation MISS - regenerating")
+        self._settle_discarded()
+        return None
+
+    def cancel_all(self):
+        """Drop any in-flight draft (hangup / end of call)"""
+        with self._lock:
+            current, self._current = self._current, None
+        if current:
+            current.cancel()
+            with self._lock:
+                self._discarded.append(current)
+        self._settle_discarded()
+
+    def _settle_discarded(self):
+        """Add token cost of finished discarded drafts to wasted tokens"""
+        with self._lock:
+            pending = []
+            for spec in self._discarded:
+                if spec.done.is_set():
+                    for record in spec.usage:
+                        self.stats.wasted_tokens += record["prompt_tokens"] + record["completion_tokens"]
+                else:
+                    pending.append(spec)
+            self._discarded = pending
@@ -11,29 +11,53 @@ import wave
 import io
 import time
 from datetime import datetime
-from config import logger, OPENAI_API_KEY
+from tracing import get_tracer
+import metrics
+from config import (
+    logger, OPENAI_API_KEY,
+    SPECULATION_INTERVAL, SPECULATION_MIN_AUDIO,
+    ECHO_CANCEL_ENABLED, ECHO_SAMPLE_RATE
+)
 
 # Try to import OpenAI for Whisper
 try:
-    from openai import OpenAI
+    from openai_client import get_openai_client
+    from rate_limiter import get_scheduler, LIVE, SPECULATIVE
     WHISPER_AVAILABLE = True
 except ImportError:
     WHISPER_AVAILABLE = False
     logger.warning("OpenAI not installed - using Google Speech Recognition")
 
+TRANSCRIPTS = metrics.counter("agent_asr_transcripts_total", "Transcripts by engine and kind", ["engine", "kind"])
+ASR_ERRORS = metrics.counter("agent_asr_errors_total", "Transcription requests that failed", ["engine"])
+ASR_FILTERED = metrics.counter("agent_asr_filtered_total", "Transcripts dropped as garbage / hallucination", ["reason"])
+
 
 class SpeechListener:
-    def __init__(self):
+    def __init__(self, microphone=None):
+        """microphone: any sr.AudioSource (default: system mic; simulator passes a WAV-driven one)"""
         self.recognizer = sr.Recognizer()
         self.microphone = None
         self.is_listening = False
         self.text_queue = queue.Queue()
         self.listen_thread = None
         
+        # Set to a callable(text) to get final transcripts pushed instead of queued
+        self.on_text = None
+        self.tracer = get_tracer()
+        self._generation = 0  # Bumped per start_continuous - transcripts finishing after a restart are dropped
+        self._loop_lock = threading.Lock()
+        self._loop_running = False
+        
+        # Speculative mode: set to a callable(text) to get interim transcripts
+        self.on_partial = None
+        self._partial_busy = threading.Lock()
+        
         # OpenAI Whisper - BEST quality
         if WHISPER_AVAILABLE and OPENAI_API_KEY:
             try:
-                self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+                self.openai_client = get_openai_client()  # Shared keep-alive pool
+                self.scheduler = get_scheduler()           # Shared rate limits
                 logger.info("🎤 Using OpenAI Whisper (best quality)")
             except Exception as e:
                 self.openai_client = None
@@ -54,12 +78,15 @@ class SpeechListener:
         # Temp directory for audio files
         self.temp_dir = tempfile.gettempdir()
         
-        self._setup_microphone()
+        if microphone is not None:
+            self.microphone = microphone
+        else:
+            self._setup_microphone()
     
     def _setup_microphone(self):
-        """Setup default microphone"""
+        """Setup default microphone (echo cancellation: at ECHO_SAMPLE_RATE, not the device's 44.1/48 kHz)"""
         try:
-            self.microphone = sr.Microphone()
+            self.microphone = sr.Microphone(sample_rate=ECHO_SAMPLE_RATE if ECHO_CANCEL_ENABLED else None)
             logger.info("🎤 Microphone ready")
         except Exception as e:
             logger.error(f"Microphone error: {e}")
@@ -74,18 +101,14 @@ class SpeechListener:
         except Exception as e:
             logger.error(f"Calibration error: {e}")
     
-    def _transcribe_with_whisper(self, audio_data):
+    def _transcribe_with_whisper(self, audio_data, partial=False):
         """Transcribe audio using OpenAI Whisper - best quality"""
         if not self.openai_client:
             return None
         
         try:
-            # Convert audio to WAV file
+            # In-memory WAV (partial + final transcriptions can overlap)
             wav_data = audio_data.get_wav_data()
-            temp_file = os.path.join(self.temp_dir, f"speech_{datetime.now().strftime('%H%M%S')}.wav")
-            
-            with open(temp_file, "wb") as f:
-                f.write(wav_data)
             
             # Enhanced prompt
             enhanced_prompt = """course, timing, fees, address, visit, interested, 
@@ -95,31 +118,31 @@ class SpeechListener:
             # OpenAI Whisper
             text = None
             try:
-                with open(temp_file, "rb") as audio_file:
-                    response = self.openai_client.audio.transcriptions.create(
+                # Partials are only speculative - final transcripts go first
+                response = self.scheduler.call(
+                    "transcription",
+                    lambda: self.openai_client.audio.transcriptions.create(
                         model="whisper-1",
-                        file=audio_file,
+                        file=("speech.wav", wav_data),
                         language="hi",
                         response_format="text",
                         temperature=0,
                         prompt=enhanced_prompt
-                    )
+                    ),
+                    priority=SPECULATIVE if partial else LIVE
+                )
                 
                 text = response.strip() if isinstance(response, str) else str(response).strip()
             except Exception as e:
+                ASR_ERRORS.labels("whisper").inc()
                 logger.error(f"Whisper error: {e}")
                 return None
             
-            # Cleanup
-            try:
-                os.remove(temp_file)
-            except:
-                pass
-            
             # Filter out hallucinations and garbage
             if text:
                 # Skip if too short (likely garbage)
                 if len(text) < 3:
+                    ASR_FILTERED.labels("too_short").inc()
                     logger.debug(f"Skipping too short: '{text}'")
                     return None
                 
@@ -129,11 +152,13 @@ class SpeechListener:
                     # Check if same word repeated (hallucination)
                     unique_words = set(words)
                     if len(unique_words) <= 2:  # Only 1-2 unique words repeated
+                        ASR_FILTERED.labels("repetition").inc()
                         logger.debug(f"Skipping repetition hallucination: '{text}'")
                         return None
                 
                 # Skip Malayalam/Tamil/Telugu scripts
                 if any(ord(c) >= 0x0D00 for c in text):
+                    ASR_FILTERED.labels("script").inc()
                     logger.debug(f"Skipping non-Hindi script: '{text}'")
                     return None
                 
@@ -146,10 +171,15 @@ class SpeechListener:
                 text_lower = text.lower()
                 for pattern in hallucination_patterns:
                     if pattern in text_lower:
+                        ASR_FILTERED.labels("pattern").inc()
                         logger.debug(f"Skipping hallucination: '{text}'")
                         return None
                 
-                logger.info(f"🎤 [WHISPER] User: \"{text}\"")
+                TRANSCRIPTS.labels("whisper", "partial" if partial else "final").inc()
+                if partial:
+                    logger.debug(f"🎤 [WHISPER] Partial: \"{text}\"")
+                else:
+                    logger.info(f"🎤 [WHISPER] User: \"{text}\"")
                 return text
             
             return None
@@ -164,6 +194,7 @@ class SpeechListener:
             # Try Hindi first
             text = self.recognizer.recognize_google(audio_data, language="hi-IN")
             if text:
+                TRANSCRIPTS.labels("google", "final").inc()
                 logger.info(f"🎤 [GOOGLE-HI] User: \"{text}\"")
                 return text
         except:
@@ -173,6 +204,7 @@ class SpeechListener:
             # Try English-India
             text = self.recognizer.recognize_google(audio_data, language="en-IN")
             if text:
+                TRANSCRIPTS.labels("google", "final").inc()
                 logger.info(f"🎤 [GOOGLE-EN] User: \"{text}\"")
                 return text
         except:
@@ -215,17 +247,23 @@ class SpeechListener:
         if self.is_listening:
             return
         
-        self.is_listening = True
-        self._paused = False  # New: pause flag
-        self.listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
-        self.listen_thread.start()
+        with self._loop_lock:
+            self.is_listening = True
+            self._paused = False  # New: pause flag
+            self._generation += 1
+            # A loop still finishing its listen() after stop_continuous(wait=False)
+            # simply carries on - never two loops fighting over the mic
+            if not self._loop_running:
+                self._loop_running = True
+                self.listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
+                self.listen_thread.start()
         logger.info("🎤 Continuous listening started")
     
-    def stop_continuous(self):
-        """Stop continuous listening"""
+    def stop_continuous(self, wait=True):
+        """Stop continuous listening (wait=False: return at once, the loop exits on its own)"""
         self.is_listening = False
         # Wait a bit for thread to finish current listen
-        if self.listen_thread and self.listen_thread.is_alive():
+        if wait and self.listen_thread and self.listen_thread.is_alive():
             self.listen_thread.join(timeout=0.5)
         logger.info("🎤 Listening stopped")
     
@@ -237,31 +275,61 @@ class SpeechListener:
         """Resume listening"""
         self._paused = False
     
+    def _active(self, generation):
+        return self.is_listening and generation == self._generation
+    
+    def _deliver(self, text, generation):
+        """Hand a final transcript to on_text (or the queue) unless listening stopped/restarted mid-capture"""
+        if not self._active(generation):
+            return
+        callback = self.on_text
+        if callback:
+            callback(text)
+        else:
+            self.text_queue.put(text)
+    
     def _listen_loop(self):
         """Background listening loop"""
-        while self.is_listening:
+        while True:
+            with self._loop_lock:
+                if not self.is_listening:
+                    self._loop_running = False
+                    return
+            
             if getattr(self, '_paused', False):
                 time.sleep(0.1)
                 continue
             
+            # Phrase belongs to the listening session it started in - stopped /
+            # restarted before it ended (AI spoke in between: its own voice + barge-in) = drop
+            generation = self._generation
             try:
                 with self.microphone as source:
                     logger.debug("Listening...")
-                    audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=15)
+                    if self.on_partial and self.openai_client:
+                        audio = self._listen_with_partials(source)
+                    else:
+                        audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=15)
                 
+                # listen() returned = end of speech detected (after pause_threshold)
+                speech_end = self.tracer.now()
+                if not self._active(generation):
+                    continue
                 logger.debug("Processing audio...")
                 
                 # Try Whisper first
                 if self.openai_client:
                     text = self._transcribe_with_whisper(audio)
                     if text:
-                        self.text_queue.put(text)
+                        self.tracer.interval("speech_end_to_transcript", speech_end, cat="asr", engine="whisper")
+                        self._deliver(text, generation)
                         continue
                 
                 # Fallback to Google
                 text = self._transcribe_with_google(audio)
                 if text:
-                    self.text_queue.put(text)
+                    self.tracer.interval("speech_end_to_transcript", speech_end, cat="asr", engine="google")
+                    self._deliver(text, generation)
             
             except sr.WaitTimeoutError:
                 pass
@@ -270,6 +338,40 @@ class SpeechListener:
                     logger.error(f"Listen error: {e}")
                 time.sleep(0.1)
     
+    def _listen_with_partials(self, source):
+        """
+        Capture one phrase chunk by chunk. Every SPECULATION_INTERVAL seconds of
+        new audio, the audio so far is transcribed in the background and passed
+        to on_partial. Returns the full phrase as AudioData.
+        """
+        frames = []
+        seconds = 0.0
+        next_partial = SPECULATION_MIN_AUDIO
+        
+        for chunk in self.recognizer.listen(source, timeout=5, phrase_time_limit=15, stream=True):
+            frames.append(chunk.frame_data)
+            seconds += len(chunk.frame_data) / (source.SAMPLE_RATE * source.SAMPLE_WIDTH)
+            
+            if seconds >= next_partial:
+                next_partial = seconds + SPECULATION_INTERVAL
+                # Skip if previous partial is still being transcribed - never block capture
+                if self._partial_busy.acquire(blocking=False):
+                    so_far = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                    threading.Thread(target=self._emit_partial, args=(so_far,), daemon=True).start()
+        
+        return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    
+    def _emit_partial(self, audio):
+        try:
+            text = self._transcribe_with_whisper(audio, partial=True)
+            callback = self.on_partial
+            if text and callback and self.is_listening:
+                callback(text)
+        except Exception as e:
+            logger.debug(f"Partial transcript error: {e}")
+        finally:
+            self._partial_busy.release()
+    
     def get_text(self):
         """Get latest recognized text (non-blocking)"""
         try:
@@ -0,0 +1,225 @@
+"""
+Tracing - per-call latency spans in Chrome trace event format
+
+Har stage (pickup -> audio, speech end -> transcript, transcript -> first
+LLM token, first token -> first TTS byte -> first audio, hangup -> next
+dial) ek "complete" event (ph=X) ban ke traces/trace.json me likha jata hai.
+File chrome://tracing ya ui.perfetto.dev me khul jati hai (JSON array
+format, closing ] optional). Writing background thread pe hoti hai, file
+size limit pe rotate hoti hai.
+
+Summary: python tracing.py [trace files...] [--json]
+"""
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+import metrics
+from config import logger, TRACE_ENABLED, TRACE_DIR, TRACE_MAX_BYTES, TRACE_BACKUP_COUNT
+
+# Every span is also a histogram sample - /metrics works with the trace file off
+STAGE_SECONDS = metrics.histogram("agent_stage_seconds", "Per-stage latency (trace spans)", ["stage"])
+
+
+class _RotatingTraceFile:
+    """Appends one event per line to a JSON array file, rotating by size"""
+
+    def __init__(self, path, max_bytes, backup_count):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.file = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8")
+        if self.file.tell() == 0:
+            self.file.write("[\n")
+
+    def _rotate(self):
+        self.file.close()
+        base, ext = os.path.splitext(self.path)
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{base}.{i}{ext}"
+            if os.path.exists(src):
+                os.replace(src, f"{base}.{i + 1}{ext}")
+        if self.backup_count:
+            os.replace(self.path, f"{base}.1{ext}")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def write(self, lines):
+        if self.file is None:
+            self._open()
+        self.file.write("".join(lines))
+        self.file.flush()
+        if self.file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+class Tracer:
+    def __init__(self, path=None, enabled=TRACE_ENABLED,
+                 max_bytes=TRACE_MAX_BYTES, backup_count=TRACE_BACKUP_COUNT):
+        self.enabled = enabled
+        self.call_id = ""  # Tagged onto every event of the current call
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._file = _RotatingTraceFile(path or os.path.join(TRACE_DIR, "trace.json"), max_bytes, backup_count)
+        self._writer = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now():
+        """Monotonic clock used for all trace timestamps (seconds)"""
+        return time.monotonic()
+
+    def set_call(self, call_id):
+        self.call_id = call_id or ""
+
+    def interval(self, name, start, end=None, cat="call", **attrs):
+        """Record a span between two monotonic timestamps (may come from different threads)"""
+        if start is None:
+            return
+        end = self.now() if end is None else end
+        STAGE_SECONDS.labels(name).observe(end - start)
+        if not self.enabled:
+            return
+        if self.call_id:
+            attrs.setdefault("call", self.call_id)
+        self._queue.put({
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round(start * 1e6),
+            "dur": max(0, round((end - start) * 1e6)),
+            "pid": self._pid,
+            "tid": threading.get_native_id(),
+            "args": attrs,
+        })
+        self._ensure_writer()
+
+    @contextmanager
+    def span(self, name, cat="call", **attrs):
+        """with tracer.span("excel.save"): ... - attrs can be added to the yielded dict"""
+        start = self.now()
+        try:
+            yield attrs
+        finally:
+            self.interval(name, start, cat=cat, **attrs)
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                    self._writer.start()
+                    atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            events = [self._queue.get()]
+            # Drain whatever else is queued - one write per burst
+            while True:
+                try:
+                    events.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._file.write([json.dumps(e, ensure_ascii=False) + ",\n" for e in events])
+            except Exception as e:
+                logger.error(f"Trace write error: {e}")
+            for _ in events:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until queued events are on disk"""
+        if self._writer is not None:
+            self._queue.join()
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """Process-wide tracer shared by detector, listener, LLM, TTS and agent"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+
+def set_tracer(tracer):
+    """Replace the process-wide tracer (simulator writes to its own file) - before components are built"""
+    global _tracer
+    with _tracer_lock:
+        _tracer = tracer
+
+
+# ============================================================
+# CAMPAIGN SUMMARY CLI
+# ============================================================
+
+def read_events(paths):
+    """Parse trace files (tolerates the missing ] and a torn last line)"""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip().rstrip(",")
+                if not line or line in ("[", "]"):
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize(events):
+    """Per-stage count and p50/p95/p99 (ms)"""
+    from latency_stats import LatencyStats
+
+    stages = {}
+    for event in events:
+        if event.get("ph") != "X":
+            continue
+        stats = stages.setdefault(event["name"], LatencyStats(maxlen=None))
+        stats.add(event["dur"] / 1e6)
+    return {name: stats.summary() for name, stats in sorted(stages.items())}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize per-stage latency from trace files")
+    parser.add_argument("files", nargs="*", help=f"Trace files (default: all in {TRACE_DIR})")
+    parser.add_argument("--json", action="store_true", help="Machine-readable output")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(TRACE_DIR, "trace*.json")))
+    if not files:
+        print(f"No trace files found in {TRACE_DIR}")
+        return
+
+    summary = summarize(read_events(files))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"{'STAGE':<32}{'COUNT':>7}{'P50 ms':>10}{'P95 ms':>10}{'P99 ms':>10}")
+    for name, s in summary.items():
+        print(f"{name:<32}{s['count']:>7}{s['p50_ms']:>10.1f}{s['p95_ms']:>10.1f}{s['p99_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
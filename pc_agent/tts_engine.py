@@ -5,35 +5,65 @@ Uses Edge TTS (FREE, Indian Hindi voice) - NO OpenAI TTS
 COST: FREE! 
 """
 import os
+import hashlib
 import subprocess
 import tempfile
 import asyncio
+import importlib.util
+import threading
+import time
 from config import logger
+from tracing import get_tracer
+import metrics
 
-# Edge TTS - FREE with Indian Hindi voices
-try:
-    import edge_tts
-    EDGE_TTS_AVAILABLE = True
-except ImportError:
-    EDGE_TTS_AVAILABLE = False
+TTS_CACHE = metrics.counter("agent_tts_cache_total", "Phrase cache lookups", ["result"])
+TTS_ERRORS = metrics.counter("agent_tts_errors_total", "Failed syntheses by engine", ["engine"])
+
+# Edge TTS - FREE with Indian Hindi voices. Only checked here - edge_tts
+# (aiohttp) / gTTS are imported on first synthesis, not at agent start-up.
+EDGE_TTS_AVAILABLE = importlib.util.find_spec("edge_tts") is not None
+if not EDGE_TTS_AVAILABLE:
     logger.warning("edge-tts not installed! pip install edge-tts")
 
 # gTTS fallback (also FREE)
-try:
-    from gtts import gTTS
-    GTTS_AVAILABLE = True
-except ImportError:
-    GTTS_AVAILABLE = False
+GTTS_AVAILABLE = importlib.util.find_spec("gtts") is not None
 
 
 class TTSEngine:
-    def __init__(self):
+    def __init__(self, backend=None, sink=None):
+        """
+        backend: optional object with stream(text) -> audio byte chunks (replaces Edge TTS)
+        sink:    optional object with play(path) -> process-like (wait/poll/terminate)
+                 and duration(path) (replaces ffplay/ffprobe)
+        Both are for the offline simulator; by default the real engines are used.
+        """
+        self.backend = backend
+        self.sink = sink
+        self.edge_available = EDGE_TTS_AVAILABLE or backend is not None
         self.temp_file = os.path.join(tempfile.gettempdir(), "tts_output.mp3")
+        
+        # Phrase cache - fixed phrases (fillers, goodbyes) synthesized once
+        self.cache_dir = os.path.join(tempfile.gettempdir(), "tts_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
         self._current_process = None
         self._stop_flag = False
         self._playing = False  # Track if already playing
+        self.hangup_event = None  # Agent's - set = call ending, a stop() must stick
+        self._durations = {}   # (path, mtime) -> seconds, filled by preload()
+        
+        # Echo cancellation / call recording: what's played goes here as PCM (set by the agent)
+        self.echo_reference = None
+        self.record_reference = None
+        self._pcm_cache = {}   # (path, mtime, size, rate) -> int16 samples
         
-        if EDGE_TTS_AVAILABLE:
+        # Monotonic timestamps of the latest utterance (read by the agent for tracing)
+        self.tracer = get_tracer()
+        self.last_first_byte_at = None  # First synthesized audio byte
+        self.last_playback_at = None    # Player started = first audio sample
+        
+        if backend is not None:
+            logger.info(f"🔊 TTS ready | Using: {type(backend).__name__}")
+        elif EDGE_TTS_AVAILABLE:
             logger.info("🔊 TTS ready | Using: Edge TTS (hi-IN-MadhurNeural - FREE Indian voice)")
         elif GTTS_AVAILABLE:
             logger.info("🔊 TTS ready | Using: gTTS (fallback)")
@@ -44,6 +74,9 @@ class TTSEngine:
         """Stop currently playing audio"""
         self._stop_flag = True
         self._playing = False
+        stopped_at = time.monotonic()
+        for reference in self._references():
+            reference.stop(stopped_at)
         
         if self._current_process:
             try:
@@ -56,6 +89,9 @@ class TTSEngine:
                     pass
             self._current_process = None
         
+        if self.sink:
+            return  # No external players to clean up
+        
         # Kill any ffplay processes (hidden window)
         try:
             subprocess.run(["taskkill", "/F", "/IM", "ffplay.exe"], 
@@ -78,6 +114,8 @@ class TTSEngine:
     def _speak_edge_tts(self, text):
         """Use Edge TTS - FREE with Indian Hindi male voice (LEGACY - use async version)"""
         try:
+            import edge_tts
+            
             async def generate():
                 communicate = edge_tts.Communicate(
                     text=text,
@@ -98,16 +136,28 @@ class TTSEngine:
         if not GTTS_AVAILABLE:
             return False
         try:
+            from gtts import gTTS
             tts = gTTS(text=text, lang='hi', slow=False)
             tts.save(self.temp_file)
+            self.last_first_byte_at = time.monotonic()
             return True
         except Exception as e:
+            TTS_ERRORS.labels("gtts").inc()
             logger.error(f"gTTS error: {e}")
             return False
     
+    def _start_utterance(self):
+        """New utterance clears the last stop() - unless the call is being hung up"""
+        if self.hangup_event is not None and self.hangup_event.is_set():
+            self._stop_flag = True
+            return False
+        self._stop_flag = False
+        return True
+    
     def speak(self, text):
         """Speak text through PC speaker - ASYNC for instant playback"""
-        self._stop_flag = False
+        if not self._start_utterance():
+            return
         
         if not text or len(text.strip()) == 0:
             logger.debug("No text to speak")
@@ -119,7 +169,7 @@ class TTSEngine:
             success = False
             
             # Try Edge TTS first (FREE, Indian voice) - ASYNC!
-            if EDGE_TTS_AVAILABLE:
+            if self.edge_available:
                 success = self._speak_edge_tts_async(text)
             
             # Fallback to gTTS
@@ -136,39 +186,166 @@ class TTSEngine:
     def _speak_edge_tts_async(self, text):
         """Use Edge TTS with ASYNC for instant playback"""
         try:
-            async def generate_and_play():
-                communicate = edge_tts.Communicate(
-                    text=text,
-                    voice="hi-IN-MadhurNeural",
-                    rate="+25%",
-                    pitch="-2Hz"
-                )
-                
-                # Save to temp file
-                await communicate.save(self.temp_file)
-            
-            # Run async
-            asyncio.run(generate_and_play())
+            start = time.monotonic()
+            self._synthesize_to(text, self.temp_file)
+            if self.last_first_byte_at:
+                self.tracer.interval("tts.first_byte", start, self.last_first_byte_at, cat="tts", chars=len(text))
             
             if not self._stop_flag and os.path.exists(self.temp_file):
                 self._play_audio()
             return True
             
         except Exception as e:
+            TTS_ERRORS.labels("edge").inc()
             logger.error(f"Edge TTS async error: {e}")
             return False
     
-    def _play_audio(self):
-        """Play audio file"""
+    def _synthesize_to(self, text, path):
+        """Stream synthesized audio into path (records when the first audio byte arrived)"""
+        self.last_first_byte_at = None
+        
+        with open(path, "wb") as f:
+            def write(data):
+                if f.tell() == 0:
+                    self.last_first_byte_at = time.monotonic()
+                f.write(data)
+            
+            if self.backend is not None:
+                for data in self.backend.stream(text):
+                    write(data)
+                return
+            
+            import edge_tts
+            
+            async def generate():
+                communicate = edge_tts.Communicate(
+                    text=text,
+                    voice="hi-IN-MadhurNeural",
+                    rate="+25%",
+                    pitch="-2Hz"
+                )
+                async for chunk in communicate.stream():
+                    if chunk["type"] == "audio":
+                        write(chunk["data"])
+            
+            asyncio.run(generate())
+    
+    def _start_player(self, path):
+        """Start playing path, returns the (process-like) player"""
+        if self.sink is not None:
+            player = self.sink.play(path)
+        else:
+            player = subprocess.Popen(
+                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+            )
+        self.last_playback_at = time.monotonic()
+        references = self._references()
+        if references:
+            threading.Thread(target=self._feed_references, args=(references, path, self.last_playback_at),
+                             daemon=True).start()
+        return player
+    
+    def _references(self):
+        return [r for r in (self.echo_reference, self.record_reference) if r is not None]
+    
+    def _feed_references(self, references, path, started_at):
+        for reference in references:
+            pcm = self.reference_pcm(path, reference.sample_rate)
+            if pcm is not None:
+                reference.play(pcm, started_at)
+    
+    def reference_pcm(self, path, rate):
+        """
+        Mono int16 samples of path at rate - the same decode ffplay does
+        (cached per file version; sink.pcm() in the simulator)
+        """
+        try:
+            key = (path, os.path.getmtime(path), os.path.getsize(path), rate)
+        except OSError:
+            return None
+        if key in self._pcm_cache:
+            return self._pcm_cache[key]
+        if self.sink is not None:
+            pcm = self.sink.pcm(path, rate) if hasattr(self.sink, "pcm") else None
+        else:
+            try:
+                import numpy as np
+                result = subprocess.run(
+                    ["ffmpeg", "-v", "quiet", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(rate), "-"],
+                    capture_output=True, timeout=30,
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+                )
+                pcm = np.frombuffer(result.stdout, dtype="<i2") if result.stdout else None
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.debug(f"Echo reference decode failed: {e}")
+                pcm = None
+        if len(self._pcm_cache) >= 32:
+            self._pcm_cache.pop(next(iter(self._pcm_cache)))
+        self._pcm_cache[key] = pcm
+        return pcm
+    
+    def _cache_path(self, text):
+        voice = type(self.backend).__name__ if self.backend is not None else "hi-IN-MadhurNeural|+25%|-2Hz"
+        digest = hashlib.sha1(f"{text}|{voice}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.mp3")
+    
+    def synthesize(self, text):
+        """Synthesize text into the phrase cache (no playback). Returns file path or None."""
+        path = self._cache_path(text)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            TTS_CACHE.labels("hit").inc()
+            return path
+        if not self.edge_available:
+            return None
+        TTS_CACHE.labels("miss").inc()
+        try:
+            self._synthesize_to(text, path + ".part")
+            os.replace(path + ".part", path)
+            return path
+        except Exception as e:
+            TTS_ERRORS.labels("cache").inc()
+            logger.error(f"TTS cache error: {e}")
+            return None
+    
+    def prepare(self, phrases):
+        """
+        Warm-up: synthesize fixed phrases (goodbyes, silence message...) into
+        the cache, in parallel. Returns how many are cached now.
+        """
+        phrases = list(dict.fromkeys(p for p in phrases if p))  # Same .part file for duplicates
+        threads = [threading.Thread(target=self.synthesize, args=(p,), daemon=True) for p in phrases]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(1 for p in phrases if self.is_cached(p))
+    
+    def is_cached(self, text):
+        return os.path.exists(self._cache_path(text))
+    
+    def play_cached(self, text):
+        """Speak a fixed phrase from the cache (synthesized on first use)"""
+        if not self._start_utterance():
+            return
+        path = self.synthesize(text)
+        if path:
+            self.last_first_byte_at = time.monotonic()  # Cached - bytes ready now
+            self._play_audio(path)
+        else:
+            self.speak(text)
+    
+    def _play_audio(self, path=None):
+        """Play audio file (default: last synthesized temp file)"""
         if self._stop_flag:
             return
+        path = path or self.temp_file
         
         # Try ffplay first (best)
         try:
-            self._current_process = subprocess.Popen(
-                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", self.temp_file],
-                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-            )
+            self._current_process = self._start_player(path)
             self._current_process.wait(timeout=60)
             self._current_process = None
             return
@@ -177,7 +354,7 @@ class TTSEngine:
         
         # Fallback: PowerShell
         try:
-            abs_path = os.path.abspath(self.temp_file).replace("\\", "/")
+            abs_path = os.path.abspath(path).replace("\\", "/")
             ps_script = f'''
             Add-Type -AssemblyName PresentationCore
             $p = New-Object System.Windows.Media.MediaPlayer
@@ -189,10 +366,22 @@ class TTSEngine:
             Start-Sleep -Seconds ($p.NaturalDuration.TimeSpan.TotalSeconds + 0.5)
             $p.Close()
             '''
+            self.last_playback_at = time.monotonic()
             subprocess.run(["powershell", "-Command", ps_script], capture_output=True, timeout=60)
         except Exception as e:
             logger.error(f"Audio play failed: {e}")
     
+    def _wait_playback(self, process):
+        """Block until the player exits - stop() terminates it, so no polling needed"""
+        if self._stop_flag:
+            # stop() ran before the process handle was published
+            try:
+                process.terminate()
+            except:
+                pass
+        process.wait()
+        self._current_process = None
+    
     def play_file(self, file_path):
         """Play an existing audio file (like opening.mp3)"""
         if self._playing:
@@ -211,25 +400,8 @@ class TTSEngine:
         
         # Try ffplay first (best, no popup)
         try:
-            self._current_process = subprocess.Popen(
-                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", file_path],
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            # Wait for process to finish or stop flag
-            while self._current_process and self._current_process.poll() is None:
-                if self._stop_flag:
-                    try:
-                        self._current_process.terminate()
-                    except:
-                        pass
-                    break
-                import time
-                time.sleep(0.1)
-            
-            self._current_process = None
+            self._current_process = self._start_player(file_path)
+            self._wait_playback(self._current_process)
             self._playing = False
             return True
         except FileNotFoundError:
@@ -258,19 +430,7 @@ class TTSEngine:
                 stderr=subprocess.DEVNULL,
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
-            
-            # Wait for process to finish or stop flag
-            while self._current_process and self._current_process.poll() is None:
-                if self._stop_flag:
-                    try:
-                        self._current_process.terminate()
-                    except:
-                        pass
-                    break
-                import time
-                time.sleep(0.1)
-            
-            self._current_process = None
+            self._wait_playback(self._current_process)
             self._playing = False
             return True
         except Exception as e:
@@ -278,8 +438,38 @@ class TTSEngine:
             self._playing = False
             return False
     
+    def preload(self, file_path):
+        """
+        Warm-up: decode the file once (ffmpeg libraries and the file end up in
+        the OS cache, so the first ffplay starts fast) and remember its duration
+        (and its PCM when echo cancellation / recording needs it)
+        """
+        if self.sink is None:
+            try:
+                subprocess.run(
+                    ["ffmpeg", "-v", "quiet", "-i", file_path, "-f", "null", "-"],
+                    capture_output=True, timeout=30,
+                    creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+                )
+            except (OSError, subprocess.SubprocessError) as e:
+                logger.debug(f"Pre-decode skipped: {e}")
+        for reference in self._references():
+            self.reference_pcm(file_path, reference.sample_rate)
+        key = (file_path, os.path.getmtime(file_path))
+        self._durations[key] = self._probe_duration(file_path)
+        return self._durations[key]
+    
     def get_audio_duration(self, file_path):
-        """Get duration of audio file in seconds"""
+        """Get duration of audio file in seconds (cached once preload()ed)"""
+        try:
+            cached = self._durations.get((file_path, os.path.getmtime(file_path)))
+        except OSError:
+            cached = None
+        return cached if cached is not None else self._probe_duration(file_path)
+    
+    def _probe_duration(self, file_path):
+        if self.sink is not None:
+            return self.sink.duration(file_path)
         try:
             result = subprocess.run(
                 ["ffprobe", "-v", "quiet", "-show_entries", "format=duration", 